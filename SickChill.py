@@ -44,6 +44,7 @@ from configobj import ConfigObj
 from sickchill.helper.argument_parser import SickChillArgumentParser
 from sickchill.oldbeard import db, name_cache, network_timezones
 from sickchill.oldbeard.event_queue import Events
+from sickchill.show.ShowList import ShowList
 from sickchill.tv import TVShow
 from sickchill.update_manager import PipUpdateManager, UpdateManager
 from sickchill.views.server_settings import SCWebServer
@@ -281,7 +282,7 @@ class SickChill:
         main_db_con = db.DBConnection()
         sql_results = main_db_con.select("SELECT indexer, indexer_id, location FROM tv_shows;")
 
-        settings.show_list = []
+        settings.show_list = ShowList()
         for sql_show in sql_results:
             if settings.stopping or settings.restarting:
                 break
@@ -297,7 +298,7 @@ class SickChill:
                 break
 
         # Presort show_list, so we don't have to do it every page load
-        settings.show_list = sorted(settings.show_list, key=attrgetter("sort_name"))
+        settings.show_list.sort(key=attrgetter("sort_name"))
 
     @staticmethod
     def restore_db(src_dir, dst_dir):
@@ -215,6 +215,34 @@
                             </div>
                         </div>
 
+                        <div class="field-pair row">
+                            <div class="col-lg-3 col-md-4 col-sm-5 col-xs-12">
+                                <label class="component-title">${_('Queue log records')}</label>
+                            </div>
+                            <div class="col-lg-9 col-md-8 col-sm-7 col-xs-12 component-desc">
+                                <input type="checkbox" name="log_queue" id="log_queue" ${checked(settings.LOG_QUEUE)}/>
+                                <label for="log_queue">${_('write the log from a background thread so logging never waits on the disk, records are dropped when the queue is full (REQUIRES RESTART)')}</label>
+                            </div>
+                        </div>
+
+                        <div class="field-pair row">
+                            <div class="col-lg-3 col-md-4 col-sm-5 col-xs-12">
+                                <label class="component-title">${_('Size of the log queue')}</label>
+                            </div>
+                            <div class="col-lg-9 col-md-8 col-sm-7 col-xs-12 component-desc">
+                                <div class="row">
+                                    <div class="col-md-12">
+                                        <input type="number" min="100" step="100" name="log_queue_size" id="log_queue_size" value="${settings.LOG_QUEUE_SIZE}" class="form-control input-sm input100" autocapitalize="off" />
+                                    </div>
+                                </div>
+                                <div class="row">
+                                    <div class="col-md-12">
+                                        <label for="log_queue_size">${_('number of log records waiting to be written before new ones are dropped (default: 10000) (REQUIRES RESTART)')}</label>
+                                    </div>
+                                </div>
+                            </div>
+                        </div>
+
                         <div class="field-pair row">
                             <div class="col-lg-3 col-md-4 col-sm-5 col-xs-12">
                                 <label class="component-title">${_('Use initial indexer set to')}</label>
@@ -896,6 +924,16 @@
                             </div>
                         </div>
 
+                        <div class="field-pair row">
+                            <div class="col-lg-3 col-md-4 col-sm-5 col-xs-12">
+                                <label class="component-title">${_('Name parser CPU yield')}</label>
+                            </div>
+                            <div class="col-lg-9 col-md-8 col-sm-7 col-xs-12 component-desc">
+                                <input type="checkbox" name="parser_cpu_yield" id="parser_cpu_yield" ${checked(settings.PARSER_CPU_YIELD)}/>
+                                <label for="parser_cpu_yield">${_('briefly pause release name parsing while SickChill is CPU bound (never applies to post processing)')}</label>
+                            </div>
+                        </div>
+
                         <div class="field-pair row">
                             <div class="col-lg-3 col-md-4 col-sm-5 col-xs-12">
                                 <label class="component-title">${_('Anonymous redirect')}</label>
@@ -957,6 +995,26 @@
                             </div>
                         </div>
 
+                        <div class="field-pair row">
+                            <div class="col-lg-3 col-md-4 col-sm-5 col-xs-12">
+                                <label class="component-title">${_('Concurrent database reads')}</label>
+                            </div>
+                            <div class="col-lg-9 col-md-8 col-sm-7 col-xs-12 component-desc">
+                                <input type="checkbox" name="database_wal" id="database_wal" ${checked(settings.DATABASE_WAL)}/>
+                                <label for="database_wal">${_('use write ahead logging so pages and searches can read the database while it is written to (requires restart)')}</label>
+                            </div>
+                        </div>
+
+                        <div class="field-pair row">
+                            <div class="col-lg-3 col-md-4 col-sm-5 col-xs-12">
+                                <label class="component-title">${_('Database statistics')}</label>
+                            </div>
+                            <div class="col-lg-9 col-md-8 col-sm-7 col-xs-12 component-desc">
+                                <input type="checkbox" name="database_stats" id="database_stats" ${checked(settings.DATABASE_STATS)}/>
+                                <label for="database_stats">${_('record query times, rows and lock waits, shown under System > Database Stats')}</label>
+                            </div>
+                        </div>
+
                         <div class="field-pair row">
                             <div class="col-lg-3 col-md-4 col-sm-5 col-xs-12">
                                 <label class="component-title">${_('Notify on Errors')}</label>
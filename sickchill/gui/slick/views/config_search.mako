@@ -41,6 +41,17 @@
                                 </div>
                             </div>
 
+                            <div class="field-pair row">
+                                <div class="col-lg-3 col-md-4 col-sm-5 col-xs-12">
+                                    <label class="component-title">${_('Parallel provider search')}</label>
+                                </div>
+                                <div class="col-lg-9 col-md-8 col-sm-7 col-xs-12 component-desc">
+                                    <input type="checkbox" name="parallel_provider_search" id="parallel_provider_search"
+                                           ${checked(settings.PARALLEL_PROVIDER_SEARCH)}/>
+                                    <label for="parallel_provider_search">${_('search all providers at once during backlog and manual searches, results are still picked in provider order')}</label>
+                                </div>
+                            </div>
+
                             <div class="field-pair row">
                                 <div class="col-lg-3 col-md-4 col-sm-5 col-xs-12">
                                     <label class="component-title">${_('Download propers')}</label>
@@ -0,0 +1,76 @@
+<%inherit file="/layouts/main.mako" />
+<%!
+    from sickchill import settings
+%>
+<%block name="content">
+    <div class="row">
+        <div class="col-md-12">
+            <h1 class="header">${header}</h1>
+        </div>
+    </div>
+    % if not settings.DATABASE_STATS:
+        <div class="row">
+            <div class="col-md-12">
+                <p>${_('Database statistics are disabled, enable them in the advanced general settings.')}</p>
+            </div>
+        </div>
+    % endif
+    <div class="row">
+        <div class="col-md-12">
+            <h3>${_('Lock waits')}</h3>
+            <table class="sickchillTable">
+                <thead>
+                    <tr>
+                        <th>${_('Database')}</th>
+                        <th>${_('Count')}</th>
+                        <th>${_('Total (s)')}</th>
+                        <th>${_('Max (s)')}</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    % for filename, lock_wait in sorted(stats['lock_waits'].items()):
+                        <tr>
+                            <td>${filename}</td>
+                            <td>${lock_wait['count']}</td>
+                            <td>${lock_wait['total_time']}</td>
+                            <td>${lock_wait['max_time']}</td>
+                        </tr>
+                    % endfor
+                </tbody>
+            </table>
+        </div>
+    </div>
+    <div class="row">
+        <div class="col-md-12">
+            <h3>${_('Queries')}</h3>
+            <table class="sickchillTable">
+                <thead>
+                    <tr>
+                        <th>${_('Database')}</th>
+                        <th>${_('Query')}</th>
+                        <th>${_('Count')}</th>
+                        <th>${_('Total (s)')}</th>
+                        <th>${_('Mean (s)')}</th>
+                        <th>${_('p95 (s)')}</th>
+                        <th>${_('Rows')}</th>
+                        <th>${_('Full scan')}</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    % for query in stats['queries']:
+                        <tr>
+                            <td>${query['database']}</td>
+                            <td class="align-left" title="${'; '.join(query['plan'] or [])}"><code>${query['query']}</code></td>
+                            <td>${query['count']}</td>
+                            <td>${query['total_time']}</td>
+                            <td>${query['mean_time']}</td>
+                            <td>${query['p95_time']}</td>
+                            <td>${query['rows']}</td>
+                            <td>${(_('No'), _('Yes'))[query['full_scan']]}</td>
+                        </tr>
+                    % endfor
+                </tbody>
+            </table>
+        </div>
+    </div>
+</%block>
@@ -271,6 +271,9 @@
                                         </li>
                                     %endif
                                     <li><a href="${static_url('errorlogs/viewlog/', include_version=False)}"><i class="fa fa-fw fa-file-text-o"></i>&nbsp;${_('View Log')}</a></li>
+                                    % if settings.DATABASE_STATS:
+                                        <li><a href="${static_url('errorlogs/dbstats/', include_version=False)}"><i class="fa fa-fw fa-database"></i>&nbsp;${_('Database Stats')}</a></li>
+                                    % endif
                                     <li role="separator" class="divider"></li>
                                     % if hasattr(settings, "DISABLE_UPDATER") and not settings.DISABLE_UPDATER:
                                     <li><a href="${static_url('home/updateCheck?pid={}'.format(process_id), include_version=False)}"><i class="fa fa-fw fa-wrench"></i>&nbsp;${_('Check For Updates')}</a></li>
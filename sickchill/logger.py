@@ -1,8 +1,12 @@
+import json
 import logging
 import logging.handlers
 import os
+import queue
 import re
 import sys
+import threading
+import time
 from logging import NullHandler
 from urllib.parse import quote
 
@@ -25,7 +29,47 @@ LOGGING_LEVELS = {
     "DB": DB,
 }
 
-censored_items = {}
+
+class CensoredItems(dict):
+    """
+    The secrets to censor from the log, the version changes with every update so the formatter knows to rebuild its pattern
+    """
+
+    version = 0
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+
+    def pop(self, *args):
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self):
+        self.version += 1
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        self.version += 1
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.version += 1
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+
+censored_items = CensoredItems()
+
+# Needed because Newznab apikey isn't stored as key=value in a section.
+API_KEY_REGEX = re.compile(r"([&?]r|[&?]apikey|[&?]jackett_apikey|[&?]api_key)(?:=|%3D)[^&]*([&\w]?)", re.I)
 
 
 class DispatchFormatter(logging.Formatter, object):
@@ -33,9 +77,36 @@ class DispatchFormatter(logging.Formatter, object):
     Censor information such as API keys, usernames, and passwords from the Log
     """
 
+    # (censored_items version, combined pattern, literal items) shared by the formatters of all the handlers
+    censor = (None, None, ())
+
     def __init__(self, fmt=None, datefmt=None, style="{"):
         super().__init__(fmt, datefmt, style=style)
 
+    @classmethod
+    def censor_patterns(cls):
+        """
+        The combined pattern of the censored items and the items to replace literally, rebuilt when censored_items changes
+
+        Items that start and end with a word character are matched as whole words by a single alternation, longest first so
+        password_1 doesn't become ********_1. Items like ++password can't be matched on word boundaries and are replaced as is.
+        """
+        version, pattern, literals = cls.censor
+        if version == censored_items.version:
+            return pattern, literals
+
+        version = censored_items.version
+        # set of censored items and urlencoded counterparts
+        censored = {item for item in list(censored_items.values()) if item and isinstance(item, str)}
+        censored = sorted(censored | {quote(item) for item in censored}, key=len, reverse=True)
+
+        words = [re.escape(item) for item in censored if re.match(r"\w", item[0]) and re.match(r"\w", item[-1])]
+        pattern = re.compile(rf"\b(?:{'|'.join(words)})\b") if words else None
+        literals = tuple(item for item in censored if not (re.match(r"\w", item[0]) and re.match(r"\w", item[-1])))
+
+        cls.censor = (version, pattern, literals)
+        return pattern, literals
+
     def format(self, record):
         """
         Strips censored items from string and formats the log line
@@ -45,28 +116,17 @@ class DispatchFormatter(logging.Formatter, object):
 
         msg = record.msg
 
-        # set of censored items
-        censored = {item for _, item in censored_items.items() if item}
-        # set of censored items and urlencoded counterparts
-        censored = list(censored | {quote(item) for item in censored})
-        # sort the list in order of descending length so that entire item is censored
-        # e.g. password and password_1 both get censored instead of getting ********_1
-        censored.sort(key=len, reverse=True)
-
         if not isinstance(msg, (str, bytes)):
             msg = repr(msg)
 
-        for item in censored:
-            try:
-                # passwords that include ++ for example will error. Cannot escape or it wont match at all.
-                msg = re.sub(rf"\b({item})\b", "*" * 8, msg)
-            except re.error:
+        if isinstance(msg, str):
+            pattern, literals = self.censor_patterns()
+            if pattern:
+                msg = pattern.sub("*" * 8, msg)
+            for item in literals:
                 msg = msg.replace(item, "*" * 8)
-            except TypeError:
-                print(msg)
 
-        # Needed because Newznab apikey isn't stored as key=value in a section.
-        msg = re.sub(r"([&?]r|[&?]apikey|[&?]jackett_apikey|[&?]api_key)(?:=|%3D)[^&]*([&\w]?)", r"\1=**********\2", msg, re.I)
+            msg = API_KEY_REGEX.sub(r"\1=**********\2", msg)
 
         if record.levelno == ERROR:
             classes.ErrorViewer.add(classes.UIError(msg))
@@ -78,6 +138,74 @@ class DispatchFormatter(logging.Formatter, object):
         return super().format(record)
 
 
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hand the records to the listener thread without waiting on the disk, the buffer holds at most size records
+
+    When the buffer is full a new record is dropped, unless it is a warning or an error, then the oldest waiting record is
+    dropped to make room for it. A warning about the dropped records is written at most every DROP_WARNING_INTERVAL seconds.
+    """
+
+    DROP_WARNING_INTERVAL = 60
+
+    def __init__(self, size: int):
+        super().__init__(queue.Queue(maxsize=size))
+        self.size = size
+        self.dropped = 0
+        self.last_drop_warning = None
+
+    def enqueue(self, record):
+        # emit is called with the handler lock held, so the counters don't need their own
+        if self.put(record):
+            return
+
+        now = time.monotonic()
+        if self.last_drop_warning is None or now - self.last_drop_warning >= self.DROP_WARNING_INTERVAL:
+            self.last_drop_warning = now
+            # queued directly, logging it would come back to this handler
+            self.put(
+                logging.makeLogRecord(
+                    {
+                        "name": "sickchill",
+                        "levelno": WARNING,
+                        "levelname": "WARNING",
+                        "msg": f"The log queue is full, {self.dropped} log records were dropped, raise the size of the log queue or turn it off",
+                    }
+                )
+            )
+
+    def put(self, record) -> bool:
+        """Queue a record, returns False when it or an older record was dropped"""
+        dropped = self.dropped
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return self.dropped == dropped
+            except queue.Full:
+                self.dropped += 1
+                if record.levelno < WARNING:
+                    return False
+
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+
+    @property
+    def stats(self) -> dict:
+        return {"size": self.size, "waiting": self.queue.qsize(), "dropped": self.dropped}
+
+
+class BoundedQueueListener(logging.handlers.QueueListener):
+    """
+    Write the queued records with the console and file handlers on its own thread
+    """
+
+    def enqueue_sentinel(self):
+        # the loggers don't add records anymore when it is stopped, so wait for room instead of failing on a full queue
+        self.queue.put(self._sentinel)
+
+
 class Logger(object):
     """
     Logger to create log entries
@@ -107,6 +235,8 @@ class Logger(object):
         self.debug_logging = False
         self.database_logging = False
         self.log_file = None
+        self.queue_handler = None
+        self.listener = None
 
     def init_logging(self, console_logging=False, file_logging=False, debug_logging=False, database_logging=False):
         """
@@ -148,23 +278,32 @@ class Logger(object):
                 logger.setLevel(log_level)
 
         log_format = "{asctime} {levelname} :: {threadName} :: {message}"
+        handlers = []
         # console log handler
         if self.console_logging:
             console = logging.StreamHandler()
             console.setFormatter(DispatchFormatter(log_format, dateTimeFormat))
             console.setLevel(log_level)
-
-            for logger in self.loggers:
-                logger.addHandler(console)
+            handlers.append(console)
 
         # rotating log file handler
         if self.file_logging:
             rfh = logging.handlers.RotatingFileHandler(self.log_file, maxBytes=int(settings.LOG_SIZE * 1048576), backupCount=settings.LOG_NR)
             rfh.setFormatter(DispatchFormatter(log_format, dateTimeFormat))
             rfh.setLevel(log_level)
+            handlers.append(rfh)
+
+        # the handlers write from a listener thread and the loggers only queue the records
+        if settings.LOG_QUEUE and handlers:
+            self.queue_handler = BoundedQueueHandler(settings.LOG_QUEUE_SIZE)
+            self.queue_handler.setLevel(log_level)
+            self.listener = BoundedQueueListener(self.queue_handler.queue, *handlers, respect_handler_level=True)
+            self.listener.start()
+            handlers = [self.queue_handler]
 
+        for handler in handlers:
             for logger in self.loggers:
-                logger.addHandler(rfh)
+                logger.addHandler(handler)
 
     def restart(self, change_log_dir: bool = False):
         """
@@ -193,6 +332,19 @@ class Logger(object):
                 handler.close()
                 logger.removeHandler(handler)
 
+        if self.listener:
+            # writes out the records still waiting in the queue
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = self.queue_handler = None
+
+    @property
+    def queue_stats(self) -> dict:
+        """The size, waiting and dropped records of the log queue, empty when the handlers write directly"""
+        queue_handler = self.queue_handler
+        return queue_handler.stats if queue_handler else {}
+
     def shutdown(self):
         """
         Shut down the logger
@@ -249,62 +401,245 @@ LOG_FILTERS = {
 }
 
 
-def log_data(min_level, log_filter, log_search, max_lines):
-    regex = r"^\d{4}\-\d{2}\-\d{2} \d{2}\:\d{2}:\d{2} ([A-Z]+) \:\: (.+?) \:\: (.*)$"
-    if log_filter not in LOG_FILTERS:
-        log_filter = "<NONE>"
+LOG_LINE_REGEX = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) ([A-Z]+) :: (.+?) :: (.*)$")
 
-    final_data = []
 
-    log_files = []
-    if os.path.isfile(Wrapper.instance.log_file):
-        log_files.append(Wrapper.instance.log_file)
+def level_number(level: str) -> int:
+    """The number of a level name in the log, unknown levels count as errors"""
+    number = LOGGING_LEVELS.get(level, logging.getLevelName(level))
+    return number if isinstance(number, int) else ERROR
+
+
+def reverse_lines(path: str, block_size: int = 65536):
+    """
+    Yield the lines of a file with their offsets from the last to the first, reading it backwards in blocks
+
+    :param path: the file to read
+    :param block_size: the bytes to read at a time
+    """
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b""
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + remainder).split(b"\n")
+            remainder = lines.pop(0)
+
+            offset = position + len(remainder) + 1
+            offsets = []
+            for line in lines:
+                offsets.append(offset)
+                offset += len(line) + 1
+
+            for offset, line in zip(reversed(offsets), reversed(lines)):
+                yield offset, line.decode("utf-8", "replace").rstrip("\r")
+
+        if remainder:
+            yield 0, remainder.decode("utf-8", "replace").rstrip("\r")
+
+
+class LogIndex(object):
+    """
+    The offsets of the warning and error records of a log file, kept next to it in a .idx sidecar
+
+    A log file only grows until it is rotated, so the index is extended from the size it already covers. It is found by
+    the first line of the file, so the index of a rotated file is reused after the file is renamed to the next number.
+    """
+
+    VERSION = 1
+    # the indexes by first line of the files read by this process
+    indexes = {}
+    lock = threading.Lock()
+
+    def __init__(self, head: str = "", path: str = None):
+        self.head = head
+        self.path = path
+        self.size = 0
+        self.offsets = {}
+
+    @staticmethod
+    def read_head(path: str) -> str:
+        with open(path, "rb") as f:
+            return f.readline().decode("utf-8", "replace").rstrip("\r\n")
+
+    @classmethod
+    def load(cls, path: str) -> "LogIndex":
+        try:
+            with open(f"{path}.idx") as f:
+                data = json.load(f)
+            if data.get("version") == cls.VERSION:
+                index = cls(data["head"], path)
+                index.size = data["size"]
+                index.offsets = data["offsets"]
+                return index
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return cls()
+
+    def save(self, path: str):
+        try:
+            with open(f"{path}.idx", "w") as f:
+                json.dump({"version": self.VERSION, "head": self.head, "size": self.size, "offsets": self.offsets}, f)
+        except OSError as error:
+            Wrapper.instance.logger.debug(f"Could not save the log index of {path}: {error}")
+
+    @classmethod
+    def get(cls, path: str) -> "LogIndex":
+        """Get the index of a log file, updated to its current size"""
+        with cls.lock:
+            head = cls.read_head(path)
+            index = cls.indexes.get(head) or cls.load(path)
+            if index.head != head or os.path.getsize(path) < index.size:
+                index = cls(head)
+
+            # a new, extended or renamed index is saved next to its file
+            changed = index.path != path
+            index.path = path
+            if os.path.getsize(path) > index.size:
+                index.extend(path)
+                changed = True
+
+            if head:
+                cls.indexes[head] = index
+            if changed:
+                index.save(path)
+            return index
+
+    @classmethod
+    def prune(cls, paths: list):
+        """Forget the indexes of the files that were rotated out of the log, the others are found by the first line of a log file"""
+        with cls.lock:
+            heads = set()
+            for path in paths:
+                try:
+                    heads.add(cls.read_head(path))
+                except OSError:
+                    pass
+
+            for head in list(cls.indexes):
+                if head not in heads:
+                    del cls.indexes[head]
+
+    def extend(self, path: str):
+        """Index the complete lines written after the size this index covers"""
+        with open(path, "rb") as f:
+            f.seek(self.size)
+            offset = self.size
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                match = LOG_LINE_REGEX.match(line.decode("utf-8", "replace").rstrip("\r\n"))
+                if match and level_number(match.group(2)) >= WARNING:
+                    self.offsets.setdefault(match.group(2), []).append(offset)
+                offset += len(line)
+        self.size = offset
+
+    def record_offsets(self, min_level: int) -> list:
+        """The offsets of the records at min_level or above, last first"""
+        offsets = []
+        with self.lock:
+            for level, level_offsets in self.offsets.items():
+                if level_number(level) >= min_level:
+                    offsets.extend(level_offsets)
+        return sorted(offsets, reverse=True)
+
+
+def read_record(f, offset: int) -> list:
+    """Read the header line at an offset and its continuation lines, like the lines of a traceback"""
+    f.seek(offset)
+    record = []
+    for line in f:
+        line = line.decode("utf-8", "replace").rstrip("\r\n")
+        if record and LOG_LINE_REGEX.match(line):
+            break
+        if line.strip():
+            record.append(line)
+    return record
+
 
+def log_files() -> list:
+    """The log file and its rotated files, newest first"""
+    files = []
+    current = Wrapper.instance.log_file
+    if current and os.path.isfile(current):
+        files.append(current)
         for i in range(1, int(settings.LOG_NR)):
-            name = f"{Wrapper.instance.log_file}.{i}"
+            name = f"{current}.{i}"
             if not os.path.isfile(name):
                 break
-            log_files.append(name)
-    else:
-        return final_data
-
-    data = []
-    for _log_file in log_files:
-        if len(data) < max_lines:
-            with open(_log_file, "r") as f:
-                data += [line.strip() + "\n" for line in reversed(f.readlines()) if line.strip()]
-        else:
-            break
+            files.append(name)
+    return files
 
-    found_lines = 0
-    for x in data:
-        match = re.match(regex, x)
 
-        if match:
-            level = match.group(1)
-            log_name = match.group(2)
+def log_records(min_level: int = INFO, thread: str = None, search: str = None, since: str = None):
+    """
+    Yield the records of the log and its rotated files, newest first, as their header line followed by the continuation lines
 
-            if not settings.DEBUG and level == "DEBUG":
-                continue
+    The files are read backwards, so a caller stopping after the records it needs doesn't read the rest of them. Warning and
+    error queries jump to the records in the log index instead of scanning past every debug line.
 
-            if not settings.DBDEBUG and level == "DB":
+    :param min_level: the lowest level to return
+    :param thread: only return the records of the threads with names starting with it
+    :param search: return the records containing it at any level, instead of filtering by level and thread
+    :param since: stop at the records older than this time, formatted like the log, e.g. 2024-01-01 12:00:00
+    """
+    search = search.lower() if search else None
+
+    def wanted(match) -> bool:
+        level = match.group(2)
+        if (level == "DEBUG" and not settings.DEBUG) or (level == "DB" and not settings.DBDEBUG):
+            return False
+        if search:
+            return search in match.group(0).lower()
+        return level_number(level) >= min_level and (not thread or match.group(3).startswith(thread))
+
+    paths = log_files()
+    if not search and min_level >= WARNING:
+        LogIndex.prune(paths)
+
+    for path in paths:
+        if not search and min_level >= WARNING:
+            offsets = LogIndex.get(path).record_offsets(min_level)
+            with open(path, "rb") as f:
+                for offset in offsets:
+                    record = read_record(f, offset)
+                    match = record and LOG_LINE_REGEX.match(record[0])
+                    if not match:
+                        continue
+                    if since and match.group(1) < since:
+                        return
+                    if wanted(match):
+                        yield record
+            continue
+
+        continuation = []
+        for offset, line in reverse_lines(path):
+            if not line.strip():
+                continue
+            match = LOG_LINE_REGEX.match(line)
+            if not match:
+                continuation.append(line)
                 continue
 
-            if level not in LOGGING_LEVELS:
-                final_data.append("AA " + x)
-                found_lines += 1
-            elif log_search and log_search.lower() in x.lower():
-                final_data.append(x)
-                found_lines += 1
-            elif not log_search and LOGGING_LEVELS[level] >= int(min_level) and (log_filter == "<NONE>" or log_name.startswith(log_filter)):
-                final_data.append(x)
-                found_lines += 1
-        else:
-            final_data.append("AA " + x)
-            found_lines += 1
+            if since and match.group(1) < since:
+                return
+            if wanted(match):
+                yield [line] + continuation[::-1]
+            continuation = []
 
-        if found_lines >= max_lines:
-            break
+
+def log_data(min_level, log_filter, log_search, max_lines):
+    if log_filter not in LOG_FILTERS or log_filter == "<NONE>":
+        log_filter = None
+
+    final_data = []
+    for record in log_records(int(min_level), thread=log_filter, search=log_search):
+        for line in [f"AA {line}" for line in reversed(record[1:])] + [record[0]]:
+            final_data.append(line + "\n")
+            if len(final_data) >= max_lines:
+                return final_data
 
     return final_data
 
@@ -64,3 +64,64 @@ class ResultsTable(InitialSchema):
                     [provider_id],
                 )
                 self.connection.action("DROP TABLE {}".format(provider_id))
+
+
+class ResultEpisodesTable(ResultsTable):
+    """
+    Index the cached results by episode and flag the propers, so searches don't have to scan the results with LIKE
+    """
+
+    def test(self):
+        return self.has_table("result_episodes")
+
+    def execute(self):
+        import sickchill.settings
+
+        if not self.has_column("results", "proper"):
+            self.add_column("results", "proper", col_type="INTEGER", default=0)
+
+        self.connection.action("CREATE TABLE result_episodes (url TEXT, provider TEXT, indexerid NUMERIC, season NUMERIC, episode NUMERIC);")
+        self.connection.action("CREATE INDEX IF NOT EXISTS idx_result_episodes ON result_episodes (provider, indexerid, season, episode);")
+        self.connection.action("CREATE INDEX IF NOT EXISTS idx_result_episodes_url ON result_episodes (url);")
+        self.connection.action("CREATE INDEX IF NOT EXISTS idx_results_proper ON results (provider, proper);")
+        self.connection.action(
+            "CREATE TRIGGER IF NOT EXISTS results_delete_episodes AFTER DELETE ON results BEGIN DELETE FROM result_episodes WHERE url = old.url; END;"
+        )
+
+        rows = self.connection.select("SELECT url, provider, indexerid, season, episodes FROM results")
+        self.connection.mass_action(
+            [
+                [
+                    "INSERT INTO result_episodes (url, provider, indexerid, season, episode) VALUES (?, ?, ?, ?, ?)",
+                    [row[0], row[1], row[2], row[3], int(episode)],
+                ]
+                for row in rows
+                for episode in (row[4] or "").split("|")
+                if episode.isdigit()
+            ]
+        )
+
+        # the proper strings of each provider, the same ones list_propers used to match
+        for provider in sickchill.settings.providerList:
+            proper_strings = {"PROPER", "REPACK"}
+            for item in getattr(provider, "proper_strings", None) or []:
+                proper_strings.update(item.split("|"))
+
+            # language=TEXT
+            self.connection.action(
+                "UPDATE results SET proper = 1 WHERE provider = ? AND ({})".format(" OR ".join(["name LIKE ?"] * len(proper_strings))),
+                [provider.get_id()] + [f"%.{proper_string}.%" for proper_string in sorted(proper_strings)],
+            )
+
+
+class UniqueResultEpisodes(ResultEpisodesTable):
+    """
+    Index each episode of a result once, a result written twice in one batch was indexed twice and found twice
+    """
+
+    def test(self):
+        return self.has_index("idx_result_episodes_unique")
+
+    def execute(self):
+        self.connection.action("DELETE FROM result_episodes WHERE rowid NOT IN (SELECT MIN(rowid) FROM result_episodes GROUP BY url, episode)")
+        self.connection.action("CREATE UNIQUE INDEX IF NOT EXISTS idx_result_episodes_unique ON result_episodes (url, episode);")
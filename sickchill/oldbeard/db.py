@@ -5,6 +5,9 @@ import threading
 import time
 import traceback
 import warnings
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
 from sqlite3 import OperationalError
 from typing import List
 
@@ -13,6 +16,152 @@ from sickchill import logger, settings
 db_cons = {}
 db_locks = {}
 
+# the lowest limit on the number of ? in one statement across the sqlite versions we support
+MAX_VARIABLES = 999
+
+# read only connections used by select when DATABASE_WAL is enabled, one per thread and database file
+db_readers = {}
+db_readers_lock = threading.Lock()
+
+
+class QueryStats(object):
+    """
+    Per database and normalized query counts, latency and rows, and the time spent waiting for the database locks
+
+    Only recorded while DATABASE_STATS is enabled. The first time a select, update or delete is seen its query plan is
+    checked, and queries that scan a whole table are flagged and logged.
+    """
+
+    SAMPLES = 1000
+
+    literal_regex = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+    placeholder_list_regex = re.compile(r"\?(?:\s*,\s*\?)+")
+    whitespace_regex = re.compile(r"\s+")
+    explain_regex = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE)\b", re.I)
+    full_scan_regex = re.compile(r"^SCAN (?:TABLE )?\S+$")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queries = {}
+        self.lock_waits = {}
+
+    @classmethod
+    def normalize(cls, query: str) -> str:
+        query = cls.whitespace_regex.sub(" ", query).strip()
+        query = cls.literal_regex.sub("?", query)
+        return cls.placeholder_list_regex.sub("?, ...", query)
+
+    def record(self, filename, query, seconds, rows, connection=None, args=None):
+        key = (filename, self.normalize(query))
+        with self.lock:
+            entry = self.queries.get(key)
+            if entry is None:
+                entry = self.queries[key] = {"count": 0, "time": 0.0, "rows": 0, "samples": deque(maxlen=self.SAMPLES), "plan": None, "full_scan": False}
+                check_plan = connection is not None and self.explain_regex.match(query)
+            else:
+                check_plan = False
+
+            entry["count"] += 1
+            entry["time"] += seconds
+            entry["rows"] += max(rows, 0)
+            entry["samples"].append(seconds)
+
+        if check_plan:
+            self.explain(entry, filename, query, connection, args)
+
+    def explain(self, entry, filename, query, connection, args=None):
+        # statistics must never break the query, and the plan is read as plain tuples whatever the row type of the connection is
+        try:
+            cursor = connection.cursor()
+            cursor.row_factory = None
+            plan = [row[-1] for row in cursor.execute("EXPLAIN QUERY PLAN " + query, args or [])]
+        except Exception as error:
+            logger.debug(_("{filename}: Unable to get the query plan of {query}: {error}").format(filename=filename, query=query, error=error))
+            return
+
+        with self.lock:
+            entry["plan"] = plan
+            entry["full_scan"] = any(self.full_scan_regex.match(step) for step in plan)
+
+        if entry["full_scan"]:
+            logger.debug(_("{filename}: Full table scan in {query}: {plan}").format(filename=filename, query=self.normalize(query), plan="; ".join(plan)))
+
+    def record_lock_wait(self, filename, seconds):
+        with self.lock:
+            entry = self.lock_waits.setdefault(filename, {"count": 0, "time": 0.0, "max": 0.0})
+            entry["count"] += 1
+            entry["time"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+
+    def reset(self):
+        with self.lock:
+            self.queries.clear()
+            self.lock_waits.clear()
+
+    @property
+    def stats(self):
+        with self.lock:
+            queries = []
+            for (filename, query), entry in self.queries.items():
+                samples = sorted(entry["samples"])
+                queries.append(
+                    {
+                        "database": filename,
+                        "query": query,
+                        "count": entry["count"],
+                        "total_time": round(entry["time"], 6),
+                        "mean_time": round(entry["time"] / entry["count"], 6),
+                        "p95_time": round(samples[int(len(samples) * 0.95)] if len(samples) > 1 else samples[0], 6),
+                        "rows": entry["rows"],
+                        "full_scan": entry["full_scan"],
+                        "plan": entry["plan"],
+                    }
+                )
+
+            lock_waits = {
+                filename: {"count": entry["count"], "total_time": round(entry["time"], 6), "max_time": round(entry["max"], 6)}
+                for filename, entry in self.lock_waits.items()
+            }
+
+        return {
+            "enabled": bool(settings.DATABASE_STATS),
+            "queries": sorted(queries, key=lambda query: query["total_time"], reverse=True),
+            "lock_waits": lock_waits,
+        }
+
+
+query_stats = QueryStats()
+
+
+class TableGenerations(object):
+    """
+    Counters bumped each time a write to a table is committed, so caches built from the tables can tell they are stale
+
+    The counters are per table name across the database files, a change to a table of the same name in another file only costs a cache miss.
+    """
+
+    write_regex = re.compile(r"^\s*(?:INSERT|UPDATE|DELETE|REPLACE)\b(?:\s+OR\s+\w+)?(?:\s+INTO|\s+FROM)?\s+[\[\"'`]?(\w+)", re.I)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.generations = {}
+
+    def changed(self, queries):
+        tables = {match.group(1).lower() for match in map(self.write_regex.match, queries) if match}
+        if tables:
+            self.bump(*tables)
+
+    def bump(self, *tables):
+        with self.lock:
+            for table in tables:
+                self.generations[table] = self.generations.get(table, 0) + 1
+
+    def get(self, *tables) -> tuple:
+        return tuple(self.generations.get(table, 0) for table in tables)
+
+
+table_generations = TableGenerations()
+
 
 def db_full_path(filename="sickchill.db", suffix=None):
     """
@@ -46,6 +195,7 @@ class DBConnection(object):
                 db_locks[self.filename] = threading.Lock()
 
                 self.connection = sqlite3.connect(self.full_path, 20, check_same_thread=False)
+                self._configure_connection(self.connection)
                 db_cons[self.filename] = self.connection
             else:
                 self.connection = db_cons[self.filename]
@@ -66,6 +216,80 @@ class DBConnection(object):
             self._error_log_helper(error, logger.ERROR, locals(), None, "DBConnection.__init__")
             raise
 
+    @staticmethod
+    def _configure_connection(connection, writer=True):
+        """
+        Apply the journal mode and cache pragmas to a new connection
+
+        With DATABASE_WAL the database is switched to write ahead logging so the read only connections of select don't
+        block behind writes, without it a database left in WAL mode is switched back to the default rollback journal.
+        """
+        if not settings.DATABASE_WAL:
+            if writer and connection.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal":
+                connection.execute("PRAGMA journal_mode=DELETE")
+            return
+
+        if writer:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+
+        connection.execute("PRAGMA cache_size=-{0:d}".format(settings.DATABASE_CACHE_SIZE * 1024))
+        connection.execute("PRAGMA mmap_size={0:d}".format(settings.DATABASE_MMAP_SIZE * 1024 * 1024))
+
+    def _reader(self, query):
+        """
+        Get the read only connection of this thread for a query
+
+        :param query: query string
+        :return: the connection, or None when the query has to use the shared connection
+        """
+        if not (settings.DATABASE_WAL and re.match(r"\s*(SELECT|WITH)\b", query, re.I)):
+            return None
+
+        key = (threading.get_ident(), self.full_path)
+        reader = db_readers.get(key)
+        if reader is None:
+            if not os.path.isfile(self.full_path):
+                return None
+
+            reader = sqlite3.connect(Path(self.full_path).as_uri() + "?mode=ro", 20, uri=True, check_same_thread=False)
+            self._configure_connection(reader, writer=False)
+            with db_readers_lock:
+                # close the connections of threads that have finished
+                alive = {thread.ident for thread in threading.enumerate()}
+                for dead in [other for other in db_readers if other[0] not in alive]:
+                    db_readers.pop(dead).close()
+                db_readers[key] = reader
+
+        reader.row_factory = self._row_factory()
+        return reader
+
+    def _read(self, query, args=None, fetchall=False, fetchone=False):
+        """
+        Run a select on the read only connection of this thread, falling back to the shared connection
+
+        :return: query results
+        """
+        reader = self._reader(query)
+        if reader is not None:
+            try:
+                if settings.DBDEBUG:
+                    logger.log(logger.DB, "{filename}: {query} with args {args}".format(filename=self.filename, query=query, args=args))
+
+                return self._execute(query, args, fetchall=fetchall, fetchone=fetchone, connection=reader)
+            except (sqlite3.OperationalError, sqlite3.DatabaseError) as error:
+                logger.debug(_("{filename}: read only query failed, retrying on the shared connection: {error}").format(filename=self.filename, error=error))
+
+        return self.action(query, args, fetchall=fetchall, fetchone=fetchone)
+
+    def checkpoint(self):
+        """
+        Write the pages of the write ahead log back to the database file, so it can be copied on its own
+        """
+        if settings.DATABASE_WAL:
+            with self._locked():
+                self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
     def _error_log_helper(self, exception, severity, local_variables, attempts, called_method):
         if attempts in (0, self.MAX_ATTEMPTS):  # Only log the first try and the final failure
             prefix = ("Database", "Fatal")[severity == logger.ERROR]
@@ -101,12 +325,27 @@ class DBConnection(object):
         once lock is acquired we can configure the connection for
         this particular instance of DBConnection
         """
+        self.connection.row_factory = self._row_factory()
+
+    def _row_factory(self):
         if self.row_type == "dict":
-            self.connection.row_factory = DBConnection._dict_factory
-        else:
-            self.connection.row_factory = sqlite3.Row
+            return DBConnection._dict_factory
+        return sqlite3.Row
+
+    @contextmanager
+    def _locked(self):
+        """Hold the lock of the database, recording the time spent waiting for it when DATABASE_STATS is enabled"""
+        if not settings.DATABASE_STATS:
+            with db_locks[self.filename]:
+                yield
+            return
+
+        start = time.perf_counter()
+        with db_locks[self.filename]:
+            query_stats.record_lock_wait(self.filename, time.perf_counter() - start)
+            yield
 
-    def _execute(self, query, args=None, fetchall=False, fetchone=False):
+    def _execute(self, query, args=None, fetchall=False, fetchone=False, connection=None):
         """
         Executes DB query
 
@@ -114,22 +353,33 @@ class DBConnection(object):
         :param args: Arguments in query
         :param fetchall: Boolean to indicate all results must be fetched
         :param fetchone: Boolean to indicate one result must be fetched (to walk results for instance)
+        :param connection: Connection to use instead of the shared one
         :return: query results
         """
+        connection = connection or self.connection
+        start = time.perf_counter() if settings.DATABASE_STATS else None
         try:
             if not args:
-                sql_results = self.connection.cursor().execute(query)
+                sql_results = connection.cursor().execute(query)
             else:
-                sql_results = self.connection.cursor().execute(query, args)
+                sql_results = connection.cursor().execute(query, args)
             if fetchall:
-                return sql_results.fetchall()
+                results = sql_results.fetchall()
+                rows = len(results)
             elif fetchone:
-                return sql_results.fetchone()
+                results = sql_results.fetchone()
+                rows = int(results is not None)
             else:
-                return sql_results
+                results = sql_results
+                rows = sql_results.rowcount
         except Exception:
             raise
 
+        if start is not None:
+            query_stats.record(self.filename, query, time.perf_counter() - start, rows, connection, args)
+
+        return results
+
     def get_db_version(self):
         """
         Fetch major database version
@@ -196,7 +446,7 @@ class DBConnection(object):
         sql_results = []
         attempt = 0
 
-        with db_locks[self.filename]:
+        with self._locked():
             self._set_row_factory()
             while attempt <= self.MAX_ATTEMPTS:
                 try:
@@ -211,6 +461,7 @@ class DBConnection(object):
                             logger.log(log_level, _("{filename}: {query} with args {args}").format(filename=self.filename, query=qu[0], args=qu[1]))
                             sql_results.append(self._execute(qu[0], qu[1], fetchall=fetchall))
                     self.connection.commit()
+                    table_generations.changed([qu[0] for qu in query_list])
                     # noinspection PyUnresolvedReferences
                     logger.log(log_level, _("Transaction with {count:d} of queries executed successfully").format(count=len(query_list)))
 
@@ -254,7 +505,7 @@ class DBConnection(object):
         sql_results = []
         attempt = 0
 
-        with db_locks[self.filename]:
+        with self._locked():
             self._set_row_factory()
             while attempt < self.MAX_ATTEMPTS:
                 try:
@@ -266,6 +517,7 @@ class DBConnection(object):
 
                     sql_results = self._execute(query, args, fetchall=fetchall, fetchone=fetchone)
                     self.connection.commit()
+                    table_generations.changed([query])
 
                     # get out of the connection attempt loop since we were successful
                     break
@@ -299,7 +551,7 @@ class DBConnection(object):
         :return: query results
         """
 
-        sql_results = self.action(query, args, fetchall=True)
+        sql_results = self._read(query, args, fetchall=True)
 
         if sql_results is None:
             return []
@@ -314,7 +566,7 @@ class DBConnection(object):
         :param args: arguments to query string
         :return: query results
         """
-        sql_results = self.action(query, args, fetchone=True)
+        sql_results = self._read(query, args, fetchone=True)
 
         if sql_results is None:
             return []
@@ -336,6 +588,82 @@ class DBConnection(object):
             logger.log(log_level, _("{filename}: {query} [{control}]").format(filename=self.filename, query=values, control=control))
             self.upsert(table_name, values, control)
 
+    def upsert_many(self, table_name, query_list, delete_list=None):
+        # type: (str, List[tuple], List[dict]) -> None
+        """
+        Update or insert many rows of a table in one transaction, using one executemany per statement
+
+        :param table_name: name of table to upsert
+        :param query_list: list of (value_dict, key_dict) tuples, all using the same columns
+        :param delete_list: list of key_dicts of rows to delete before upserting, all using the same columns
+        :return: None
+        """
+        query_list = [(value_dict, key_dict) for value_dict, key_dict in query_list if value_dict and key_dict]
+        delete_list = [key_dict for key_dict in delete_list or [] if key_dict]
+        if not (query_list or delete_list):
+            return
+
+        def make_string(columns, separator):
+            return separator.join(["{} = ?".format(x) for x in columns])
+
+        statements = []
+        if delete_list:
+            key_columns = list(delete_list[0])
+            # language=TEXT
+            query = "DELETE FROM [{table}] WHERE {control}".format(table=table_name, control=make_string(key_columns, " AND "))
+            statements.append((query, [[key_dict[column] for column in key_columns] for key_dict in delete_list]))
+
+        if query_list:
+            value_columns, key_columns = list(query_list[0][0]), list(query_list[0][1])
+            rows = [([value_dict[column] for column in value_columns], [key_dict[column] for column in key_columns]) for value_dict, key_dict in query_list]
+            assert None not in [value for values, keys in rows for value in keys], _("Control dict to upsert cannot have values of None!")
+
+            # language=TEXT
+            query = "UPDATE [{table}] SET {pairs} WHERE {control}".format(
+                table=table_name, pairs=make_string(value_columns, ", "), control=make_string(key_columns, " AND ")
+            )
+            statements.append((query, [values + keys for values, keys in rows]))
+
+            # language=TEXT
+            query = "INSERT INTO [{table}] ({columns}) SELECT {replacements} WHERE NOT EXISTS (SELECT 1 FROM [{table}] WHERE {control})".format(
+                table=table_name,
+                columns=", ".join(value_columns + key_columns),
+                replacements=", ".join(["?"] * (len(value_columns) + len(key_columns))),
+                control=make_string(key_columns, " AND "),
+            )
+            statements.append((query, [values + keys + keys for values, keys in rows]))
+
+        attempt = 0
+        with self._locked():
+            self._set_row_factory()
+            while attempt <= self.MAX_ATTEMPTS:
+                try:
+                    cursor = self.connection.cursor()
+                    for query, args in statements:
+                        logger.log(logger.DB, _("{filename}: {query} with {count:d} rows").format(filename=self.filename, query=query, count=len(args)))
+                        start = time.perf_counter()
+                        cursor.executemany(query, args)
+                        if settings.DATABASE_STATS:
+                            query_stats.record(self.filename, query, time.perf_counter() - start, cursor.rowcount)
+                    self.connection.commit()
+                    table_generations.bump(table_name.lower())
+                    break
+                except (sqlite3.OperationalError, sqlite3.DatabaseError) as error:
+                    if self.connection:
+                        self.connection.rollback()
+                    severity = (logger.ERROR, logger.WARNING)[self._is_locked_or_denied(error) and attempt < self.MAX_ATTEMPTS]
+                    self._error_log_helper(error, severity, locals(), attempt, "db.upsert_many")
+                    if severity == logger.ERROR:
+                        raise
+                    time.sleep(1)
+                except Exception as error:
+                    if self.connection:
+                        self.connection.rollback()
+                    self._error_log_helper(error, logger.ERROR, locals(), attempt, "db.upsert_many")
+                    raise
+
+                attempt += 1
+
     def upsert(self, table_name, value_dict, key_dict):
         """
         Update values, or if no updates done, insert values
@@ -38,6 +38,7 @@ from sickchill import adba, logger, settings
 from sickchill.helper import episode_num, pretty_file_size, SUBTITLE_EXTENSIONS
 from sickchill.helper.common import is_media_file, replace_extension, USER_AGENT
 from sickchill.show.Show import Show
+from sickchill.show.ShowList import ShowList
 
 from . import db
 
@@ -888,12 +889,15 @@ def get_show(name, try_indexers=False):
             show_object = Show.find(settings.show_list, int(cache))
         else:
             check_names = [full_sanitizeSceneName(name), name]
-            show_matches = [
-                show
-                for show in settings.show_list
-                if (show.show_name and full_sanitizeSceneName(show.show_name) in check_names)
-                or (show.custom_name and full_sanitizeSceneName(show.custom_name) in check_names)
-            ]
+            if isinstance(settings.show_list, ShowList):
+                show_matches = list({id(show): show for check_name in check_names for show in settings.show_list.by_scene_name(check_name)}.values())
+            else:
+                show_matches = [
+                    show
+                    for show in settings.show_list
+                    if (show.show_name and full_sanitizeSceneName(show.show_name) in check_names)
+                    or (show.custom_name and full_sanitizeSceneName(show.custom_name) in check_names)
+                ]
 
             if len(show_matches) == 1:
                 show_object = show_matches[0]
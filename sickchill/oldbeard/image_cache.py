@@ -9,7 +9,7 @@ from sickchill.helper.exceptions import ShowDirectoryNotFoundException
 from sickchill.providers.metadata.generic import GenericMetadata
 from sickchill.providers.metadata.helpers import getShowImage
 
-from . import helpers
+from . import db, helpers
 
 
 class ImageCache(object):
@@ -197,6 +197,11 @@ class ImageCache(object):
 
         return ""
 
+    @staticmethod
+    def changed():
+        """Tell the api response cache the cached images changed, they are written without a database write"""
+        db.table_generations.bump("image_cache")
+
     def _cache_image_from_file(self, image_path, img_type, indexer_id):
         """
         Takes the image provided and copies it to the cache folder
@@ -229,6 +234,7 @@ class ImageCache(object):
 
         logger.info(f"Copying from {image_path} to {dest_path}")
         helpers.copyFile(image_path, dest_path)
+        self.changed()
 
         return True
 
@@ -283,6 +289,8 @@ class ImageCache(object):
         # TODO: refactor
         img_data = getShowImage(img_url)
         result = metadata_generator._write_image(img_data, dest_path)
+        if result:
+            self.changed()
 
         return result
 
@@ -1,8 +1,10 @@
 import os
 import os.path
 import re
+import threading
 import time
 from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import date
 from operator import attrgetter
 from threading import Lock
@@ -11,13 +13,13 @@ from typing import Any, TYPE_CHECKING
 from dateutil.parser import parse
 
 import sickchill
-from sickchill import logger
+from sickchill import logger, settings
 from sickchill.helper.common import remove_extension
 from sickchill.oldbeard import common, db, helpers, scene_exceptions, scene_numbering
 from sickchill.oldbeard.name_parser import regexes
 
 if TYPE_CHECKING:
-    from typing import List
+    from typing import Tuple
 
     from sickchill.tv import TVShow
 
@@ -31,9 +33,10 @@ class NameParser(object):
         self.filename: bool = filename
         self.show_object: TVShow = show_object
         self.try_indexers: bool = try_indexers
-        self.compiled_regexes: List = []
+        self.compiled_regexes: Tuple = ()
 
         self.naming_pattern = naming_pattern
+        self.lookup: NumberingLookup = numbering_lookup
 
         if (self.show_object and not self.show_object.is_anime) or parse_method == "normal":
             self._compile_regexes(self.NORMAL_REGEX)
@@ -62,24 +65,7 @@ class NameParser(object):
         return series_name.strip()
 
     def _compile_regexes(self, regex_mode):
-        if regex_mode == self.ANIME_REGEX:
-            dbg_str = "ANIME"
-            uncompiled_regex = [regexes.anime_regexes]
-        elif regex_mode == self.NORMAL_REGEX:
-            dbg_str = "NORMAL"
-            uncompiled_regex = [regexes.normal_regexes]
-        else:
-            dbg_str = "ALL"
-            uncompiled_regex = [regexes.normal_regexes, regexes.anime_regexes]
-
-        for regexItem in uncompiled_regex:
-            for cur_pattern_num, (cur_pattern_name, cur_pattern) in enumerate(regexItem):
-                try:
-                    cur_regex = re.compile(cur_pattern, re.VERBOSE | re.I)
-                except re.error as error_message:
-                    logger.info(f"WARNING: Invalid episode_pattern using {dbg_str} regexes, {error_message}. {cur_pattern}")
-                else:
-                    self.compiled_regexes.append((cur_pattern_num, cur_pattern_name, cur_regex))
+        self.compiled_regexes = name_parser_regexes[regex_mode]
 
     def _parse_string(self, name, skip_scene_detection=False):
         if not name:
@@ -200,7 +186,7 @@ class NameParser(object):
             show = None
             if best_result and best_result.series_name and not self.naming_pattern:
                 # try and create a show object for this result
-                show = helpers.get_show(best_result.series_name, self.try_indexers)
+                show = self.lookup.get_show(best_result.series_name, self.try_indexers)
 
             # confirm passed in show object indexer id matches result show object indexer id
             if show:
@@ -226,19 +212,7 @@ class NameParser(object):
 
             # if we have an air-by-date show then get the real season/episode numbers
             if best_result.is_air_by_date:
-                airdate = best_result.air_date.toordinal()
-                main_db_con = db.DBConnection()
-                sql_result = main_db_con.select(
-                    "SELECT season, episode FROM tv_episodes WHERE showid = ? and indexer = ? and airdate = ?",
-                    [best_result.show.indexerid, best_result.show.indexer, airdate],
-                )
-
-                season_number = None
-                episode_numbers = []
-
-                if sql_result:
-                    season_number = int(sql_result[0][0])
-                    episode_numbers = [int(sql_result[0][1])]
+                season_number, episode_numbers = self.lookup.episodes_by_airdate(best_result.show, best_result.air_date)
 
                 if season_number is None or not episode_numbers:
                     try:
@@ -250,12 +224,11 @@ class NameParser(object):
                         logger.warning(f"Unable to find episode with date {best_result.air_date} for show {best_result.show.name}, skipping")
                         episode_numbers = []
 
-                for epNo in episode_numbers:
-                    s = season_number
-                    e = epNo
+                numbering = [(season_number, epNo) for epNo in episode_numbers]
+                if best_result.show.is_scene:
+                    numbering = self.lookup.indexer_numbering_many(best_result.show, numbering)
 
-                    if best_result.show.is_scene:
-                        (s, e) = scene_numbering.get_indexer_numbering(best_result.show.indexerid, best_result.show.indexer, season_number, epNo)
+                for s, e in numbering:
                     new_episode_numbers.append(e)
                     new_season_numbers.append(s)
 
@@ -265,25 +238,22 @@ class NameParser(object):
                     a = epAbsNo
 
                     if best_result.show.is_scene and not skip_scene_detection:
-                        a = scene_numbering.get_indexer_absolute_numbering(
-                            best_result.show.indexerid, best_result.show.indexer, epAbsNo, scene_season=best_result.scene_season
-                        )
+                        a = self.lookup.indexer_absolute_numbering(best_result.show, epAbsNo, scene_season=best_result.scene_season)
 
-                    (s, e) = helpers.get_all_episodes_from_absolute_number(best_result.show, [a])
+                    (s, e) = self.lookup.episodes_by_absolute_number(best_result.show, a)
 
                     new_absolute_numbers.append(a)
                     new_episode_numbers.extend(e)
                     new_season_numbers.append(s)
 
             elif best_result.season_number and best_result.episode_numbers:
-                for epNo in best_result.episode_numbers:
-                    s = best_result.season_number
-                    e = epNo
+                numbering = [(best_result.season_number, epNo) for epNo in best_result.episode_numbers]
+                if best_result.show.is_scene and not skip_scene_detection:
+                    numbering = self.lookup.indexer_numbering_many(best_result.show, numbering)
 
-                    if best_result.show.is_scene and not skip_scene_detection:
-                        (s, e) = scene_numbering.get_indexer_numbering(best_result.show.indexerid, best_result.show.indexer, best_result.season_number, epNo)
+                for s, e in numbering:
                     if best_result.show.is_anime:
-                        a = helpers.get_absolute_number_from_season_and_episode(best_result.show, s, e)
+                        a = self.lookup.absolute_number(best_result.show, s, e)
                         if a:
                             new_absolute_numbers.append(a)
 
@@ -316,8 +286,7 @@ class NameParser(object):
             if best_result.show.is_scene and not skip_scene_detection:
                 logger.debug(f"Converted parsed result {best_result.original_name} into {best_result}")
 
-        # CPU sleep
-        time.sleep(0.02)
+        parser_cpu_yield()
 
         return best_result
 
@@ -328,7 +297,7 @@ class NameParser(object):
             if anime_matches:
                 best_result_anime = max(sorted(anime_matches, reverse=True, key=attrgetter("which_regex")), key=attrgetter("score"))
                 if best_result_anime and best_result_anime.series_name:
-                    show_anime = helpers.get_show(best_result_anime.series_name)
+                    show_anime = self.lookup.get_show(best_result_anime.series_name)
                     if show_anime and show_anime.indexerid == show.indexerid:
                         best_result_anime.show = show_anime
                         best_result = best_result_anime
@@ -416,10 +385,58 @@ class NameParser(object):
         if self.naming_pattern:
             cache_result = False
 
-        cached = name_parser_cache[name]
+        # a name that fails without a show object can still parse with one, or by asking the indexers
+        cache_invalid = cache_result and settings.NAME_PARSER_CACHE_INVALID and not (self.show_object or self.try_indexers)
+
+        cached = name_parser_cache.get(name, invalid=cache_invalid)
+        if isinstance(cached, InvalidCacheEntry):
+            raise cached.error.with_traceback(None)
         if cached:
             return cached
 
+        try:
+            final_result = self._parse_name(name, skip_scene_detection)
+        except (InvalidNameException, InvalidShowException) as error:
+            if cache_invalid:
+                name_parser_cache.add_invalid(name, error)
+            raise
+
+        if cache_result:
+            name_parser_cache[name] = final_result
+
+        logger.debug(f"Parsed {name} into {final_result}")
+        return final_result
+
+    def parse_many(self, names, cache_result=True, skip_scene_detection=False):
+        """
+        Parse a page of release names in one call
+
+        Duplicate names are only parsed once. Show lookups are shared between names with the same series name and
+        each show's air dates, absolute and scene numbering are loaded once, the first time a name resolves to it,
+        instead of once per name.
+
+        :param names: release names to parse
+        :param cache_result: store the results in the name parser cache
+        :param skip_scene_detection: do not convert scene numbering
+        :return: dict of name to its ParseResult, or to the InvalidNameException/InvalidShowException it raised
+        """
+        results = {}
+        self.lookup = BatchNumberingLookup()
+        try:
+            for name in names:
+                if name in results:
+                    continue
+
+                try:
+                    results[name] = self.parse(name, cache_result=cache_result, skip_scene_detection=skip_scene_detection)
+                except (InvalidNameException, InvalidShowException) as error:
+                    results[name] = error
+        finally:
+            self.lookup = numbering_lookup
+
+        return results
+
+    def _parse_name(self, name, skip_scene_detection=False):
         # break it into parts if there are any (dirname, file name, extension)
         dir_name, filename = os.path.split(name)
 
@@ -489,13 +506,122 @@ class NameParser(object):
         ):
             raise InvalidNameException(f"Unable to parse {name} to a valid episode of {final_result.show.name}. Parser result: {final_result}")
 
-        if cache_result:
-            name_parser_cache[name] = final_result
-
-        logger.debug(f"Parsed {name} into {final_result}")
         return final_result
 
 
+class NumberingLookup(object):
+    """
+    Show and episode numbering lookups done while parsing, each one straight from the database
+    """
+
+    @staticmethod
+    def get_show(series_name, try_indexers=False):
+        return helpers.get_show(series_name, try_indexers)
+
+    @staticmethod
+    def episodes_by_airdate(show, air_date):
+        main_db_con = db.DBConnection()
+        sql_result = main_db_con.select(
+            "SELECT season, episode FROM tv_episodes WHERE showid = ? and indexer = ? and airdate = ?",
+            [show.indexerid, show.indexer, air_date.toordinal()],
+        )
+
+        if sql_result:
+            return int(sql_result[0][0]), [int(sql_result[0][1])]
+
+        return None, []
+
+    @staticmethod
+    def indexer_numbering(show, season, episode):
+        return scene_numbering.get_indexer_numbering(show.indexerid, show.indexer, season, episode)
+
+    @staticmethod
+    def indexer_numbering_many(show, episodes):
+        return scene_numbering.get_indexer_numbering_for_episodes(show.indexerid, show.indexer, episodes)
+
+    @staticmethod
+    def indexer_absolute_numbering(show, absolute_number, scene_season=None):
+        return scene_numbering.get_indexer_absolute_numbering(show.indexerid, show.indexer, absolute_number, scene_season=scene_season)
+
+    @staticmethod
+    def episodes_by_absolute_number(show, absolute_number):
+        return helpers.get_all_episodes_from_absolute_number(show, [absolute_number])
+
+    @staticmethod
+    def absolute_number(show, season, episode):
+        return helpers.get_absolute_number_from_season_and_episode(show, season, episode)
+
+
+numbering_lookup = NumberingLookup()
+
+
+class ShowNumberingTable(object):
+    """
+    The air dates and absolute numbers of one show needed by the parser, loaded with one tv_episodes query
+    """
+
+    def __init__(self, show):
+        self.airdates = {}
+        self.absolute_numbers = {}
+        self.by_absolute_number = {}
+
+        main_db_con = db.DBConnection()
+        sql_results = main_db_con.select(
+            "SELECT season, episode, absolute_number, airdate FROM tv_episodes WHERE showid = ? AND indexer = ?", [show.indexerid, show.indexer]
+        )
+        for row in sql_results:
+            season, episode = int(row["season"]), int(row["episode"])
+            self.airdates.setdefault(row["airdate"], (season, episode))
+            self.absolute_numbers[(season, episode)] = row["absolute_number"]
+            if season != 0 and row["absolute_number"]:
+                self.by_absolute_number.setdefault(row["absolute_number"], []).append((season, episode))
+
+
+class BatchNumberingLookup(NumberingLookup):
+    """
+    Lookups for NameParser.parse_many, answered from per show numbering tables and a series name to show map
+    that live as long as the batch, the scene numbering comes from the shared scene numbering tables
+    """
+
+    def __init__(self):
+        self.shows = {}
+        self.tables = {}
+
+    def get_show(self, series_name, try_indexers=False):
+        key = (series_name, try_indexers)
+        if key not in self.shows:
+            self.shows[key] = helpers.get_show(series_name, try_indexers)
+        return self.shows[key]
+
+    def _table(self, show) -> ShowNumberingTable:
+        key = (show.indexer, show.indexerid)
+        if key not in self.tables:
+            self.tables[key] = ShowNumberingTable(show)
+        return self.tables[key]
+
+    def episodes_by_airdate(self, show, air_date):
+        season, episode = self._table(show).airdates.get(air_date.toordinal(), (None, None))
+        return season, [episode] if episode is not None else []
+
+    def episodes_by_absolute_number(self, show, absolute_number):
+        if not (absolute_number and show.is_anime):
+            return NumberingLookup.episodes_by_absolute_number(show, absolute_number)
+
+        matches = self._table(show).by_absolute_number.get(absolute_number, [])
+        if len(matches) != 1:
+            return None, []
+
+        season, episode = matches[0]
+        return season, [episode]
+
+    def absolute_number(self, show, season, episode):
+        if not (season and episode):
+            return None
+
+        absolute_number = self._table(show).absolute_numbers.get((season, episode))
+        return int(absolute_number) if absolute_number is not None else None
+
+
 class ParseResult(object):
     def __init__(
         self,
@@ -596,29 +722,237 @@ class ParseResult(object):
         return bool(self.ab_episode_numbers)
 
 
+class InvalidCacheEntry(object):
+    """A cached InvalidNameException/InvalidShowException for a name, valid until it expires"""
+
+    __slots__ = ("error", "expires")
+
+    def __init__(self, error, expires):
+        self.error = error
+        self.expires = expires
+
+
 class NameParserCache(object):
-    def __init__(self):
+    """
+    LRU cache of parse results keyed by release name.
+
+    Hits move the entry to the end, inserts evict from the front once max_size (settings.NAME_PARSER_CACHE_SIZE)
+    is reached. Names that failed to parse can be cached too, they expire after INVALID_TTL seconds and are dropped
+    whenever a show is added, since that may make them parse.
+    """
+
+    INVALID_TTL = 900
+
+    def __init__(self, max_size=None):
         self.lock = Lock()
         self.data = OrderedDict()
-        self.max_size = 200
+        self._max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_size(self):
+        return self._max_size or settings.NAME_PARSER_CACHE_SIZE
+
+    @max_size.setter
+    def max_size(self, value):
+        self._max_size = value
 
     def __getitem__(self, name):
+        return self.get(name)
+
+    def get(self, name, invalid=True):
+        """
+        Get the cached parse result of a name, counting the lookup as a hit only when the entry can be used
+
+        :param invalid: return the cached failures too, otherwise they count as a miss
+        """
         with self.lock:
             value = self.data.get(name)
-            if value:
-                logger.debug(f"Using cached parse result for: {name}")
-            return value
+            if isinstance(value, InvalidCacheEntry) and value.expires < time.monotonic():
+                del self.data[name]
+                value = None
+            elif isinstance(value, InvalidCacheEntry) and not invalid:
+                value = None
+
+            if not value:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.data.move_to_end(name)
+
+        logger.debug(f"Using cached parse result for: {name}")
+        return value
 
     def __setitem__(self, key, value):
         with self.lock:
-            self.data.update({key: value})
+            self.data[key] = value
+            self.data.move_to_end(key)
             while len(self.data) > self.max_size:
-                self.data.pop(list(self.data)[0], None)
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def add_invalid(self, name, error):
+        self[name] = InvalidCacheEntry(error, time.monotonic() + self.INVALID_TTL)
+
+    def clear_invalid(self):
+        with self.lock:
+            for name in [name for name, value in self.data.items() if isinstance(value, InvalidCacheEntry)]:
+                del self.data[name]
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    @property
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.data),
+                "max_size": self.max_size,
+                "invalid": sum(isinstance(value, InvalidCacheEntry) for value in self.data.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
 
 
 name_parser_cache = NameParserCache()
 
 
+class NameParserRegexes(object):
+    """
+    Process-wide registry of compiled name parsing regexes.
+
+    Each regex mode (NORMAL, ANIME, ALL) is compiled once on first use and the resulting tuple
+    is shared by every NameParser instance, so creating a parser per RSS item is cheap.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.data = {}
+
+    def __getitem__(self, regex_mode):
+        compiled = self.data.get(regex_mode)
+        if compiled is None:
+            with self.lock:
+                compiled = self.data.get(regex_mode)
+                if compiled is None:
+                    compiled = self.data[regex_mode] = self._compile(regex_mode)
+        return compiled
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    @staticmethod
+    def _compile(regex_mode):
+        if regex_mode == NameParser.ANIME_REGEX:
+            dbg_str = "ANIME"
+            uncompiled_regex = [regexes.anime_regexes]
+        elif regex_mode == NameParser.NORMAL_REGEX:
+            dbg_str = "NORMAL"
+            uncompiled_regex = [regexes.normal_regexes]
+        else:
+            dbg_str = "ALL"
+            uncompiled_regex = [regexes.normal_regexes, regexes.anime_regexes]
+
+        compiled_regexes = []
+        for regexItem in uncompiled_regex:
+            for cur_pattern_num, (cur_pattern_name, cur_pattern) in enumerate(regexItem):
+                try:
+                    cur_regex = re.compile(cur_pattern, re.VERBOSE | re.I)
+                except re.error as error_message:
+                    logger.info(f"WARNING: Invalid episode_pattern using {dbg_str} regexes, {error_message}. {cur_pattern}")
+                else:
+                    compiled_regexes.append((cur_pattern_num, cur_pattern_name, cur_regex))
+
+        return tuple(compiled_regexes)
+
+
+name_parser_regexes = NameParserRegexes()
+
+
+class NameParserCPUYield(object):
+    """
+    Give up the CPU between parses, but only when the process is actually busy.
+
+    Process CPU time is compared with wall time over a short window. When the process used most
+    of a core (or the system load average is above the number of cores) each parse sleeps for a
+    small slice scaled by the CPU preset, otherwise parsing runs at full speed.
+    Post processing disables it for its thread with `parser_cpu_yield.disabled()`.
+    """
+
+    WINDOW = 1.0
+    BUSY_RATIO = 0.8
+    SLICE = 0.005
+
+    def __init__(self):
+        self.lock = Lock()
+        self.local = threading.local()
+        self.yields = 0
+        self.yield_time = 0.0
+        self.busy = False
+        self.window_start = time.perf_counter()
+        self.window_cpu = time.process_time()
+
+    @property
+    def enabled(self):
+        return settings.PARSER_CPU_YIELD and not getattr(self.local, "disabled", False)
+
+    @contextmanager
+    def disabled(self):
+        """Disable yielding in the current thread, for batch work like post processing"""
+        previous = getattr(self.local, "disabled", False)
+        self.local.disabled = True
+        try:
+            yield
+        finally:
+            self.local.disabled = previous
+
+    @staticmethod
+    def _load_contended():
+        try:
+            return os.getloadavg()[0] > (os.cpu_count() or 1)
+        except (AttributeError, OSError):
+            # getloadavg is not available on windows
+            return False
+
+    def _is_busy(self):
+        now = time.perf_counter()
+        with self.lock:
+            elapsed = now - self.window_start
+            if elapsed >= self.WINDOW:
+                cpu = time.process_time()
+                self.busy = (cpu - self.window_cpu) / elapsed >= self.BUSY_RATIO or self._load_contended()
+                self.window_start = now
+                self.window_cpu = cpu
+            return self.busy
+
+    def __call__(self):
+        if not self.enabled or not self._is_busy():
+            return
+
+        start = time.perf_counter()
+        time.sleep(self.SLICE * common.cpu_presets.get(settings.CPU_PRESET, common.cpu_presets["NORMAL"]))
+        with self.lock:
+            self.yields += 1
+            self.yield_time += time.perf_counter() - start
+
+    @property
+    def stats(self):
+        with self.lock:
+            return {"enabled": bool(settings.PARSER_CPU_YIELD), "busy": self.busy, "yields": self.yields, "yield_time": round(self.yield_time, 3)}
+
+
+parser_cpu_yield = NameParserCPUYield()
+
+
 class InvalidNameException(Exception):
     """The given release name is not valid"""
 
@@ -30,6 +30,7 @@ from sickchill.oldbeard.notifiers import (  # twilio_notify,
     trakt,
     tweet,
 )
+from sickchill.oldbeard.notifiers.dispatcher import LoggedErrorQueue, NotificationDispatcher
 
 # home theater / nas
 kodi_notifier = kodi.Notifier()
@@ -98,31 +99,35 @@ notifiers = [
 ]
 
 
+# sends the notifications on per service worker threads
+dispatcher = NotificationDispatcher()
+
+
 def notify_download(ep_name):
     for n in notifiers:
-        n.notify_download(ep_name)
+        dispatcher.submit(n, "notify_download", ep_name)
 
 
 def notify_postprocess(ep_name):
     for n in notifiers:
-        n.notify_postprocess(ep_name)
+        dispatcher.submit(n, "notify_postprocess", ep_name)
 
 
 def notify_subtitle_download(ep_name, lang):
     for n in notifiers:
-        n.notify_subtitle_download(ep_name, lang)
+        dispatcher.submit(n, "notify_subtitle_download", ep_name, lang)
 
 
 def notify_snatch(ep_name):
     for n in notifiers:
-        n.notify_snatch(ep_name)
+        dispatcher.submit(n, "notify_snatch", ep_name)
 
 
 def notify_update(new_version=""):
     if settings.NOTIFY_ON_UPDATE:
         for n in notifiers:
             if hasattr(n, "notify_update"):
-                n.notify_update(new_version)
+                dispatcher.submit(n, "notify_update", new_version)
             else:
                 print(n.__module__)
 
@@ -131,13 +136,34 @@ def notify_login(ipaddress):
     if settings.NOTIFY_ON_LOGIN and not helpers.is_ip_local(ipaddress):
         for n in notifiers:
             if hasattr(n, "notify_login"):
-                n.notify_login(ipaddress)
+                dispatcher.submit(n, "notify_login", ipaddress)
             else:
                 print(n.__module__)
 
 
+def update_library(episode_object):
+    """Update the media libraries with a post-processed episode, the scans of a show queued close together are sent once"""
+    show = episode_object.show
+    dispatcher.submit(kodi_notifier, "update_library", show.name, coalesce_key=show.indexerid)
+    dispatcher.submit(plex_notifier, "update_library", episode_object, coalesce_key=show.indexerid)
+    dispatcher.submit(emby_notifier, "update_library", show, coalesce_key=show.indexerid)
+    # nmj_notifier kicks off its library update when the notify_download is issued
+    dispatcher.submit(synoindex_notifier, "addFile", episode_object.location)
+    dispatcher.submit(pytivo_notifier, "update_library", episode_object)
+    dispatcher.submit(trakt_notifier, "update_library", episode_object)
+
+
+def send_logged_error(ui_error):
+    for n in notifiers:
+        if hasattr(n, "notify_logged_error"):
+            dispatcher.submit(n, "notify_logged_error", ui_error)
+
+
+# de-duplicates and rate limits the logged errors before sending them from a background thread
+logged_errors = LoggedErrorQueue(send_logged_error)
+
+
 def notify_logged_error(ui_error):
+    """Queue a logged error for the notifiers, this is called by the log formatter and must not block"""
     if settings.NOTIFY_ON_LOGGED_ERROR:
-        for n in notifiers:
-            if hasattr(n, "notify_logged_error"):
-                n.notify_logged_error(ui_error)
+        logged_errors.put(ui_error)
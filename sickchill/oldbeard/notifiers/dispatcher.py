@@ -0,0 +1,207 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from sickchill import logger, settings
+
+
+class NotificationDispatcher(object):
+    """
+    Send notifications on worker threads, so a slow service doesn't hold up the post-processor or the searches
+
+    Calls to disabled services are skipped without a thread. Each enabled service gets its own small pool, and library
+    updates queued with the same coalesce key while one is still waiting are sent once. Calls that raise are retried with a
+    backoff. The notifiers catch their own errors and return False, so that counts as failed without a retry. Delivery
+    latency is measured from the submit.
+    """
+
+    WORKERS = 2
+    RETRIES = 2
+    BACKOFF = 5
+    COALESCE_DELAY = 5
+    # the settings enabling the services not named USE_<SERVICE>
+    ENABLED_SETTINGS = {
+        "emailnotify": ("USE_EMAIL",),
+        "nmjv2": ("USE_NMJv2",),
+        "plex": ("USE_PLEX_SERVER", "USE_PLEX_CLIENT"),
+        "tweet": ("USE_TWITTER",),
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pools = {}
+        self.pending = {}
+        self.metrics = {}
+
+    @staticmethod
+    def service_name(notifier) -> str:
+        return notifier.__module__.rpartition(".")[2]
+
+    @classmethod
+    def enabled(cls, service: str) -> bool:
+        """Check the USE_ setting of a service, services without one are always enabled"""
+        return any(getattr(settings, name, True) for name in cls.ENABLED_SETTINGS.get(service, (f"USE_{service.upper()}",)))
+
+    def submit(self, notifier, method: str, *args, coalesce_key=None, **kwargs) -> Future:
+        """
+        Call a method of a notifier on the pool of its service, a disabled service gets a done future with None
+
+        :param coalesce_key: the call waits COALESCE_DELAY seconds and later calls with the same key are dropped until it starts
+        """
+        service = self.service_name(notifier)
+        if not self.enabled(service):
+            future = Future()
+            future.set_result(None)
+            return future
+
+        function = getattr(notifier, method)
+        submitted = time.perf_counter()
+
+        with self.lock:
+            metrics = self.metrics.setdefault(service, {"sent": 0, "failed": 0, "retries": 0, "coalesced": 0, "total_latency": 0.0, "max_latency": 0.0})
+            if coalesce_key is not None:
+                pending = self.pending.get((service, method, coalesce_key))
+                if pending is not None:
+                    metrics["coalesced"] += 1
+                    return pending
+
+            pool = self.pools.get(service)
+            if pool is None:
+                pool = self.pools[service] = ThreadPoolExecutor(max_workers=self.WORKERS, thread_name_prefix=f"NOTIFIER-{service.upper()}")
+
+            def deliver():
+                if coalesce_key is not None:
+                    time.sleep(self.COALESCE_DELAY)
+                    with self.lock:
+                        self.pending.pop((service, method, coalesce_key), None)
+
+                result = failed = None
+                for attempt in range(self.RETRIES + 1):
+                    if attempt:
+                        with self.lock:
+                            metrics["retries"] += 1
+                        time.sleep(self.BACKOFF * 2 ** (attempt - 1))
+                    try:
+                        result = function(*args, **kwargs)
+                        failed = None
+                        break
+                    except Exception as error:
+                        failed = error
+                        logger.debug(f"Notifier {service} {method} failed on attempt {attempt + 1}: {error}")
+
+                latency = time.perf_counter() - submitted
+                with self.lock:
+                    metrics["failed" if failed or result is False else "sent"] += 1
+                    metrics["total_latency"] += latency
+                    metrics["max_latency"] = max(metrics["max_latency"], latency)
+
+                if failed:
+                    logger.info(f"Could not send the {service} notification: {failed}")
+                return result
+
+            future = pool.submit(deliver)
+            if coalesce_key is not None:
+                self.pending[(service, method, coalesce_key)] = future
+            return future
+
+    @property
+    def stats(self) -> dict:
+        with self.lock:
+            stats = {}
+            for service, metrics in self.metrics.items():
+                delivered = metrics["sent"] + metrics["failed"]
+                stats[service] = dict(
+                    metrics,
+                    total_latency=round(metrics["total_latency"], 6),
+                    mean_latency=round(metrics["total_latency"] / delivered, 6) if delivered else 0.0,
+                    max_latency=round(metrics["max_latency"], 6),
+                )
+            return stats
+
+    def shutdown(self, wait: bool = False):
+        with self.lock:
+            pools = list(self.pools.values())
+            self.pools.clear()
+            self.pending.clear()
+
+        for pool in pools:
+            pool.shutdown(wait=wait)
+
+
+class LoggedErrorQueue(object):
+    """
+    Fan the logged errors out to the notifiers from a background thread, so logging never waits on the network
+
+    An error logged again within DUPLICATE_WINDOW seconds is dropped, at most RATE_LIMIT errors are sent every RATE_PERIOD
+    seconds and the queue drops errors when it already holds QUEUE_SIZE of them.
+    """
+
+    DUPLICATE_WINDOW = 600
+    RATE_LIMIT = 10
+    RATE_PERIOD = 60
+    QUEUE_SIZE = 100
+
+    def __init__(self, send):
+        self.send = send
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self.thread = None
+        self.last_seen = {}
+        self.sent = deque()
+        self.metrics = {"queued": 0, "duplicates": 0, "rate_limited": 0, "dropped": 0}
+
+    def put(self, ui_error) -> bool:
+        """Queue an error to send without blocking, returns False when it is dropped"""
+        now = time.monotonic()
+        with self.lock:
+            if len(self.last_seen) > self.QUEUE_SIZE:
+                self.last_seen = {message: seen for message, seen in self.last_seen.items() if now - seen < self.DUPLICATE_WINDOW}
+
+            seen = self.last_seen.get(ui_error.message)
+            if seen is not None and now - seen < self.DUPLICATE_WINDOW:
+                self.metrics["duplicates"] += 1
+                return False
+
+            while self.sent and now - self.sent[0] >= self.RATE_PERIOD:
+                self.sent.popleft()
+            if len(self.sent) >= self.RATE_LIMIT:
+                self.metrics["rate_limited"] += 1
+                return False
+
+            try:
+                self.queue.put_nowait(ui_error)
+            except queue.Full:
+                self.metrics["dropped"] += 1
+                return False
+
+            self.last_seen[ui_error.message] = now
+            self.sent.append(now)
+            self.metrics["queued"] += 1
+
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="NOTIFIER-LOGGED-ERRORS", daemon=True)
+                self.thread.start()
+        return True
+
+    def run(self):
+        while True:
+            ui_error = self.queue.get()
+            if ui_error is None:
+                break
+            try:
+                self.send(ui_error)
+            except Exception as error:
+                logger.debug(f"Could not send the logged error notifications: {error}")
+
+    @property
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(self.metrics, waiting=self.queue.qsize())
+
+    def shutdown(self):
+        with self.lock:
+            thread, self.thread = self.thread, None
+        if thread is not None:
+            self.queue.put(None)
@@ -1197,26 +1197,8 @@ class PostProcessor(object):
             # send notifications
             notifiers.notify_download(f"{episode_object.pretty_name} - {new_quality_string}")
 
-            # do the library update for KODI
-            notifiers.kodi_notifier.update_library(episode_object.show.name)
-
-            # do the library update for Plex
-            notifiers.plex_notifier.update_library(episode_object)
-
-            # do the library update for EMBY
-            notifiers.emby_notifier.update_library(episode_object.show)
-
-            # do the library update for NMJ
-            # nmj_notifier kicks off its library update when the notify_download is issued (inside notifiers)
-
-            # do the library update for Synology Indexer
-            notifiers.synoindex_notifier.addFile(episode_object.location)
-
-            # do the library update for pyTivo
-            notifiers.pytivo_notifier.update_library(episode_object)
-
-            # do the library update for Trakt
-            notifiers.trakt_notifier.update_library(episode_object)
+            # do the library updates for KODI, Plex, EMBY, Synology Indexer, pyTivo and Trakt
+            notifiers.update_library(episode_object)
         except Exception:
             logger.info(_("Some notifications could not be sent. Continuing with postProcessing..."))
 
@@ -1225,7 +1207,7 @@ class PostProcessor(object):
         # If any notification fails, don't stop postProcessor
         try:
             # send notifications
-            notifiers.email_notifier.notify_postprocess(f"{episode_object.pretty_name} - {new_quality_string}")
+            notifiers.dispatcher.submit(notifiers.email_notifier, "notify_postprocess", f"{episode_object.pretty_name} - {new_quality_string}")
         except Exception:
             logger.info(_("Some notifications could not be sent. Finishing postProcessing..."))
 
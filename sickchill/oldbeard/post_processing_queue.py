@@ -6,6 +6,7 @@ import traceback
 from sickchill import logger, settings
 
 from . import common, config, generic_queue
+from .name_parser.parser import parser_cpu_yield
 from .processTV import log_helper, process_dir
 
 MANUAL_POST_PROCESS = 120
@@ -222,16 +223,18 @@ class PostProcessorTask(generic_queue.QueueItem):
         # noinspection PyBroadException
         try:
             logger.info("Beginning {mode} post processing task: {info}".format(mode=self.mode, info=self.filename or self.directory))
-            self.last_result = process_dir(
-                process_path=self.directory,
-                release_name=self.filename,
-                process_method=self.method,
-                force=self.force,
-                is_priority=self.is_priority,
-                delete_on=self.delete,
-                failed=self.failed,
-                mode=self.mode,
-            )
+            # post processing is batch work, parse names as fast as possible
+            with parser_cpu_yield.disabled():
+                self.last_result = process_dir(
+                    process_path=self.directory,
+                    release_name=self.filename,
+                    process_method=self.method,
+                    force=self.force,
+                    is_priority=self.is_priority,
+                    delete_on=self.delete,
+                    failed=self.failed,
+                    mode=self.mode,
+                )
             logger.info("{mode} post processing task for {info} completed".format(mode=self.mode.title(), info=self.filename or self.directory))
 
             # give the CPU a break
@@ -71,12 +71,6 @@ class BinSearchCache(tvcache.TVCache):
         if not self.should_update():
             return
 
-        # clear cache
-        self._clear_cache()
-
-        # set updated
-        self.set_last_update()
-
         cl = []
         for group in ["alt.binaries.hdtv", "alt.binaries.hdtv.x264", "alt.binaries.tv", "alt.binaries.tvseries"]:
             search_params = {"max": 50, "g": group}
@@ -85,14 +79,9 @@ class BinSearchCache(tvcache.TVCache):
                 logger.debug("No data returned from provider")
                 continue
 
-            for item in data:
-                ci = self._parse_item(item)
-                if ci:
-                    cl.append(ci)
+            cl += self._parse_items(data)
 
-        if cl:
-            cache_db_con = self.get_db()
-            cache_db_con.mass_upsert("results", cl)
+        self._write_results(cl)
 
     def _check_auth(self, data):
         return data if data["feed"] and data["feed"]["title"] != "Invalid Link" else None
@@ -1,5 +1,7 @@
 import datetime
+import threading
 import time
+from operator import itemgetter
 from pathlib import Path
 
 import sickchill
@@ -11,6 +13,58 @@ from . import db, helpers
 exceptions_cache = {}
 
 
+class SceneExceptionNames(object):
+    """
+    The scene exceptions of every show, indexed by their lower case name and their sanitized name
+
+    Built from cache.db on the first lookup, and rebuilt after the scene exceptions change.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.names = None
+        self.sanitized_names = None
+
+    def invalidate(self):
+        with self.lock:
+            self.names = None
+            self.sanitized_names = None
+
+    @staticmethod
+    def _build():
+        names = {}
+        sanitized_names = {}
+
+        cache_db_con = db.DBConnection("cache.db")
+        for cur_exception in cache_db_con.select("SELECT show_name, indexer_id, season FROM scene_exceptions"):
+            exception = (int(cur_exception["indexer_id"]), int(cur_exception["season"]))
+            names.setdefault(cur_exception["show_name"].lower(), []).append(exception)
+            sanitized_name = helpers.sanitizeSceneName(cur_exception["show_name"]).lower().replace(".", " ")
+            sanitized_names.setdefault(sanitized_name, []).append(exception)
+
+        for exceptions in names.values():
+            exceptions.sort(key=itemgetter(1))
+
+        return names, sanitized_names
+
+    def lookup(self, show_name: str) -> list:
+        """
+        Find the scene exceptions matching a show name, exact (case insensitive) matches first
+
+        :param show_name: The show name to look up
+        :return: list of (indexer_id, season) tuples, empty if there is no exception
+        """
+        with self.lock:
+            if self.names is None:
+                self.names, self.sanitized_names = self._build()
+
+            show_name = show_name.lower()
+            return list(self.names.get(show_name) or self.sanitized_names.get(show_name, []))
+
+
+scene_exception_names = SceneExceptionNames()
+
+
 def should_refresh(exception_list):
     """
     Check if we should refresh cache for items in exception_list
@@ -143,26 +197,10 @@ def get_scene_exception_by_name_multiple(show_name):
     is present.
     """
 
-    # try the obvious case first
-    cache_db_con = db.DBConnection("cache.db")
-    exception_result = cache_db_con.select("SELECT indexer_id, season FROM scene_exceptions WHERE LOWER(show_name) = ? ORDER BY season", [show_name.lower()])
-    if exception_result:
-        return [(int(x["indexer_id"]), int(x["season"])) for x in exception_result]
-
-    out = []
-    all_exception_results = cache_db_con.select("SELECT show_name, indexer_id, season FROM scene_exceptions")
-
-    for cur_exception in all_exception_results:
-        cur_exception_name = cur_exception["show_name"]
-        cur_indexer_id = int(cur_exception["indexer_id"])
-
-        if show_name.lower() in (cur_exception_name.lower(), sickchill.oldbeard.helpers.sanitizeSceneName(cur_exception_name).lower().replace(".", " ")):
-            logger.debug(f"Scene exception lookup got indexer id {cur_indexer_id}, using that")
-
-            out.append((cur_indexer_id, int(cur_exception["season"])))
-
-    if out:
-        return out
+    exceptions = scene_exception_names.lookup(show_name)
+    if exceptions:
+        logger.debug(f"Scene exception lookup got indexer ids {[indexer_id for indexer_id, season in exceptions]}, using that")
+        return exceptions
 
     return [(None, None)]
 
@@ -205,6 +243,7 @@ def retrieve_exceptions():
                     )
     if queries:
         cache_db_con.mass_action(queries)
+        scene_exception_names.invalidate()
         main_db_con = db.DBConnection("sickchill.db")
         sql_ex = main_db_con.select("SELECT indexer_id FROM tv_shows")
         for result in sql_ex:
@@ -335,6 +374,8 @@ def _xem_exceptions_fetcher():
 
 
 def rebuild_exception_cache(indexer_id):
+    scene_exception_names.invalidate()
+
     cache_db_con = db.DBConnection("cache.db")
     results = cache_db_con.action("SELECT show_name, season FROM scene_exceptions WHERE indexer_id = ?", [indexer_id])
 
@@ -4,6 +4,7 @@
 # @copyright: Dermot Buckley
 #
 import datetime
+import threading
 import time
 import traceback
 
@@ -14,6 +15,142 @@ from sickchill.show.Show import Show
 from . import db
 from .scene_exceptions import xem_session
 
+MAX_XEM_REFRESH_AGE_SECS = 86400  # 1 day
+
+
+class SceneNumberingTable(object):
+    """
+    The scene numbering set by the user and the xem numbering of one show, in both directions, loaded with one query
+    """
+
+    def __init__(self, indexer_id, indexer, version=0):
+        self.version = version
+        self.loaded = time.time()
+
+        # indexer numbering to scene numbering
+        self.scene = {}
+        self.xem = {}
+        self.scene_absolute = {}
+        self.xem_absolute = {}
+
+        # scene numbering to indexer numbering
+        self.indexer = {}
+        self.indexer_xem = {}
+        self.indexer_absolute = {}
+        self.indexer_xem_absolute = {}
+
+        main_db_con = db.DBConnection()
+        sql_results = main_db_con.select(
+            "SELECT 1 AS custom, season, episode, absolute_number, scene_season, scene_episode, scene_absolute_number FROM scene_numbering WHERE indexer = ? and indexer_id = ? "
+            "UNION ALL SELECT 0 AS custom, season, episode, absolute_number, scene_season, scene_episode, scene_absolute_number FROM tv_episodes WHERE indexer = ? and showid = ?",
+            [indexer, indexer_id, indexer, indexer_id],
+        )
+
+        for row in sql_results:
+            if row["custom"]:
+                numbering, absolute_numbering, indexer_numbering, indexer_absolute_numbering = (
+                    self.scene,
+                    self.scene_absolute,
+                    self.indexer,
+                    self.indexer_absolute,
+                )
+            else:
+                numbering, absolute_numbering, indexer_numbering, indexer_absolute_numbering = (
+                    self.xem,
+                    self.xem_absolute,
+                    self.indexer_xem,
+                    self.indexer_xem_absolute,
+                )
+
+            if row["season"] is not None and row["episode"] is not None:
+                episode = (int(row["season"]), int(row["episode"]))
+                scene_episode = (row["scene_season"], row["scene_episode"])
+                if scene_episode[0] or scene_episode[1]:
+                    numbering.setdefault(episode, (int(scene_episode[0] or 0), int(scene_episode[1] or 0)))
+                indexer_numbering.setdefault(scene_episode, episode)
+
+            if row["absolute_number"] is not None:
+                if row["scene_absolute_number"]:
+                    absolute_numbering.setdefault(row["absolute_number"], int(row["scene_absolute_number"]))
+                indexer_absolute_numbering.setdefault((row["scene_absolute_number"], None), int(row["absolute_number"]))
+                indexer_absolute_numbering.setdefault((row["scene_absolute_number"], row["scene_season"]), int(row["absolute_number"]))
+
+    def scene_numbering(self, season, episode, fallback_to_xem=True):
+        """
+        :return: (int, int) the scene numbering of an episode, ``None`` if there is none
+        """
+        return self.scene.get((season, episode)) or (self.xem.get((season, episode)) if fallback_to_xem else None)
+
+    def scene_absolute_numbering(self, absolute_number, fallback_to_xem=True):
+        """
+        :return: int the scene absolute number of an episode, ``None`` if there is none
+        """
+        return self.scene_absolute.get(absolute_number) or (self.xem_absolute.get(absolute_number) if fallback_to_xem else None)
+
+    def indexer_numbering(self, scene_season, scene_episode, fallback_to_xem=True):
+        """
+        :return: (int, int) the indexer numbering of a scene numbered episode, the scene numbering if there is none
+        """
+        result = self.indexer.get((scene_season, scene_episode))
+        if result is None and fallback_to_xem:
+            result = self.indexer_xem.get((scene_season, scene_episode))
+        return result or (scene_season, scene_episode)
+
+    def indexer_absolute_numbering(self, scene_absolute_number, fallback_to_xem=True, scene_season=None):
+        """
+        :return: int the indexer absolute number of a scene numbered episode, the scene absolute number if there is none
+        """
+        result = self.indexer_absolute.get((scene_absolute_number, scene_season))
+        if result is None and fallback_to_xem:
+            result = self.indexer_xem_absolute.get((scene_absolute_number, scene_season))
+        return scene_absolute_number if result is None else result
+
+
+class SceneNumberingTables(object):
+    """
+    The numbering tables of the shows, loaded on first use and versioned so a table loaded while the numbering changes
+    is never kept
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tables = {}
+        self.versions = {}
+
+    def get(self, indexer_id, indexer) -> SceneNumberingTable:
+        key = (int(indexer_id), int(indexer))
+        table = self.tables.get(key)
+        if table and time.time() - table.loaded < MAX_XEM_REFRESH_AGE_SECS:
+            return table
+
+        # refreshing xem invalidates the table if the xem numbering changed
+        xem_refresh(*key)
+
+        with self.lock:
+            version = self.versions.get(key, 0)
+
+        table = SceneNumberingTable(*key, version=version)
+        with self.lock:
+            if self.versions.get(key, 0) == version:
+                self.tables[key] = table
+
+        return table
+
+    def invalidate(self, indexer_id, indexer):
+        key = (int(indexer_id), int(indexer))
+        with self.lock:
+            self.versions[key] = self.versions.get(key, 0) + 1
+            self.tables.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            for key in self.tables:
+                self.versions[key] = self.versions.get(key, 0) + 1
+            self.tables.clear()
+
+
+scene_numbering_tables = SceneNumberingTables()
+
 
 def get_scene_numbering(indexer_id, indexer, season, episode, fallback_to_xem=True):
     """
@@ -54,17 +191,7 @@ def find_scene_numbering(indexer_id, indexer, season, episode):
     if indexer_id is None or season is None or episode is None:
         return season, episode
 
-    indexer_id = int(indexer_id)
-    indexer = int(indexer)
-
-    main_db_con = db.DBConnection()
-    rows = main_db_con.select(
-        "SELECT scene_season, scene_episode FROM scene_numbering WHERE indexer = ? and indexer_id = ? and season = ? and episode = ? and (scene_season or scene_episode) != 0",
-        [indexer, indexer_id, season, episode],
-    )
-
-    if rows:
-        return int(rows[0]["scene_season"]), int(rows[0]["scene_episode"])
+    return scene_numbering_tables.get(indexer_id, indexer).scene_numbering(season, episode, fallback_to_xem=False)
 
 
 def get_scene_absolute_numbering(indexer_id, indexer, absolute_number, fallback_to_xem=True):
@@ -108,17 +235,7 @@ def find_scene_absolute_numbering(indexer_id, indexer, absolute_number):
     if indexer_id is None or absolute_number is None:
         return absolute_number
 
-    indexer_id = int(indexer_id)
-    indexer = int(indexer)
-
-    main_db_con = db.DBConnection()
-    rows = main_db_con.select(
-        "SELECT scene_absolute_number FROM scene_numbering WHERE indexer = ? and indexer_id = ? and absolute_number = ? and scene_absolute_number != 0",
-        [indexer, indexer_id, absolute_number],
-    )
-
-    if rows:
-        return int(rows[0]["scene_absolute_number"])
+    return scene_numbering_tables.get(indexer_id, indexer).scene_absolute_numbering(absolute_number, fallback_to_xem=False)
 
 
 def get_indexer_numbering(indexer_id, indexer, sceneSeason, sceneEpisode, fallback_to_xem=True):
@@ -129,21 +246,7 @@ def get_indexer_numbering(indexer_id, indexer, sceneSeason, sceneEpisode, fallba
     if indexer_id is None or sceneSeason is None or sceneEpisode is None:
         return sceneSeason, sceneEpisode
 
-    indexer_id = int(indexer_id)
-    indexer = int(indexer)
-
-    main_db_con = db.DBConnection()
-    rows = main_db_con.select(
-        "SELECT season, episode FROM scene_numbering WHERE indexer = ? and indexer_id = ? and scene_season = ? and scene_episode = ?",
-        [indexer, indexer_id, sceneSeason, sceneEpisode],
-    )
-
-    if rows:
-        return int(rows[0]["season"]), int(rows[0]["episode"])
-    else:
-        if fallback_to_xem:
-            return get_indexer_numbering_for_xem(indexer_id, indexer, sceneSeason, sceneEpisode)
-        return sceneSeason, sceneEpisode
+    return scene_numbering_tables.get(indexer_id, indexer).indexer_numbering(sceneSeason, sceneEpisode, fallback_to_xem)
 
 
 def get_indexer_absolute_numbering(indexer_id, indexer, sceneAbsoluteNumber, fallback_to_xem=True, scene_season=None):
@@ -154,27 +257,55 @@ def get_indexer_absolute_numbering(indexer_id, indexer, sceneAbsoluteNumber, fal
     if indexer_id is None or sceneAbsoluteNumber is None:
         return sceneAbsoluteNumber
 
-    indexer_id = int(indexer_id)
-    indexer = int(indexer)
+    return scene_numbering_tables.get(indexer_id, indexer).indexer_absolute_numbering(sceneAbsoluteNumber, fallback_to_xem, scene_season)
 
-    main_db_con = db.DBConnection()
-    if scene_season is None:
-        rows = main_db_con.select(
-            "SELECT absolute_number FROM scene_numbering WHERE indexer = ? and indexer_id = ? and scene_absolute_number = ?",
-            [indexer, indexer_id, sceneAbsoluteNumber],
-        )
-    else:
-        rows = main_db_con.select(
-            "SELECT absolute_number FROM scene_numbering WHERE indexer = ? and indexer_id = ? and scene_absolute_number = ? and scene_season = ?",
-            [indexer, indexer_id, sceneAbsoluteNumber, scene_season],
-        )
 
-    if rows:
-        return int(rows[0]["absolute_number"])
-    else:
-        if fallback_to_xem:
-            return get_indexer_absolute_numbering_for_xem(indexer_id, indexer, sceneAbsoluteNumber, scene_season)
-        return sceneAbsoluteNumber
+def get_scene_numbering_for_episodes(indexer_id, indexer, episodes, fallback_to_xem=True):
+    """
+    Bulk version of get_scene_numbering, the numbering table of the show is only looked up once
+
+    :param indexer_id: int
+    :param indexer: int
+    :param episodes: list of (season, episode) tuples
+    :param fallback_to_xem: bool If set (the default), check xem for matches if there is no local scene numbering
+    :return: list of (sceneSeason, sceneEpisode) tuples, in the same order as episodes
+    """
+    if indexer_id is None:
+        return list(episodes)
+
+    showObj = Show.find(settings.show_list, int(indexer_id))
+    if showObj and not showObj.is_scene:
+        return list(episodes)
+
+    table = scene_numbering_tables.get(indexer_id, indexer)
+    return [
+        table.scene_numbering(season, episode, fallback_to_xem) or (season, episode) if season is not None and episode is not None else (season, episode)
+        for season, episode in episodes
+    ]
+
+
+def get_indexer_numbering_for_episodes(indexer_id, indexer, scene_episodes, fallback_to_xem=True):
+    """
+    Bulk version of get_indexer_numbering, the numbering table of the show is only looked up once
+
+    :param indexer_id: int
+    :param indexer: int
+    :param scene_episodes: list of (sceneSeason, sceneEpisode) tuples
+    :param fallback_to_xem: bool If set (the default), check xem for matches if there is no local scene numbering
+    :return: list of (season, episode) tuples, in the same order as scene_episodes
+    """
+    if indexer_id is None:
+        return list(scene_episodes)
+
+    table = scene_numbering_tables.get(indexer_id, indexer)
+    return [
+        (
+            table.indexer_numbering(scene_season, scene_episode, fallback_to_xem)
+            if scene_season is not None and scene_episode is not None
+            else (scene_season, scene_episode)
+        )
+        for scene_season, scene_episode in scene_episodes
+    ]
 
 
 def set_scene_numbering(indexer_id, indexer, season=None, episode=None, absolute_number=None, sceneSeason=None, sceneEpisode=None, sceneAbsolute=None):
@@ -208,6 +339,8 @@ def set_scene_numbering(indexer_id, indexer, season=None, episode=None, absolute
             [sceneAbsolute, indexer, indexer_id, absolute_number],
         )
 
+    scene_numbering_tables.invalidate(indexer_id, indexer)
+
     # Reload data from DB so that cache and db are in sync
     show = Show.find(settings.show_list, indexer_id)
     show.flush_episodes()
@@ -227,19 +360,7 @@ def find_xem_numbering(indexer_id, indexer, season, episode):
     if indexer_id is None or season is None or episode is None:
         return season, episode
 
-    indexer_id = int(indexer_id)
-    indexer = int(indexer)
-
-    xem_refresh(indexer_id, indexer)
-
-    main_db_con = db.DBConnection()
-    rows = main_db_con.select(
-        "SELECT scene_season, scene_episode FROM tv_episodes WHERE indexer = ? and showid = ? and season = ? and episode = ? and (scene_season or scene_episode) != 0",
-        [indexer, indexer_id, season, episode],
-    )
-
-    if rows:
-        return int(rows[0]["scene_season"]), int(rows[0]["scene_episode"])
+    return scene_numbering_tables.get(indexer_id, indexer).xem.get((season, episode))
 
 
 def find_xem_absolute_numbering(indexer_id, indexer, absolute_number):
@@ -255,19 +376,7 @@ def find_xem_absolute_numbering(indexer_id, indexer, absolute_number):
     if indexer_id is None or absolute_number is None:
         return absolute_number
 
-    indexer_id = int(indexer_id)
-    indexer = int(indexer)
-
-    xem_refresh(indexer_id, indexer)
-
-    main_db_con = db.DBConnection()
-    rows = main_db_con.select(
-        "SELECT scene_absolute_number FROM tv_episodes WHERE indexer = ? and showid = ? and absolute_number = ? and scene_absolute_number != 0",
-        [indexer, indexer_id, absolute_number],
-    )
-
-    if rows:
-        return int(rows[0]["scene_absolute_number"])
+    return scene_numbering_tables.get(indexer_id, indexer).xem_absolute.get(absolute_number)
 
 
 def get_indexer_numbering_for_xem(indexer_id, indexer, sceneSeason, sceneEpisode):
@@ -283,21 +392,7 @@ def get_indexer_numbering_for_xem(indexer_id, indexer, sceneSeason, sceneEpisode
     if indexer_id is None or sceneSeason is None or sceneEpisode is None:
         return sceneSeason, sceneEpisode
 
-    indexer_id = int(indexer_id)
-    indexer = int(indexer)
-
-    xem_refresh(indexer_id, indexer)
-
-    main_db_con = db.DBConnection()
-    rows = main_db_con.select(
-        "SELECT season, episode FROM tv_episodes WHERE indexer = ? and showid = ? and scene_season = ? and scene_episode = ?",
-        [indexer, indexer_id, sceneSeason, sceneEpisode],
-    )
-
-    if rows:
-        return int(rows[0]["season"]), int(rows[0]["episode"])
-
-    return sceneSeason, sceneEpisode
+    return scene_numbering_tables.get(indexer_id, indexer).indexer_xem.get((sceneSeason, sceneEpisode), (sceneSeason, sceneEpisode))
 
 
 def get_indexer_absolute_numbering_for_xem(indexer_id, indexer, sceneAbsoluteNumber, scene_season=None):
@@ -313,26 +408,7 @@ def get_indexer_absolute_numbering_for_xem(indexer_id, indexer, sceneAbsoluteNum
     if indexer_id is None or sceneAbsoluteNumber is None:
         return sceneAbsoluteNumber
 
-    indexer_id = int(indexer_id)
-    indexer = int(indexer)
-
-    xem_refresh(indexer_id, indexer)
-
-    main_db_con = db.DBConnection()
-    if scene_season is None:
-        rows = main_db_con.select(
-            "SELECT absolute_number FROM tv_episodes WHERE indexer = ? and showid = ? and scene_absolute_number = ?", [indexer, indexer_id, sceneAbsoluteNumber]
-        )
-    else:
-        rows = main_db_con.select(
-            "SELECT absolute_number FROM tv_episodes WHERE indexer = ? and showid = ? and scene_absolute_number = ? and scene_season = ?",
-            [indexer, indexer_id, sceneAbsoluteNumber, scene_season],
-        )
-
-    if rows:
-        return int(rows[0]["absolute_number"])
-
-    return sceneAbsoluteNumber
+    return scene_numbering_tables.get(indexer_id, indexer).indexer_xem_absolute.get((sceneAbsoluteNumber, scene_season), sceneAbsoluteNumber)
 
 
 def get_scene_numbering_for_show(indexer_id, indexer):
@@ -471,13 +547,11 @@ def xem_refresh(indexer_id, indexer, force=False):
     indexer_id = int(indexer_id)
     indexer = int(indexer)
 
-    MAX_REFRESH_AGE_SECS = 86400  # 1 day
-
     main_db_con = db.DBConnection()
     rows = main_db_con.select("SELECT last_refreshed FROM xem_refresh WHERE indexer = ? and indexer_id = ?", [indexer, indexer_id])
     if rows:
         lastRefresh = int(rows[0]["last_refreshed"])
-        refresh = int(time.mktime(datetime.datetime.today().timetuple())) > lastRefresh + MAX_REFRESH_AGE_SECS
+        refresh = int(time.mktime(datetime.datetime.today().timetuple())) > lastRefresh + MAX_XEM_REFRESH_AGE_SECS
     else:
         refresh = True
 
@@ -555,6 +629,7 @@ def xem_refresh(indexer_id, indexer, force=False):
             if cl:
                 main_db_con = db.DBConnection()
                 main_db_con.mass_action(cl)
+                scene_numbering_tables.invalidate(indexer_id, indexer)
 
         except Exception as error:
             logger.warning(f"Exception while refreshing XEM data for show {indexer_id} on {sickchill.indexer.name(indexer)}: {error}")
@@ -667,3 +742,4 @@ def fix_xem_numbering(indexer_id, indexer):
     if cl:
         main_db_con = db.DBConnection()
         main_db_con.mass_action(cl)
+        scene_numbering_tables.invalidate(indexer_id, indexer)
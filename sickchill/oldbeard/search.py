@@ -3,7 +3,8 @@ import os
 import re
 import threading
 import traceback
-from typing import TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, TYPE_CHECKING
 
 import sickchill.oldbeard.name_cache
 import sickchill.oldbeard.providers
@@ -18,6 +19,9 @@ if TYPE_CHECKING:  # pragma: no cover
 from . import clients, common, db, helpers, notifiers, nzbget, nzbSplitter, sab, show_name_helpers, ui
 from .common import MULTI_EP_RESULT, Quality, SEASON_RESULT, SNATCHED, SNATCHED_BEST, SNATCHED_PROPER
 
+# the most providers refreshed or searched at the same time
+MAX_PROVIDER_THREADS = 8
+
 
 def _download_result(result: "SearchResult"):
     """
@@ -324,6 +328,33 @@ def wanted_episodes(show, from_date):
     return wanted
 
 
+def update_provider_caches(providers: list):
+    """
+    Refresh the rss caches of the providers concurrently, so one slow provider does not hold up the others
+
+    :param providers: providers to refresh
+    """
+    if not providers:
+        return
+
+    original_thread_name = threading.current_thread().name
+
+    def update_cache(provider):
+        thread = threading.current_thread()
+        pool_thread_name = thread.name
+        thread.name = f"{original_thread_name} :: [{provider.name}]"
+        try:
+            provider.cache.update_cache()
+        except Exception as error:
+            logger.exception(f"Error while updating the cache of {provider.name}, skipping: {error}")
+            logger.debug(traceback.format_exc())
+        finally:
+            thread.name = pool_thread_name
+
+    with ThreadPoolExecutor(max_workers=min(len(providers), MAX_PROVIDER_THREADS), thread_name_prefix=original_thread_name) as executor:
+        list(executor.map(update_cache, providers))
+
+
 def search_for_needed_episodes():
     """
     Check providers for details on wanted episodes
@@ -354,9 +385,7 @@ def search_for_needed_episodes():
     original_thread_name = threading.current_thread().name
 
     providers = [x for x in sickchill.oldbeard.providers.sorted_provider_list(settings.RANDOMIZE_PROVIDERS) if x.is_active and x.enable_daily and x.can_daily]
-    for curProvider in providers:
-        threading.current_thread().name = f"{original_thread_name} :: [{curProvider.name}]"
-        curProvider.cache.update_cache()
+    update_provider_caches(providers)
 
     for curProvider in providers:
         threading.current_thread().name = f"{original_thread_name} :: [{curProvider.name}]"
@@ -410,11 +439,6 @@ def search_providers(show, episodes, manual=False, downCurQuality=False):
     :param downCurQuality: Boolean, should we re-download currently available quality file
     :return: results for search
     """
-    found_results = {}
-    final_results = []
-
-    did_search = False
-
     # build name cache for show
     sickchill.oldbeard.name_cache.build_name_cache(show)
 
@@ -424,29 +448,62 @@ def search_providers(show, episodes, manual=False, downCurQuality=False):
     providers = [
         x for x in sickchill.oldbeard.providers.sorted_provider_list(settings.RANDOMIZE_PROVIDERS) if x.is_active and x.can_backlog and x.enable_backlog
     ]
-    for curProvider in providers:
-        threading.current_thread().name = f"{original_thread_name} :: [{curProvider.name}]"
-        curProvider.cache.update_cache()
+    update_provider_caches(providers)
+
+    searchable = [provider for provider in providers if not provider.anime_only or show.is_anime]
+    if len(searchable) > 1 and settings.PARALLEL_PROVIDER_SEARCH:
+        # search every provider at once, but still go through the results in provider order
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=min(len(searchable), MAX_PROVIDER_THREADS), thread_name_prefix=original_thread_name)
+        searches = {
+            provider: executor.submit(_search_provider, provider, show, episodes, manual, downCurQuality, original_thread_name, cancelled)
+            for provider in searchable
+        }
+    else:
+        cancelled = executor = None
+        searches = {}
 
-    threading.current_thread().name = original_thread_name
+    try:
+        return _search_providers(show, episodes, providers, searches, manual, downCurQuality, original_thread_name)
+    finally:
+        if executor:
+            # the search is over, drop the searches that did not start yet and skip the fallbacks of the running ones
+            cancelled.set()
+            executor.shutdown(wait=False, cancel_futures=True)
 
-    for curProvider in providers:
-        threading.current_thread().name = f"{original_thread_name} :: [{curProvider.name}]"
+        # Remove provider from thread name before return results
+        threading.current_thread().name = original_thread_name
 
-        if curProvider.anime_only and not show.is_anime:
-            logger.debug(f"{show.name} is not an anime, skipping")
-            continue
 
-        found_results[curProvider.name] = {}
+def _search_provider(provider, show, episodes, manual, downCurQuality, thread_name, cancelled=None) -> Tuple[bool, dict]:
+    """
+    Search a provider for the episodes, falling back to the other search mode if nothing is found
+
+    :param provider: Provider to search
+    :param show: Show we are looking for
+    :param episodes: Episodes we hope to find
+    :param manual: Boolean, is this a manual search?
+    :param downCurQuality: Boolean, should we re-download currently available quality file
+    :param thread_name: Name of the searching thread, the provider name is added to it while searching
+    :param cancelled: Event set once the results are no longer needed
+    :return: whether the provider was searched, and the results found for each episode
+    """
+    thread = threading.current_thread()
+    pool_thread_name = thread.name
+    thread.name = f"{thread_name} :: [{provider.name}]"
+
+    did_search = False
+    found_results = {}
 
-        search_count = 0
-        search_mode = curProvider.search_mode
+    search_count = 0
+    search_mode = provider.search_mode
 
-        # Always search for episode when manually searching when in season
-        if search_mode == "season" and manual is True:
-            search_mode = "episode"
+    # Always search for episode when manually searching when in season
+    if search_mode == "season" and manual is True:
+        search_mode = "episode"
 
-        while True:
+    try:
+        while not (cancelled and cancelled.is_set()):
             search_count += 1
 
             logger.info(
@@ -456,12 +513,12 @@ def search_providers(show, episodes, manual=False, downCurQuality=False):
             )
 
             try:
-                search_results = curProvider.find_search_results(show, episodes, search_mode, manual, downCurQuality)
+                search_results = provider.find_search_results(show, episodes, search_mode, manual, downCurQuality)
             except AuthException as error:
                 logger.warning(f"Authentication error: {error}")
                 break
             except Exception as error:
-                logger.exception(f"Exception while searching {curProvider.name}. Error: {error}")
+                logger.exception(f"Exception while searching {provider.name}. Error: {error}")
                 logger.debug(traceback.format_exc())
                 break
 
@@ -470,13 +527,13 @@ def search_providers(show, episodes, manual=False, downCurQuality=False):
             if search_results:
                 # make a list of all the results for this provider
                 for current_episode in search_results:
-                    if current_episode in found_results[curProvider.name]:
-                        found_results[curProvider.name][current_episode] += search_results[current_episode]
+                    if current_episode in found_results:
+                        found_results[current_episode] += search_results[current_episode]
                     else:
-                        found_results[curProvider.name][current_episode] = search_results[current_episode]
+                        found_results[current_episode] = search_results[current_episode]
 
                 break
-            elif search_count == 2 or not curProvider.search_fallback:
+            elif search_count == 2 or not provider.search_fallback:
                 break
 
             if search_mode == "season":
@@ -485,6 +542,37 @@ def search_providers(show, episodes, manual=False, downCurQuality=False):
             else:
                 logger.debug("Fallback season pack search initiate")
                 search_mode = "season"
+    finally:
+        thread.name = pool_thread_name
+
+    return did_search, found_results
+
+
+def _search_providers(show, episodes, providers, searches, manual, downCurQuality, original_thread_name):
+    """
+    Pick the results of the providers in order, until every episode has a final result
+
+    :param searches: Searches already running for the providers, the others are searched here
+    :return: results for search
+    """
+    found_results = {}
+    final_results = []
+
+    did_search = False
+
+    for curProvider in providers:
+        threading.current_thread().name = f"{original_thread_name} :: [{curProvider.name}]"
+
+        if curProvider.anime_only and not show.is_anime:
+            logger.debug(f"{show.name} is not an anime, skipping")
+            continue
+
+        if curProvider in searches:
+            provider_searched, found_results[curProvider.name] = searches[curProvider].result()
+        else:
+            provider_searched, found_results[curProvider.name] = _search_provider(curProvider, show, episodes, manual, downCurQuality, original_thread_name)
+
+        did_search |= provider_searched
 
         # skip to next provider if we have no results to process
         if not found_results[curProvider.name]:
@@ -540,9 +628,6 @@ def search_providers(show, episodes, manual=False, downCurQuality=False):
                         episode_objects.append(show.get_episode(season, episode_number))
                 best_season_result.episodes = episode_objects
 
-                # Remove provider from thread name before return results
-                threading.current_thread().name = original_thread_name
-
                 return [best_season_result]
 
             elif not some_wanted:
@@ -676,6 +761,4 @@ def search_providers(show, episodes, manual=False, downCurQuality=False):
     if not did_search:
         logger.info("No NZB/Torrent providers found or enabled in the sickchill config for backlog searches. Please check your settings.")
 
-    # Remove provider from thread name before return results
-    threading.current_thread().name = original_thread_name
     return final_results
@@ -25,6 +25,7 @@ from . import generic_queue, name_cache, notifiers, scene_numbering, ui
 from .blackandwhitelist import BlackAndWhiteList
 from .common import WANTED
 from .helpers import chmodAsParent, makeDir, sortable_name
+from .name_parser.parser import name_parser_cache
 
 
 class ShowQueue(generic_queue.GenericQueue):
@@ -496,7 +497,7 @@ class QueueItemAdd(ShowQueueItem):
             settings.show_list.append(self.show)
 
         # Presort show_list, so we don't have to do it every page load
-        settings.show_list = sorted(settings.show_list, key=attrgetter("sort_name"))
+        settings.show_list.sort(key=attrgetter("sort_name"))
 
         try:
             self.show.load_episodes_from_indexer(force_all=True)
@@ -506,6 +507,8 @@ class QueueItemAdd(ShowQueueItem):
 
         # update internal name cache
         name_cache.build_name_cache(self.show)
+        # names that did not match a show before might match this one now
+        name_parser_cache.clear_invalid()
 
         try:
             self.show.load_episodes_from_dir()
@@ -670,31 +673,33 @@ class QueueItemUpdate(ShowQueueItem):
         # get episode list from DB
         database_episodes = self.show.load_episodes_from_db()
 
-        # get episode list from TVDB
-        logger.debug(f"Loading all episodes from {self.show.idxr.name}")
-        try:
-            indexer_episodes = self.show.load_episodes_from_indexer(self.force)
-        except Exception as error:
-            logger.exception(f"Unable to get info from {self.show.idxr.name}, the show info will not be refreshed: {error}")
-            indexer_episodes = dict()
-
-        for season in indexer_episodes:
-            for episode in indexer_episodes[season]:
-                self.show.get_episode(season, episode).save_to_db()
-                if season in database_episodes and episode in database_episodes[season]:
-                    del database_episodes[season][episode]
-
-        if indexer_episodes:
-            # remaining episodes in the database list are not on the indexer, just delete them from the DB
-            # TODO: database: maybe add a "marked for deletion" column to the database, and when we delete an episode just mark it and do the actual deletion after a few days.
-            #  episodes marked for deletion can be hidden from the ui, but we wont lose downloaded files for episodes that are then brought back and they wont be sent to download again?
-            for season in database_episodes:
-                for episode in database_episodes[season]:
-                    logger.info("Permanently deleting episode {0:02d}E{1:02d} from the database".format(season, episode))
-                    try:
-                        self.show.get_episode(season, episode).delete_episode()
-                    except EpisodeDeletedException:
-                        pass
+        # write the episodes of the show in one transaction
+        with self.show.batch_episode_writes():
+            # get episode list from TVDB
+            logger.debug(f"Loading all episodes from {self.show.idxr.name}")
+            try:
+                indexer_episodes = self.show.load_episodes_from_indexer(self.force)
+            except Exception as error:
+                logger.exception(f"Unable to get info from {self.show.idxr.name}, the show info will not be refreshed: {error}")
+                indexer_episodes = dict()
+
+            for season in indexer_episodes:
+                for episode in indexer_episodes[season]:
+                    self.show.get_episode(season, episode).save_to_db()
+                    if season in database_episodes and episode in database_episodes[season]:
+                        del database_episodes[season][episode]
+
+            if indexer_episodes:
+                # remaining episodes in the database list are not on the indexer, just delete them from the DB
+                # TODO: database: maybe add a "marked for deletion" column to the database, and when we delete an episode just mark it and do the actual deletion after a few days.
+                #  episodes marked for deletion can be hidden from the ui, but we wont lose downloaded files for episodes that are then brought back and they wont be sent to download again?
+                for season in database_episodes:
+                    for episode in database_episodes[season]:
+                        logger.info("Permanently deleting episode {0:02d}E{1:02d} from the database".format(season, episode))
+                        try:
+                            self.show.get_episode(season, episode).delete_episode()
+                        except EpisodeDeletedException:
+                            pass
 
         #  save show again, in case episodes have changed
         try:
@@ -1,6 +1,6 @@
 import datetime
-import itertools
 import re
+import threading
 import time
 import traceback
 from urllib.parse import urlparse
@@ -18,6 +18,8 @@ from .databases import cache
 from .name_parser.parser import InvalidNameException, InvalidShowException, NameParser
 
 provider_cache_db = {}
+# providers refresh their caches concurrently, only one of them writes to the cache database at a time
+cache_write_lock = threading.RLock()
 
 
 class RSSTorrentMixin:
@@ -182,11 +184,14 @@ class TVCache(RSSTorrentMixin):
         self.provider_db = None
         self.min_time = kwargs.pop("min_time", 10)
         self.search_params = kwargs.pop("search_params", dict(RSS=[""]))
+        self._proper_regex = None
 
     def get_db(self):
         # init provider database if not done already
         if not provider_cache_db.get("instance"):
-            provider_cache_db["instance"] = CacheDBConnection()
+            with cache_write_lock:
+                if not provider_cache_db.get("instance"):
+                    provider_cache_db["instance"] = CacheDBConnection()
 
         return provider_cache_db.get("instance")
 
@@ -218,21 +223,7 @@ class TVCache(RSSTorrentMixin):
         try:
             data = self._get_rss_data()
             if self._check_auth(data):
-                # clear cache
-                self._clear_cache()
-
-                # set updated
-                self.set_last_update()
-
-                cl = []
-                for item in data["entries"] or []:
-                    ci = self._parse_item(item)
-                    if ci:
-                        cl.append(ci)
-
-                if cl:
-                    cache_db_con = self.get_db()
-                    cache_db_con.mass_upsert("results", cl)
+                self._write_results(self._parse_items(data["entries"] or []))
 
         except AuthException as error:
             logger.warning(f"Authentication error: {error}")
@@ -240,6 +231,51 @@ class TVCache(RSSTorrentMixin):
             logger.debug(f"Error while searching {self.provider.name}, skipping: {error}")
             logger.debug(traceback.format_exc())
 
+    def _write_results(self, cl):
+        """
+        Replace the cached results of this provider
+
+        :param cl: The upsert queries for the new results
+        """
+        with cache_write_lock:
+            # clear cache
+            self._clear_cache()
+
+            # set updated
+            self.set_last_update()
+
+            if cl:
+                self.add_results(cl)
+
+    def add_results(self, query_list):
+        """
+        Update or insert provider results, and index them by episode
+
+        :param query_list: list of (value_dict, key_dict) tuples from TVCache.add_cache_entry
+        """
+        # a url found by more than one search string is written once, with its last entry
+        query_list = list({item[0]["url"]: item for item in query_list if item}.values())
+        if not query_list:
+            return
+
+        # the results and their episode index are written together so a trim can't delete a result in between
+        with cache_write_lock:
+            cache_db_con = self.get_db()
+            cache_db_con.upsert_many("results", query_list)
+
+            # the rows of a result in the episode index are replaced whenever the result is written
+            cl = [["DELETE FROM result_episodes WHERE url = ?", [values["url"]]] for values, control in query_list]
+            for values, control in query_list:
+                for episode in values["episodes"].split("|"):
+                    if episode.isdigit():
+                        cl.append(
+                            [
+                                "INSERT OR IGNORE INTO result_episodes (url, provider, indexerid, season, episode) VALUES (?, ?, ?, ?, ?)",
+                                [values["url"], values["provider"], values["indexerid"], values["season"], int(episode)],
+                            ]
+                        )
+            cache_db_con.mass_action(cl)
+
     def get_rss_feed(self, url, params=None):
         if self.provider.login():
             return self.getFeed(url, params=params, request_hook=self.provider.get_url, size_units=self.provider.size_units)
@@ -254,21 +290,47 @@ class TVCache(RSSTorrentMixin):
         return url.replace("&amp;", "&")
 
     def _parse_item(self, item):
+        """
+        Get the title, url, size, seeders and leechers of a feed item
+
+        :param item: feed item
+        :return: the cache entry fields, or None when the item is incomplete
+        """
         title, url = self._get_title_and_url(item)
+        if not (title and url):
+            logger.debug("The data returned from the " + self.provider.name + " feed is incomplete, this result is unusable")
+            return None
+
         size = self._get_size(item)
         seeders, leechers = self._get_seeders_and_leechers(item)
+        return self._translate_title(title), self._translate_link_url(url), size, seeders, leechers
 
-        if title and url:
-            title = self._translate_title(title)
-            url = self._translate_link_url(url)
+    def _parse_items(self, items):
+        """
+        Turn a page of feed items into cache entries, parsing all the titles with one NameParser.parse_many call
 
-            # logger.debug("Attempting to add item to cache: " + title)
-            return self.add_cache_entry(title, url, size, seeders, leechers)
+        :param items: feed items
+        :return: list of cache entries for add_results
+        """
+        entries = [entry for entry in (self._parse_item(item) for item in items) if entry]
 
-        else:
-            logger.debug("The data returned from the " + self.provider.name + " feed is incomplete, this result is unusable")
+        parse_results = NameParser().parse_many([entry[0] for entry in entries])
+
+        cl = []
+        for title, url, size, seeders, leechers in entries:
+            parse_result = parse_results[title]
+            if isinstance(parse_result, (InvalidNameException, InvalidShowException)):
+                logger.debug(f"{parse_result}")
+                continue
+
+            if not parse_result or not parse_result.series_name:
+                continue
+
+            ci = self.add_cache_entry(title, url, size, seeders, leechers, parse_result=parse_result)
+            if ci:
+                cl.append(ci)
 
-        return False
+        return cl
 
     @property
     def last_update(self):
@@ -360,7 +422,7 @@ class TVCache(RSSTorrentMixin):
 
         if season and episodes:
             # store episodes as a separated string
-            episode_text = "|" + "|".join({str(episode) for episode in sorted(episodes) if episode}) + "|"
+            episode_text = "|" + "|".join(str(episode) for episode in sorted(set(episodes)) if episode) + "|"
 
             # get the current timestamp
             cur_timestamp = int(time.mktime(datetime.datetime.today().timetuple()))
@@ -390,65 +452,101 @@ class TVCache(RSSTorrentMixin):
                     "seeders": seeders,
                     "leechers": leechers,
                     "size": size,
+                    "proper": int(self.is_proper(name)),
                 },
                 {"url": url},
             )
 
+    def is_proper(self, name):
+        """
+        Check a release name for the proper strings of the provider, stored with the result so list_propers can use an index
+
+        :param name: release name
+        :return: True if the name is a proper
+        """
+        if self._proper_regex is None:
+            proper_strings = {"PROPER", "REPACK"}
+            for item in getattr(self.provider, "proper_strings", None) or []:
+                proper_strings.update(item.split("|"))
+            self._proper_regex = re.compile(r"\.(?:{})\.".format("|".join(re.escape(item) for item in sorted(proper_strings))), re.I)
+
+        return bool(self._proper_regex.search(name))
+
+    def _find_results_for_episodes(self, episodes):
+        """
+        Get the cached results of the provider for many episodes, with as few queries as the sqlite variable limit allows
+
+        :param episodes: list of TVEpisode, results are only returned in the wanted qualities of their episode
+        :return: list of result rows, a result is returned once for each episode it matches
+        """
+        sql_results = []
+        cache_db_con = self.get_db()
+        chunk_size = db.MAX_VARIABLES // 3 - 1
+        for index in range(0, len(episodes), chunk_size):
+            chunk = episodes[index : index + chunk_size]
+            wanted_qualities = {(episode.show.indexerid, episode.season, episode.episode): set(episode.wantedQuality) for episode in chunk}
+
+            sql_args = [value for wanted in wanted_qualities for value in wanted] + [self.provider_id]
+
+            # language=TEXT
+            rows = cache_db_con.select(
+                "WITH wanted (indexerid, season, episode) AS (VALUES {}) "
+                "SELECT results.*, wanted.indexerid AS wanted_indexerid, wanted.season AS wanted_season, wanted.episode AS wanted_episode "
+                "FROM wanted JOIN result_episodes ON result_episodes.provider = ? AND result_episodes.indexerid = wanted.indexerid "
+                "AND result_episodes.season = wanted.season AND result_episodes.episode = wanted.episode "
+                "JOIN results ON results.url = result_episodes.url".format(", ".join(["(?, ?, ?)"] * len(wanted_qualities))),
+                sql_args,
+            )
+
+            sql_results += [
+                row
+                for row in rows
+                if try_int(row["quality"], None) in wanted_qualities[(int(row["wanted_indexerid"]), int(row["wanted_season"]), int(row["wanted_episode"]))]
+            ]
+
+        return sql_results
+
     def search_cache(self, episode, manual_search=False, down_cur_quality=False):
         needed_eps = self.find_needed_episodes(episode, manual_search, down_cur_quality)
         return needed_eps.get(episode, [])
 
     def list_propers(self, date=None):
         cache_db_con = self.get_db()
-        sql = "SELECT * FROM results WHERE provider = ? AND name LIKE '%.PROPER.%' OR name LIKE '%.REPACK.%'"
-        # Add specific provider proper_strings also, like REAL, RERIP, etc.
-        if hasattr(self.provider, "proper_strings"):
-            if self.provider.proper_strings:
-                for item in self.provider.proper_strings:
-                    if "|" in item:
-                        items = item.split("|")
-                        for _item in items:
-                            if _item.upper() not in sql:
-                                sql += " OR name LIKE '%.{}.%'".format(_item)
-                    elif item.upper() not in sql:
-                        sql += " OR name LIKE '%.{}.%'".format(item)
+        # the proper strings of the provider, like REAL, RERIP, etc. were matched when the result was cached
+        sql = "SELECT * FROM results WHERE provider = ? AND proper = 1"
+        sql_args = [self.provider_id]
 
         if date is not None:
-            sql += " AND time >= " + str(int(time.mktime(date.timetuple())))
+            sql += " AND time >= ?"
+            sql_args.append(int(time.mktime(date.timetuple())))
 
-        propers_results = cache_db_con.select(sql, [self.provider_id])
+        propers_results = cache_db_con.select(sql, sql_args)
         return [x for x in propers_results if x["indexerid"]]
 
     def find_needed_episodes(self, episode, manual_search=False, down_cur_quality=False):
         needed_eps = {}
-        cl = []
 
         cache_db_con = self.get_db()
         if not episode:
             sql_results = cache_db_con.select("SELECT * FROM results WHERE provider = ?", [self.provider_id])
         elif not isinstance(episode, list):
             sql_results = cache_db_con.select(
-                "SELECT * FROM results WHERE provider = ? AND indexerid = ? AND season = ? AND episodes LIKE ?",
-                [self.provider_id, episode.show.indexerid, episode.season, "%|" + str(episode.episode) + "|%"],
+                "SELECT results.* FROM result_episodes JOIN results ON results.url = result_episodes.url "
+                "WHERE result_episodes.provider = ? AND result_episodes.indexerid = ? AND result_episodes.season = ? AND result_episodes.episode = ?",
+                [self.provider_id, episode.show.indexerid, episode.season, episode.episode],
             )
         else:
-            for episode_object in episode:
-                cl.append(
-                    [
-                        "SELECT * FROM results WHERE provider = ? AND indexerid = ? AND season = ? AND episodes LIKE ? AND quality IN ("
-                        + ",".join([str(x) for x in episode_object.wantedQuality])
-                        + ")",
-                        [self.provider_id, episode_object.show.indexerid, episode_object.season, "%|" + str(episode_object.episode) + "|%"],
-                    ]
-                )
-
-            sql_results = cache_db_con.mass_action(cl, fetchall=True)
-            sql_results = list(itertools.chain(*sql_results))
+            sql_results = self._find_results_for_episodes(episode)
+
+        shows = {}
 
         # for each cache entry
         for cur_result in sql_results:
             # get the show object, or if it's not one of our shows then ignore it
-            show_obj = Show.find(settings.show_list, int(cur_result["indexerid"]))
+            indexerid = int(cur_result["indexerid"])
+            if indexerid not in shows:
+                shows[indexerid] = Show.find(settings.show_list, indexerid)
+            show_obj = shows[indexerid]
             if not show_obj:
                 continue
 
@@ -193,15 +193,16 @@ class GenericProvider(object):
 
         cache_list = []
 
+        parse_results = NameParser(parse_method=("normal", "anime")[show.is_anime]).parse_many([self._get_title_and_url(item)[0] for item in items_list])
+
         for item in items_list:
             title, url = self._get_title_and_url(item)
             seeders, leechers = self._get_seeders_and_leechers(item)
             size = self._get_size(item)
 
-            try:
-                parse_result = NameParser(parse_method=("normal", "anime")[show.is_anime]).parse(title)
-            except (InvalidNameException, InvalidShowException) as error:
-                logger.debug(f"{error}")
+            parse_result = parse_results[title]
+            if isinstance(parse_result, (InvalidNameException, InvalidShowException)):
+                logger.debug(f"{parse_result}")
                 continue
 
             show_object = parse_result.show
@@ -322,9 +323,7 @@ class GenericProvider(object):
                 results[episode_number].append(result)
 
         if cache_list:
-            # Access to a protected member of a client class
-            cache_db = self.cache.get_db()
-            cache_db.mass_upsert("results", cache_list)
+            self.cache.add_results(cache_list)
 
         return results
 
@@ -6,6 +6,7 @@ import rarfile
 
 from sickchill.oldbeard.common import SD
 from sickchill.oldbeard.numdict import NumDict
+from sickchill.show.ShowList import ShowList
 
 from .init_helpers import setup_gettext, sickchill_dir
 
@@ -101,6 +102,10 @@ CUSTOM_CSS_PATH = None
 DAEMON = None
 DAILYSEARCH_FREQUENCY = 40
 dailySearchScheduler = None
+DATABASE_CACHE_SIZE = 64
+DATABASE_MMAP_SIZE = 256
+DATABASE_STATS = False
+DATABASE_WAL = False
 DATA_DIR = ""
 DATE_PRESET = None
 DBDEBUG = False
@@ -216,6 +221,8 @@ LIBNOTIFY_NOTIFY_ONSUBTITLEDOWNLOAD = False
 LOCALHOST_IP = None
 LOG_DIR = None
 LOG_NR = 5
+LOG_QUEUE = False
+LOG_QUEUE_SIZE = 10000
 LOG_SIZE = 10.0
 LOGO_URL = "https://sickchill.github.io/images/ico/favicon-64.png"
 MATRIX_API_TOKEN = None
@@ -240,6 +247,8 @@ MOVE_ASSOCIATED_FILES = False
 MY_ARGS = []
 MY_FULLNAME = None
 MY_NAME = None
+NAME_PARSER_CACHE_INVALID = False
+NAME_PARSER_CACHE_SIZE = 2000
 NAMING_ABD_PATTERN = None
 NAMING_ANIME = None
 NAMING_ANIME_MULTI_EP = False
@@ -301,6 +310,8 @@ OMGWTFNZBS_APIKEY = None
 OMGWTFNZBS_USERNAME = None
 OPENSUBTITLES_PASS = None
 OPENSUBTITLES_USER = None
+PARALLEL_PROVIDER_SEARCH = False
+PARSER_CPU_YIELD = True
 PID = None
 PIDFILE = ""
 PLEX_CLIENT_HOST = None
@@ -382,7 +393,7 @@ SAB_USERNAME = None
 SCENE_DEFAULT = False
 searchQueueScheduler = None
 SEASON_FOLDERS_DEFAULT = False
-show_list = []
+show_list = ShowList()
 showQueueScheduler = None
 SHOWS_RECENT = []
 SHOWUPDATE_HOUR = None
@@ -569,6 +580,7 @@ CACHE_RETENTION = 30
 SHOW_SKIP_OLDER = 30
 VERSION_NOTIFY = False
 versionCheckScheduler = None
+WEB_API_WORKERS = 4
 WEB_COOKIE_SECRET = None
 WEB_HOST = None
 WEB_IPV6 = False
@@ -576,8 +588,10 @@ WEB_LOG = False
 WEB_PASSWORD = None
 WEB_PORT = None
 WEB_ROOT = None
+WEB_SLOW_WORKERS = 2
 WEB_USE_GZIP = True
 WEB_USERNAME = None
+WEB_WORKERS = 10
 WINDOWS_SHARES = {}
 
 movie_list: "MovieList" = None
@@ -5,6 +5,7 @@ from sickchill import settings
 from sickchill.helper.exceptions import CantRefreshShowException, CantRemoveShowException, CantUpdateShowException, MultipleShowObjectsException
 from sickchill.oldbeard.common import Quality, SKIPPED, WANTED
 from sickchill.oldbeard.db import DBConnection
+from sickchill.show.ShowList import ShowList
 
 if TYPE_CHECKING:
     from sickchill.tv import TVShow
@@ -14,7 +15,7 @@ class Show(object):
     @staticmethod
     def find(shows: list, indexer_id: Union[int, str]) -> Union["TVShow", None]:
         """
-        Find a show by its indexer id in the provided list of shows
+        Find a show by its indexer id in the provided list of shows, using its index if it is a ``ShowList``
         :param shows: The list of shows to search in
         :param indexer_id: The indexer id of the desired show
         :return: The desired show if found, ``None`` if not found
@@ -33,7 +34,10 @@ class Show(object):
                 return None
             indexer_ids = [int(indexer_id)]
 
-        results = [show for show in shows if show.indexerid in indexer_ids]
+        if isinstance(shows, ShowList):
+            results = [show for indexer_id in dict.fromkeys(indexer_ids) for show in shows.by_id(indexer_id)]
+        else:
+            results = [show for show in shows if show.indexerid in indexer_ids]
 
         if not results:
             return None
@@ -46,7 +50,7 @@ class Show(object):
     @staticmethod
     def find_name(shows: list, name: str) -> Union["TVShow", None]:
         """
-        Find a show by its namer in the provided list of shows
+        Find a show by its name in the provided list of shows, using its index if it is a ``ShowList``
         :param shows: The list of shows to search in
         :param name: The known name of the desired show
         :return: The desired show if found, ``None`` if not found
@@ -66,7 +70,10 @@ class Show(object):
 
             names = [name]
 
-        results = [show for show in shows if show.name in names]
+        if isinstance(shows, ShowList):
+            results = [show for name in dict.fromkeys(names) for show in shows.by_name(name)]
+        else:
+            results = [show for show in shows if show.name in names]
 
         if not results:
             return None
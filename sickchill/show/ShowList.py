@@ -0,0 +1,147 @@
+import threading
+from typing import Iterable, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sickchill.tv import TVShow
+
+
+class ShowList(list):
+    """
+    The list of shows, indexed by indexer id, name and sanitized scene name
+
+    Adding and removing shows keeps the indexes up to date, any other change (assigning slices, deleting items or a show
+    changing its id or name) marks them stale and they are rebuilt on the next lookup.
+    """
+
+    def __init__(self, shows: Iterable["TVShow"] = ()):
+        super().__init__(shows)
+        self.lock = threading.RLock()
+        self._members = {}
+        self._ids = {}
+        self._names = {}
+        self._scene_names = {}
+        self._stale = True
+
+    @staticmethod
+    def _keys(show: "TVShow"):
+        from sickchill.oldbeard.helpers import full_sanitizeSceneName
+
+        scene_names = {full_sanitizeSceneName(show.show_name), full_sanitizeSceneName(show.custom_name)} - {""}
+        return show.indexerid, show.name, scene_names
+
+    def _index(self, show: "TVShow"):
+        indexer_id, name, scene_names = self._keys(show)
+        self._members[id(show)] = self._members.get(id(show), 0) + 1
+        self._ids.setdefault(indexer_id, []).append(show)
+        self._names.setdefault(name, []).append(show)
+        for scene_name in scene_names:
+            self._scene_names.setdefault(scene_name, []).append(show)
+
+    def _unindex(self, show: "TVShow"):
+        if self._stale:
+            return
+
+        # the keys can be recomputed, a show changing them marks the indexes stale
+        indexer_id, name, scene_names = self._keys(show)
+        if self._members.get(id(show), 0) > 1:
+            self._members[id(show)] -= 1
+        else:
+            self._members.pop(id(show), None)
+
+        for index, keys in ((self._ids, [indexer_id]), (self._names, [name]), (self._scene_names, scene_names)):
+            for key in keys:
+                try:
+                    index[key].remove(show)
+                except (KeyError, ValueError):
+                    self._stale = True
+                    return
+
+                if not index[key]:
+                    del index[key]
+
+    def _rebuild(self):
+        self._members.clear()
+        self._ids.clear()
+        self._names.clear()
+        self._scene_names.clear()
+        for show in list.__iter__(self):
+            self._index(show)
+        self._stale = False
+
+    def _lookup(self, index: dict, key) -> List["TVShow"]:
+        with self.lock:
+            if self._stale:
+                self._rebuild()
+            return list(index.get(key, ()))
+
+    def invalidate(self):
+        """Mark the indexes stale, they will be rebuilt on the next lookup"""
+        with self.lock:
+            self._stale = True
+
+    def show_changed(self, show: "TVShow"):
+        """Called when an indexed attribute of a show changes"""
+        if id(show) in self._members:
+            self.invalidate()
+
+    def by_id(self, indexer_id: int) -> List["TVShow"]:
+        return self._lookup(self._ids, indexer_id)
+
+    def by_name(self, name: str) -> List["TVShow"]:
+        return self._lookup(self._names, name)
+
+    def by_scene_name(self, scene_name: str) -> List["TVShow"]:
+        return self._lookup(self._scene_names, scene_name)
+
+    def __contains__(self, show) -> bool:
+        with self.lock:
+            if self._stale:
+                self._rebuild()
+            return id(show) in self._members
+
+    def append(self, show: "TVShow"):
+        with self.lock:
+            super().append(show)
+            if not self._stale:
+                self._index(show)
+
+    def insert(self, position, show: "TVShow"):
+        with self.lock:
+            super().insert(position, show)
+            if not self._stale:
+                self._index(show)
+
+    def extend(self, shows: Iterable["TVShow"]):
+        with self.lock:
+            for show in shows:
+                self.append(show)
+
+    def remove(self, show: "TVShow"):
+        with self.lock:
+            super().remove(show)
+            self._unindex(show)
+
+    def pop(self, position=-1) -> "TVShow":
+        with self.lock:
+            show = super().pop(position)
+            self._unindex(show)
+            return show
+
+    def clear(self):
+        with self.lock:
+            super().clear()
+            self._stale = True
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            super().__setitem__(key, value)
+            self._stale = True
+
+    def __delitem__(self, key):
+        with self.lock:
+            super().__delitem__(key)
+            self._stale = True
+
+    def __iadd__(self, shows: Iterable["TVShow"]):
+        self.extend(shows)
+        return self
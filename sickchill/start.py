@@ -27,6 +27,7 @@ from .oldbeard import (
     image_cache,
     naming,
     notifications_queue,
+    notifiers,
     post_processing_queue,
     properFinder,
     providers,
@@ -85,6 +86,12 @@ def initialize(console_logging: bool = True, debug: bool = False, dbdebug: bool
         settings.DEBUG = check_setting_bool(settings.CFG, "General", "debug") or debug
         settings.DBDEBUG = check_setting_bool(settings.CFG, "General", "dbdebug") or dbdebug
 
+        # database tuning, applied when the connections are opened
+        settings.DATABASE_WAL = check_setting_bool(settings.CFG, "General", "database_wal")
+        settings.DATABASE_CACHE_SIZE = check_setting_int(settings.CFG, "General", "database_cache_size", 64, min_val=2)
+        settings.DATABASE_MMAP_SIZE = check_setting_int(settings.CFG, "General", "database_mmap_size", 256, min_val=0)
+        settings.DATABASE_STATS = check_setting_bool(settings.CFG, "General", "database_stats")
+
         settings.DEFAULT_PAGE = check_setting_str(settings.CFG, "General", "default_page", "home")
         if settings.DEFAULT_PAGE not in ("home", "schedule", "history", "news"):
             settings.DEFAULT_PAGE = "home"
@@ -95,6 +102,10 @@ def initialize(console_logging: bool = True, debug: bool = False, dbdebug: bool
 
         if settings.LOG_SIZE > 100:
             settings.LOG_SIZE = 10.0
+
+        # Write the log from a listener thread, records are dropped when more than log_queue_size are waiting
+        settings.LOG_QUEUE = check_setting_bool(settings.CFG, "General", "log_queue")
+        settings.LOG_QUEUE_SIZE = check_setting_int(settings.CFG, "General", "log_queue_size", 10000, min_val=100)
         file_logging = not disable_file_logging
 
         if file_logging and not (helpers.makeDir(settings.LOG_DIR) and os.access(settings.LOG_DIR, os.W_OK)):
@@ -181,6 +192,9 @@ def initialize(console_logging: bool = True, debug: bool = False, dbdebug: bool
         settings.CF_POLICY_AUD = check_setting_str(settings.CFG, "Cloudflare", "audience_policy", censor_log=True)
 
         settings.WEB_USE_GZIP = check_setting_bool(settings.CFG, "General", "web_use_gzip", True)
+        settings.WEB_WORKERS = check_setting_int(settings.CFG, "General", "web_workers", 10, min_val=1)
+        settings.WEB_SLOW_WORKERS = check_setting_int(settings.CFG, "General", "web_slow_workers", 2, min_val=1)
+        settings.WEB_API_WORKERS = check_setting_int(settings.CFG, "General", "web_api_workers", 4, min_val=1)
 
         settings.SSL_VERIFY = check_setting_bool(settings.CFG, "General", "ssl_verify", True)
         helpers.set_opener(settings.SSL_VERIFY)
@@ -196,6 +210,9 @@ def initialize(console_logging: bool = True, debug: bool = False, dbdebug: bool
         settings.LOCALHOST_IP = check_setting_str(settings.CFG, "General", "localhost_ip")
 
         settings.CPU_PRESET = check_setting_str(settings.CFG, "General", "cpu_preset", "NORMAL")
+        settings.PARSER_CPU_YIELD = check_setting_bool(settings.CFG, "General", "parser_cpu_yield", True)
+        settings.NAME_PARSER_CACHE_SIZE = check_setting_int(settings.CFG, "General", "name_parser_cache_size", 2000, min_val=200)
+        settings.NAME_PARSER_CACHE_INVALID = check_setting_bool(settings.CFG, "General", "name_parser_cache_invalid")
 
         settings.ANON_REDIRECT = check_setting_str(settings.CFG, "General", "anon_redirect", settings.DEFAULT_ANON_REDIRECT)
         if settings.ANON_REDIRECT == "disabled" or not settings.ANON_REDIRECT.endswith("?"):
@@ -292,6 +309,7 @@ def initialize(console_logging: bool = True, debug: bool = False, dbdebug: bool
             settings.CHECK_PROPERS_INTERVAL = "daily"
 
         settings.RANDOMIZE_PROVIDERS = check_setting_bool(settings.CFG, "General", "randomize_providers")
+        settings.PARALLEL_PROVIDER_SEARCH = check_setting_bool(settings.CFG, "General", "parallel_provider_search")
 
         settings.ALLOW_HIGH_PRIORITY = check_setting_bool(settings.CFG, "General", "allow_high_priority", True)
 
@@ -1059,6 +1077,9 @@ def halt():
                 except Exception:
                     pass
 
+            notifiers.logged_errors.shutdown()
+            notifiers.dispatcher.shutdown()
+
             settings.__INITIALIZED__.clear()
         settings.started.clear()
 
@@ -1147,6 +1168,8 @@ def save_config():
                 "encryption_secret": settings.ENCRYPTION_SECRET,
                 "log_nr": int(settings.LOG_NR),
                 "log_size": float(settings.LOG_SIZE),
+                "log_queue": int(settings.LOG_QUEUE),
+                "log_queue_size": int(settings.LOG_QUEUE_SIZE),
                 "log_dir": settings.LOG_DIR,
                 "socket_timeout": settings.SOCKET_TIMEOUT,
                 "web_port": settings.WEB_PORT,
@@ -1158,16 +1181,26 @@ def save_config():
                 "web_password": helpers.encrypt(settings.WEB_PASSWORD, settings.ENCRYPTION_VERSION),
                 "web_cookie_secret": settings.WEB_COOKIE_SECRET,
                 "web_use_gzip": int(settings.WEB_USE_GZIP),
+                "web_workers": settings.WEB_WORKERS,
+                "web_slow_workers": settings.WEB_SLOW_WORKERS,
+                "web_api_workers": settings.WEB_API_WORKERS,
                 "ssl_verify": int(settings.SSL_VERIFY),
                 "download_url": settings.DOWNLOAD_URL,
                 "localhost_ip": settings.LOCALHOST_IP,
                 "cpu_preset": settings.CPU_PRESET,
+                "parser_cpu_yield": int(settings.PARSER_CPU_YIELD),
+                "name_parser_cache_size": settings.NAME_PARSER_CACHE_SIZE,
+                "name_parser_cache_invalid": int(settings.NAME_PARSER_CACHE_INVALID),
                 "anon_redirect": settings.ANON_REDIRECT or "disabled",
                 "tvdb_user": settings.TVDB_USER,
                 "tvdb_user_key": settings.TVDB_USER_KEY,
                 "api_key": settings.API_KEY,
                 "debug": int(settings.DEBUG),
                 "dbdebug": int(settings.DBDEBUG),
+                "database_wal": int(settings.DATABASE_WAL),
+                "database_cache_size": settings.DATABASE_CACHE_SIZE,
+                "database_mmap_size": settings.DATABASE_MMAP_SIZE,
+                "database_stats": int(settings.DATABASE_STATS),
                 "default_page": settings.DEFAULT_PAGE,
                 "enable_https": int(settings.ENABLE_HTTPS),
                 "notify_on_login": int(settings.NOTIFY_ON_LOGIN),
@@ -1187,6 +1220,7 @@ def save_config():
                 "showupdate_hour": int(settings.SHOWUPDATE_HOUR),
                 "download_propers": int(settings.DOWNLOAD_PROPERS),
                 "randomize_providers": int(settings.RANDOMIZE_PROVIDERS),
+                "parallel_provider_search": int(settings.PARALLEL_PROVIDER_SEARCH),
                 "check_propers_interval": settings.CHECK_PROPERS_INTERVAL,
                 "allow_high_priority": int(settings.ALLOW_HIGH_PRIORITY),
                 "skip_removed_files": int(settings.SKIP_REMOVED_FILES),
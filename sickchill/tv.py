@@ -7,9 +7,10 @@ import stat
 import threading
 import time
 import traceback
+from contextlib import contextmanager
 from pathlib import Path
 from sqlite3 import OperationalError
-from typing import Union
+from typing import Dict, Tuple, Union
 from weakref import WeakKeyDictionary
 from xml.etree import ElementTree
 
@@ -20,6 +21,7 @@ from urllib3.exceptions import MaxRetryError, NewConnectionError
 
 import sickchill
 import sickchill.oldbeard.providers
+import sickchill.oldbeard.scene_exceptions
 import sickchill.oldbeard.scene_numbering
 from sickchill import logger, settings
 from sickchill.helper.common import dateTimeFormat, episode_num, is_media_file, remove_extension, replace_extension, sanitize_filename, try_int
@@ -57,6 +59,7 @@ from sickchill.oldbeard.common import (
 )
 from sickchill.oldbeard.name_parser.parser import InvalidNameException, InvalidShowException, NameParser
 from sickchill.show.Show import Show
+from sickchill.show.ShowList import ShowList
 
 try:
     from send2trash import send2trash  # noqa
@@ -69,6 +72,10 @@ except ModuleNotFoundError:
             shutil.rmtree(path)
 
 
+# The fields of an indexer episode load_from_indexer reads, when the series episodes payload is missing any of them the episode is fetched on its own
+INDEXER_EPISODE_FIELDS = ("id", "episodeName", "absoluteNumber", "overview", "firstAired")
+
+
 class DirtySetter(object):
     """A descriptor that forbids negative values"""
 
@@ -89,10 +96,62 @@ class DirtySetter(object):
         self.data[instance] = value
 
 
+class ShowListIndexSetter(DirtySetter):
+    """A DirtySetter for the attributes the show list is indexed on"""
+
+    def __set__(self, instance, value):
+        if value != self.data.get(instance) and isinstance(settings.show_list, ShowList):
+            settings.show_list.show_changed(instance)
+
+        super().__set__(instance, value)
+
+
+class EpisodeWriteBatch(object):
+    """
+    The episodes of a show saved or deleted while a batch is open, written to the database in one transaction when it is flushed
+    """
+
+    def __init__(self, show: "TVShow"):
+        self.show = show
+        self.thread = threading.get_ident()
+        self.depth = 0
+        self.saves = {}
+        self.deletes = {}
+
+    def save(self, episode: "TVEpisode"):
+        key = (episode.season, episode.episode)
+        self.deletes.pop(key, None)
+        self.saves[key] = episode
+
+    def delete(self, episode: "TVEpisode"):
+        key = (episode.season, episode.episode)
+        self.saves.pop(key, None)
+        self.deletes[key] = {"showid": episode.show.indexerid, "season": episode.season, "episode": episode.episode}
+
+    def flush(self):
+        """Write the pending episodes, the values are read from the episodes now so the last change wins"""
+        if not (self.saves or self.deletes):
+            return
+
+        saved = [episode for episode in self.saves.values() if episode.dirty]
+        query_list = [episode.get_db_values() for episode in saved]
+        delete_list = list(self.deletes.values())
+        self.saves.clear()
+        self.deletes.clear()
+
+        main_db_con = db.DBConnection()
+        main_db_con.upsert_many("tv_episodes", query_list, delete_list)
+
+        for episode in saved:
+            self.show.episode_status_changed(episode.season, episode.episode, episode.status)
+        for deleted in delete_list:
+            self.show.episode_status_changed(deleted["season"], deleted["episode"], None)
+
+
 class TVShow(object):
-    indexerid = DirtySetter(0)
+    indexerid = ShowListIndexSetter(0)
     indexer = DirtySetter(0)
-    show_name = DirtySetter("")
+    show_name = ShowListIndexSetter("")
     imdb_id = DirtySetter("")
     network = DirtySetter("")
     genre: list = DirtySetter([])
@@ -115,13 +174,17 @@ class TVShow(object):
     rls_require_words = DirtySetter("")
     rls_prefer_words = DirtySetter("")
     default_ep_status = DirtySetter(SKIPPED)
-    custom_name = DirtySetter("")
+    custom_name = ShowListIndexSetter("")
 
     def __init__(self, indexer, indexerid: int, lang=""):
         self.dirty = True
 
         self.lock = threading.Lock()
         self.episodes = {}
+        self.episode_batch: Union[EpisodeWriteBatch, None] = None
+        self.episode_statuses: Union[Dict[Tuple[int, int], int], None] = None
+        self.episode_statuses_lock = threading.Lock()
+        self.want_decisions: Dict[Tuple[int, int, int, bool, bool], Tuple[bool, str]] = {}
         self.next_airdate = ""
         self.release_groups = None
         self.indexer = indexer
@@ -258,6 +321,63 @@ class TVShow(object):
     def get_location(self):
         return self._location
 
+    @contextmanager
+    def batch_episode_writes(self):
+        """
+        Collect the episodes saved or deleted by this thread and write them in one transaction on exit
+
+        Batches can be nested, the outermost one writes the episodes. Episodes saved from other threads are written right away.
+        """
+        batch = self.episode_batch
+        if batch is None or batch.thread != threading.get_ident():
+            batch = self.episode_batch = EpisodeWriteBatch(self)
+
+        batch.depth += 1
+        try:
+            yield batch
+        finally:
+            batch.depth -= 1
+            if not batch.depth:
+                self.episode_batch = None
+                batch.flush()
+                # the absolute numbers of the episodes may have changed
+                sickchill.oldbeard.scene_numbering.scene_numbering_tables.invalidate(self.indexerid, self.indexer)
+
+    def pending_episode_batch(self) -> Union[EpisodeWriteBatch, None]:
+        """The open episode batch of this thread, if any"""
+        batch = self.episode_batch
+        if batch is not None and batch.thread == threading.get_ident():
+            return batch
+        return None
+
+    def get_episode_status(self, season, episode) -> Union[int, None]:
+        """
+        The status of an episode from the status table of the show, None if the episode is not in the database
+
+        The table is read in one query the first time it is needed and kept current as episodes are saved and deleted.
+        """
+        statuses = self.episode_statuses
+        if statuses is None:
+            with self.episode_statuses_lock:
+                if self.episode_statuses is None:
+                    main_db_con = db.DBConnection()
+                    sql_results = main_db_con.select("SELECT season, episode, status FROM tv_episodes WHERE showid = ?", [self.indexerid])
+                    self.episode_statuses = {(int(row["season"]), int(row["episode"])): int(row["status"]) for row in sql_results}
+                statuses = self.episode_statuses
+
+        return statuses.get((int(season), int(episode)))
+
+    def episode_status_changed(self, season, episode, status) -> None:
+        """Update the status table of the show after an episode was written to the database, a status of None removes it"""
+        with self.episode_statuses_lock:
+            if self.episode_statuses is None:
+                return
+
+            if status is None:
+                self.episode_statuses.pop((int(season), int(episode)), None)
+            else:
+                self.episode_statuses[(int(season), int(episode))] = int(status)
+
     def flush_episodes(self):
         for current_season in self.episodes:
             self.episodes[current_season].clear()
@@ -513,9 +633,12 @@ class TVShow(object):
         logger.debug("Loading all episodes from the database")
         scanned_episodes = {}
 
+        # refresh xem once and load the scene numbering for the whole show instead of once per episode
+        scene_numbering = sickchill.oldbeard.scene_numbering.scene_numbering_tables.get(self.indexerid, self.indexer)
+
         try:
             main_db_con = db.DBConnection()
-            sql = "SELECT season, episode, showid, show_name FROM tv_episodes JOIN tv_shows WHERE showid = indexer_id and showid = ?"
+            sql = "SELECT * FROM tv_episodes JOIN tv_shows WHERE showid = indexer_id and showid = ? ORDER BY season, episode"
             sql_results = main_db_con.select(sql, [self.indexerid])
         except OperationalError as error:
             logger.error(f"Could not load episodes from the DB. Error: {error}")
@@ -537,11 +660,11 @@ class TVShow(object):
             logger.debug(f"{showid}: Loading {show_name} {episode_num(season, episode)} from the DB")
 
             try:
-                episode_object = self.get_episode(season, episode)
-                if not episode_object:
-                    raise EpisodeNotFoundException
-
-                episode_object.load_from_db(season, episode)
+                episode_object = self.episodes.setdefault(season, {}).get(episode)
+                if episode_object:
+                    episode_object.load_from_db_row(result, scene_numbering)
+                else:
+                    self.episodes[season][episode] = TVEpisode(self, season, episode, sql_result=result, scene_numbering=scene_numbering)
                 scanned_episodes[season][episode] = True
             except EpisodeDeletedException:
                 logger.debug(f"{showid}: Tried loading {show_name} {episode_num(season, episode)} from the DB that should have been deleted, skipping it")
@@ -555,6 +678,8 @@ class TVShow(object):
     def load_episodes_from_indexer(self, force_all: bool = False):
         logger.debug(_("{show_id}: Loading all episodes from {indexer_name}...").format(show_id=self.indexerid, indexer_name=self.indexer_name))
 
+        start_time = time.monotonic()
+        episode_requests = 0
         scanned_episodes = {}
 
         for indexer_episode in self.idxr.episodes(self):
@@ -574,9 +699,18 @@ class TVShow(object):
                 )
                 continue
             else:
+                # the series episodes payload has everything an episode needs, only fetch the episode on its own when it doesn't
+                if not all(field in indexer_episode for field in INDEXER_EPISODE_FIELDS):
+                    indexer_episode_data = None
+                    episode_requests += 1
+                else:
+                    indexer_episode_data = indexer_episode
+
                 try:
                     with episode.lock:
-                        episode.load_from_indexer(indexer_episode["airedSeason"], indexer_episode["airedEpisodeNumber"], force_all=force_all)
+                        episode.load_from_indexer(
+                            indexer_episode["airedSeason"], indexer_episode["airedEpisodeNumber"], force_all=force_all, indexer_episode=indexer_episode_data
+                        )
                         episode.save_to_db()
                         # sql_l.append(episode.get_sql())
                 except EpisodeDeletedException:
@@ -585,11 +719,24 @@ class TVShow(object):
 
             scanned_episodes[indexer_episode["airedSeason"]][indexer_episode["airedEpisodeNumber"]] = True
 
+        logger.info(
+            _("{show_id}: Loaded {count} episodes from {indexer_name} in {seconds:.2f} seconds with {requests} episode requests").format(
+                show_id=self.indexerid,
+                count=sum(len(episodes) for episodes in scanned_episodes.values()),
+                indexer_name=self.indexer_name,
+                seconds=time.monotonic() - start_time,
+                requests=episode_requests,
+            )
+        )
+
         # Done updating save last update date
         self.last_update_indexer = datetime.datetime.now().toordinal()
 
         self.save_to_db()
 
+        # the absolute numbers of the episodes may have changed
+        sickchill.oldbeard.scene_numbering.scene_numbering_tables.invalidate(self.indexerid, self.indexer)
+
         return scanned_episodes
 
     def get_images(self):
@@ -1020,6 +1167,8 @@ class TVShow(object):
         sql_l = [["DELETE FROM scene_exceptions WHERE indexer_id = ?", [self.indexerid]], ["DELETE FROM scene_names WHERE indexer_id = ?", [self.indexerid]]]
 
         cache_db_con.mass_action(sql_l)
+        sickchill.oldbeard.scene_exceptions.scene_exception_names.invalidate()
+        sickchill.oldbeard.scene_numbering.scene_numbering_tables.invalidate(self.indexerid, self.indexer)
 
         for provider in sickchill.oldbeard.providers.__all__:
             if cache_db_con.has_table(provider) and cache_db_con.has_column(provider, "indexerid"):
@@ -1269,94 +1418,84 @@ class TVShow(object):
         return ", ".join([Quality.qualityStrings[quality] for quality in qualities or [] if quality and quality in Quality.qualityStrings]) or "None"
 
     def want_episode(self, season, episode, quality, manual_search=False, down_cur_quality=False):
-        allowed_qualities, preferred_qualities = Quality.splitQuality(self.quality)
-        logger.debug(
-            f"Any,Best = [ {self.qualities_to_string(allowed_qualities)} ] [ {self.qualities_to_string(preferred_qualities)} ]"
-            f" Found = [ {self.qualities_to_string([quality])} ]"
-        )
+        """
+        Check if a result of the given quality is wanted for an episode
 
-        if quality not in allowed_qualities + preferred_qualities or quality is UNKNOWN:
+        The status comes from the status table of the show and the decisions are cached per show quality, status and found quality.
+        """
+        ep_status = self.get_episode_status(season, episode)
+        if ep_status is None:
             logger.debug(
-                "Don't want this quality, ignoring found result for {name} {ep} with quality {quality}".format(
+                "Unable to find a matching episode in database, ignoring found result for {name} {ep} with quality {quality}".format(
                     name=self.name, ep=episode_num(season, episode), quality=Quality.qualityStrings[quality]
                 )
             )
             return False
 
-        main_db_con = db.DBConnection()
-        sql_results = main_db_con.select("SELECT status FROM tv_episodes WHERE showid = ? AND season = ? AND episode = ?", [self.indexerid, season, episode])
+        key = (self.quality, int(ep_status), quality, bool(manual_search), bool(down_cur_quality))
+        decision = self.want_decisions.get(key)
+        if decision is None:
+            decision = self.want_decisions[key] = self.want_decision(*key)
 
-        if not sql_results or not len(sql_results):
+        wanted, reason = decision
+        if settings.DEBUG:
+            cur_quality = Quality.splitCompositeStatus(key[1])[1]
             logger.debug(
-                "Unable to find a matching episode in database, ignoring found result for {name} {ep} with quality {quality}".format(
-                    name=self.name, ep=episode_num(season, episode), quality=Quality.qualityStrings[quality]
+                reason.format(
+                    status=statusStrings[key[1]],
+                    name=self.name,
+                    ep=episode_num(season, episode),
+                    quality=Quality.qualityStrings[quality],
+                    existing_quality=Quality.qualityStrings[cur_quality],
                 )
             )
-            return False
 
-        ep_status = int(sql_results[0]["status"])
-        ep_status_text = statusStrings[ep_status]
+        return wanted
+
+    @staticmethod
+    def want_decision(show_quality, ep_status, quality, manual_search, down_cur_quality) -> Tuple[bool, str]:
+        """
+        Decide if a result of the given quality is wanted for an episode with the given status
+
+        :return: the decision and the reason to log, formatted with status, name, ep, quality and existing_quality
+        """
+        allowed_qualities, preferred_qualities = Quality.splitQuality(show_quality)
+
+        if quality not in allowed_qualities + preferred_qualities or quality is UNKNOWN:
+            return False, "Don't want this quality, ignoring found result for {name} {ep} with quality {quality}"
 
         if ep_status in Quality.ARCHIVED + [UNAIRED, SKIPPED, IGNORED] and not manual_search:
-            logger.debug(
-                "Existing episode status is '{status}', ignoring found result for {name} {ep} with quality {quality}".format(
-                    status=ep_status_text, name=self.name, ep=episode_num(season, episode), quality=Quality.qualityStrings[quality]
-                )
-            )
-            return False
+            return False, "Existing episode status is '{status}', ignoring found result for {name} {ep} with quality {quality}"
 
         cur_status_, cur_quality = Quality.splitCompositeStatus(ep_status)
 
         if ep_status in (WANTED, SKIPPED, UNKNOWN, FAILED):
-            logger.debug(
-                "Existing episode status is '{status}', getting found result for {name} {ep} with quality {quality}".format(
-                    status=ep_status_text, name=self.name, ep=episode_num(season, episode), quality=Quality.qualityStrings[quality]
-                )
-            )
-            return True
+            return True, "Existing episode status is '{status}', getting found result for {name} {ep} with quality {quality}"
         elif manual_search:
             if (down_cur_quality and quality >= cur_quality) or (not down_cur_quality and quality != cur_quality):
-                logger.debug(
-                    "Usually ignoring found result, but forced search allows the quality,"
-                    " getting found result for {name} {ep} with quality {quality}".format(
-                        name=self.name, ep=episode_num(season, episode), quality=Quality.qualityStrings[quality]
-                    )
+                return (
+                    True,
+                    "Usually ignoring found result, but forced search allows the quality, getting found result for {name} {ep} with quality {quality}",
                 )
-                return True
 
         if (
             ep_status in Quality.DOWNLOADED + Quality.SNATCHED + Quality.SNATCHED_PROPER
             and quality in preferred_qualities
             and (quality > cur_quality or cur_quality not in preferred_qualities)
         ):
-            logger.debug(
+            return (
+                True,
                 "Episode already exists with quality {existing_quality} but the found result"
-                " quality {new_quality} is wanted more, getting found result for {name} {ep}".format(
-                    existing_quality=Quality.qualityStrings[cur_quality],
-                    new_quality=Quality.qualityStrings[quality],
-                    name=self.name,
-                    ep=episode_num(season, episode),
-                )
+                " quality {quality} is wanted more, getting found result for {name} {ep}",
             )
-            return True
         elif cur_quality == Quality.UNKNOWN and manual_search:
-            logger.debug(
-                "Episode already exists but quality is Unknown, getting found result for {name} {ep} with quality {quality}".format(
-                    name=self.name, ep=episode_num(season, episode), quality=Quality.qualityStrings[quality]
-                )
-            )
-            return True
-        else:
-            logger.debug(
-                "Episode already exists with quality {existing_quality} and the found result has same/lower quality,"
-                " ignoring found result for {name} {ep} with quality {new_quality}".format(
-                    existing_quality=Quality.qualityStrings[cur_quality],
-                    name=self.name,
-                    ep=episode_num(season, episode),
-                    new_quality=Quality.qualityStrings[quality],
-                )
-            )
-        return False
+            return True, "Episode already exists but quality is Unknown, getting found result for {name} {ep} with quality {quality}"
+
+        return (
+            False,
+            "Episode already exists with quality {existing_quality} and the found result has same/lower quality,"
+            " ignoring found result for {name} {ep} with quality {quality}",
+        )
 
     def get_overview(self, episode_status, backlog=False):
         """
@@ -1429,7 +1568,7 @@ class TVEpisode(object):
     indexer = DirtySetter(1)
     startyear = DirtySetter("")
 
-    def __init__(self, show: TVShow, season, episode, ep_file=""):
+    def __init__(self, show: TVShow, season, episode, ep_file="", sql_result=None, scene_numbering=None):
         self.season: int = season
         self.episode: int = episode
         self._location = ep_file
@@ -1449,7 +1588,7 @@ class TVEpisode(object):
 
         self.lock = threading.Lock()
 
-        self.specify_episode(self.season, self.episode)
+        self.specify_episode(self.season, self.episode, sql_result, scene_numbering)
 
         self.related_episodes = []
 
@@ -1585,8 +1724,11 @@ class TVEpisode(object):
         # if either setting has changed return true, if not return false
         return old_has_nfo != self.has_nfo or old_has_tbn != self.has_tbn
 
-    def specify_episode(self, season, episode):
-        sql_results = self.load_from_db(season, episode)
+    def specify_episode(self, season, episode, sql_result=None, scene_numbering=None):
+        if sql_result is not None:
+            sql_results = self.load_from_db_row(sql_result, scene_numbering)
+        else:
+            sql_results = self.load_from_db(season, episode)
 
         if not sql_results:
             # only load from NFO if we didn't load from DB
@@ -1618,68 +1760,96 @@ class TVEpisode(object):
             logger.debug("{id}: Episode {ep} not found in the database".format(id=self.show.indexerid, ep=episode_num(season, episode)))
             return False
         else:
-            if sql_results[0]["name"]:
-                self.name = sql_results[0]["name"]
-
-            self.season = season
-            self.episode = episode
-            self.absolute_number = try_int(sql_results[0]["absolute_number"])
-            self.description = sql_results[0]["description"]
-            if not self.description:
-                self.description = ""
-            if sql_results[0]["subtitles"] and sql_results[0]["subtitles"]:
-                self.subtitles = sql_results[0]["subtitles"].split(",")
-            self.subtitles_searchcount = int(sql_results[0]["subtitles_searchcount"])
-            self.subtitles_lastsearch = sql_results[0]["subtitles_lastsearch"]
-            self.airdate = datetime.date.fromordinal(int(sql_results[0]["airdate"]))
-            self.status = int(sql_results[0]["status"] or -1)
-            self.startyear = str(sql_results[0]["startyear"] or "")
-
-            # don't overwrite my location
-            if sql_results[0]["location"] and not self._location:
-                self.location = os.path.normpath(sql_results[0]["location"])
-
-            if sql_results[0]["file_size"]:
-                self.file_size = int(sql_results[0]["file_size"])
-            else:
-                self.file_size = 0
+            return self.load_from_db_row(sql_results[0])
+
+    def load_from_db_row(self, sql_result, scene_numbering=None):
+        """
+        Load the episode from a tv_episodes row joined with its show
+
+        :param sql_result: The database row
+        :param scene_numbering: The numbering table of the show, the numbering is looked up per episode if not given
+        :return: True
+        """
+        if sql_result["name"]:
+            self.name = sql_result["name"]
+
+        self.season = season = int(sql_result["season"])
+        self.episode = episode = int(sql_result["episode"])
+        self.absolute_number = try_int(sql_result["absolute_number"])
+        self.description = sql_result["description"]
+        if not self.description:
+            self.description = ""
+        if sql_result["subtitles"] and sql_result["subtitles"]:
+            self.subtitles = sql_result["subtitles"].split(",")
+        self.subtitles_searchcount = int(sql_result["subtitles_searchcount"])
+        self.subtitles_lastsearch = sql_result["subtitles_lastsearch"]
+        self.airdate = datetime.date.fromordinal(int(sql_result["airdate"]))
+        self.status = int(sql_result["status"] or -1)
+        self.startyear = str(sql_result["startyear"] or "")
+
+        # don't overwrite my location
+        if sql_result["location"] and not self._location:
+            self.location = os.path.normpath(sql_result["location"])
+
+        if sql_result["file_size"]:
+            self.file_size = int(sql_result["file_size"])
+        else:
+            self.file_size = 0
 
-            self.indexerid = int(sql_results[0]["indexerid"])
-            self.indexer = int(sql_results[0]["indexer"])
+        self.indexerid = int(sql_result["indexerid"])
+        self.indexer = int(sql_result["indexer"])
 
+        if scene_numbering is None:
             sickchill.oldbeard.scene_numbering.xem_refresh(self.show.indexerid, self.show.indexer)
 
-            self.scene_season = try_int(sql_results[0]["scene_season"])
-            self.scene_episode = try_int(sql_results[0]["scene_episode"])
-            self.scene_absolute_number = try_int(sql_results[0]["scene_absolute_number"])
+        self.scene_season = try_int(sql_result["scene_season"])
+        self.scene_episode = try_int(sql_result["scene_episode"])
+        self.scene_absolute_number = try_int(sql_result["scene_absolute_number"])
 
-            if self.scene_absolute_number == 0:
+        if self.scene_absolute_number == 0:
+            if scene_numbering is None:
                 self.scene_absolute_number = sickchill.oldbeard.scene_numbering.get_scene_absolute_numbering(
                     self.show.indexerid, self.show.indexer, self.absolute_number
                 )
+            elif self.show.is_scene:
+                self.scene_absolute_number = scene_numbering.scene_absolute_numbering(self.absolute_number) or self.absolute_number
+            else:
+                self.scene_absolute_number = self.absolute_number
 
-            if self.scene_season == 0 or self.scene_episode == 0:
+        if self.scene_season == 0 or self.scene_episode == 0:
+            if scene_numbering is None:
                 self.scene_season, self.scene_episode = sickchill.oldbeard.scene_numbering.get_scene_numbering(
                     self.show.indexerid, self.show.indexer, self.season, self.episode
                 )
+            elif self.show.is_scene:
+                self.scene_season, self.scene_episode = scene_numbering.scene_numbering(season, episode) or (season, episode)
+            else:
+                self.scene_season, self.scene_episode = season, episode
 
-            if sql_results[0]["release_name"] is not None:
-                self.release_name = sql_results[0]["release_name"]
+        if sql_result["release_name"] is not None:
+            self.release_name = sql_result["release_name"]
 
-            if sql_results[0]["is_proper"]:
-                self.is_proper = int(sql_results[0]["is_proper"])
+        if sql_result["is_proper"]:
+            self.is_proper = int(sql_result["is_proper"])
 
-            if sql_results[0]["version"]:
-                self.version = int(sql_results[0]["version"])
+        if sql_result["version"]:
+            self.version = int(sql_result["version"])
 
-            if sql_results[0]["release_group"] is not None:
-                self.release_group = sql_results[0]["release_group"]
+        if sql_result["release_group"] is not None:
+            self.release_group = sql_result["release_group"]
 
-            self.dirty = False
-            return True
+        self.dirty = False
+        return True
+
+    def load_from_indexer(self, season=None, episode=None, force_all: bool = False, indexer_episode: dict = None):
+        """
+        Load the episode from the indexer
+
+        :param indexer_episode: The episode from the series episodes of the indexer, fetched on its own if not given
+        """
+        if not indexer_episode:
+            indexer_episode = self.idxr.episode(self.show, season or self.season, episode or self.episode)
 
-    def load_from_indexer(self, season=None, episode=None, force_all: bool = False):
-        indexer_episode = self.idxr.episode(self.show, season or self.season, episode or self.episode)
         if not indexer_episode:
             if self.name:
                 logger.debug("{} timed out, but we have enough info from other sources, allowing the error".format(self.indexer_name))
@@ -1939,8 +2109,13 @@ class TVEpisode(object):
 
         # delete myself from the DB
         logger.debug(_("Deleting myself from the database"))
-        main_db_con = db.DBConnection()
-        main_db_con.action("DELETE FROM tv_episodes WHERE showid = ? AND season = ? AND episode = ?", [self.show.indexerid, self.season, self.episode])
+        batch = self.show.pending_episode_batch()
+        if batch is not None:
+            batch.delete(self)
+        else:
+            main_db_con = db.DBConnection()
+            main_db_con.action("DELETE FROM tv_episodes WHERE showid = ? AND season = ? AND episode = ?", [self.show.indexerid, self.season, self.episode])
+            self.show.episode_status_changed(self.season, self.episode, None)
         raise EpisodeDeletedException()
 
     def get_sql(self):
@@ -1949,12 +2124,22 @@ class TVEpisode(object):
 
         forceSave: If True it will create SQL queue even if no data has been changed since the
                     last save (aka if the record is not dirty).
+
+        While the show has an episode batch open the episode is added to it instead and nothing is returned.
         """
         try:
             if not self.dirty:
                 logger.debug(f"{self.show.indexerid}: Not creating SQL queue - record is not dirty")
                 return
 
+            batch = self.show.pending_episode_batch()
+            if batch is not None:
+                batch.save(self)
+                return
+
+            # the caller runs the query, usually right away in a mass action
+            self.show.episode_status_changed(self.season, self.episode, self.status)
+
             main_db_con = db.DBConnection()
             rows = main_db_con.select(
                 "SELECT episode_id, subtitles FROM tv_episodes WHERE showid = ? AND season = ? AND episode = ?",
@@ -2074,11 +2259,33 @@ class TVEpisode(object):
 
         forceSave: If True it will save to the database even if no data has been changed since the
                     last save (aka if the record is not dirty).
+
+        While the show has an episode batch open the episode is written when the batch closes.
         """
 
         if not self.dirty:
             return
 
+        batch = self.show.pending_episode_batch()
+        if batch is not None:
+            batch.save(self)
+            return
+
+        new_value_dict, control_value_dict = self.get_db_values()
+
+        logger.debug(f"{self.show.indexerid}: Saving episode details to database S{self.season}E{self.episode}: {statusStrings[self.status]}")
+
+        # use a custom update/insert method to get the data into the DB
+        main_db_con = db.DBConnection()
+        main_db_con.upsert("tv_episodes", new_value_dict, control_value_dict)
+        self.show.episode_status_changed(self.season, self.episode, self.status)
+
+    def get_db_values(self):
+        """
+        The values and the control values to upsert the episode into tv_episodes with
+
+        :return: (new_value_dict, control_value_dict)
+        """
         new_value_dict = {
             "indexerid": self.indexerid,
             "indexer": self.indexer,
@@ -2102,11 +2309,7 @@ class TVEpisode(object):
 
         control_value_dict = {"showid": self.show.indexerid, "season": self.season, "episode": self.episode}
 
-        logger.debug(f"{self.show.indexerid}: Saving episode details to database S{self.season}E{self.episode}: {statusStrings[self.status]}")
-
-        # use a custom update/insert method to get the data into the DB
-        main_db_con = db.DBConnection()
-        main_db_con.upsert("tv_episodes", new_value_dict, control_value_dict)
+        return new_value_dict, control_value_dict
 
     def full_path(self):
         if self.location is None or self.location == "":
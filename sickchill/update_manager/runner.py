@@ -98,6 +98,10 @@ class UpdateManager(object):
     def backup_to_dir(backup_dir=None):
         if not backup_dir:
             return False
+
+        for filename in ("sickchill.db", "failed.db", "cache.db"):
+            db.DBConnection(filename).checkpoint()
+
         source = [
             os.path.join(settings.DATA_DIR, "sickchill.db"),
             settings.CONFIG_FILE,
@@ -3,12 +3,14 @@ import abc
 import datetime
 import json
 import os
-import re
+import threading
 import time
 import traceback
 import urllib.parse
+from collections import OrderedDict
 from pathlib import Path
 
+from tornado.ioloop import IOLoop
 from tornado.web import RequestHandler
 
 import sickchill
@@ -17,7 +19,7 @@ from sickchill.helper.common import dateFormat, dateTimeFormat, pretty_file_size
 from sickchill.helper.exceptions import ShowDirectoryNotFoundException
 from sickchill.helper.quality import get_quality_string
 from sickchill.init_helpers import get_current_version
-from sickchill.oldbeard import classes, db, helpers, network_timezones, scdatetime, search_queue, ui
+from sickchill.oldbeard import classes, db, helpers, network_timezones, notifiers, scdatetime, search_queue, ui
 from sickchill.oldbeard.common import (
     ARCHIVED,
     DOWNLOADED,
@@ -33,6 +35,7 @@ from sickchill.oldbeard.common import (
     UNKNOWN,
     WANTED,
 )
+from sickchill.oldbeard.name_parser.parser import name_parser_cache, parser_cpu_yield
 from sickchill.oldbeard.postProcessor import PROCESS_METHODS
 from sickchill.show.ComingEpisodes import ComingEpisodes
 from sickchill.show.History import History
@@ -40,6 +43,7 @@ from sickchill.show.Show import Show
 from sickchill.system.Restart import Restart
 from sickchill.system.Shutdown import Shutdown
 from sickchill.update_manager import UpdateManager
+from sickchill.views.workers import web_workers
 
 indexer_ids = ["indexerid", "tvdbid"]
 
@@ -62,6 +66,70 @@ result_type_map = {
 # basically everything except RESULT_SUCCESS / success is bad
 
 
+class ApiResponseCache(object):
+    """
+    The serialized responses of the commands with a cache_ttl, keyed by command and params
+
+    An entry is used until its ttl runs out or one of the database tables in the cache_tables of its command changes.
+    """
+
+    SIZE = 256
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    @staticmethod
+    def command(args, kwargs):
+        """The command class of a call if its response can be cached: one command, with a cache_ttl and no profiling"""
+        cmd = kwargs.get("cmd", args[0] if args else None)
+        if not isinstance(cmd, str) or "|" in cmd or "profile" in kwargs:
+            return None
+
+        command = function_mapper.get(cmd)
+        if command is None or not command.cache_ttl:
+            return None
+        return command
+
+    @staticmethod
+    def key(args, kwargs):
+        return repr(args), repr(sorted(kwargs.items()))
+
+    def get(self, key, generation):
+        """
+        :return: the response, or None if there is no valid entry
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            expires, entry_generation, out = entry
+            if entry_generation != generation or expires < time.monotonic():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return out
+
+    def set(self, key, generation, ttl, out):
+        """
+        :param generation: the generation of the cache_tables from before the command ran
+        """
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, generation, out)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.SIZE:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+api_response_cache = ApiResponseCache()
+
+
 # noinspection PyAbstractClass
 class ApiHandler(RequestHandler):
     """api class that returns json results"""
@@ -76,7 +144,7 @@ class ApiHandler(RequestHandler):
         self.set_header("X-Robots-Tag", "noindex")
         # self.set_header("Cache-Control", "no-store, no-cache, must-revalidate, max-age=0")
 
-    def get(self, *args, **kwargs):
+    async def get(self, *args, **kwargs):
         # kwargs = self.request.arguments
         kwargs = urllib.parse.parse_qs(self.request.query)
         for arg, value in kwargs.items():
@@ -95,6 +163,16 @@ class ApiHandler(RequestHandler):
         access_msg = "API :: " + self.request.remote_ip + " - gave correct API KEY. ACCESS GRANTED"
         logger.debug(access_msg)
 
+        cached_command = api_response_cache.command(args, kwargs)
+        if cached_command:
+            cache_key = api_response_cache.key(args, kwargs)
+            generation = db.table_generations.get(*cached_command.cache_tables)
+            out = api_response_cache.get(cache_key, generation)
+            if out is not None:
+                # finish sets the etag and answers a matching If-None-Match with a 304
+                self.set_header("Content-Type", "application/json;charset=UTF-8")
+                return self.finish(out)
+
         # set the original call_dispatcher as the local _call_dispatcher
         _call_dispatcher = self.call_dispatcher
         # if profile was set wrap "_call_dispatcher" in the profile function
@@ -105,7 +183,10 @@ class ApiHandler(RequestHandler):
             del kwargs["profile"]
 
         try:
-            out_dict = _call_dispatcher(args, kwargs)
+            if self.runs_inline(args, kwargs):
+                out_dict = _call_dispatcher(args, kwargs)
+            else:
+                out_dict = await IOLoop.current().run_in_executor(web_workers.api, _call_dispatcher, args, kwargs)
         except Exception as error:  # real internal error oh no :(
             logger.info(traceback.format_exc())
             logger.exception(f"API :: {error}")
@@ -119,7 +200,10 @@ class ApiHandler(RequestHandler):
 
         # noinspection PyBroadException
         try:
-            self.finish(output_callback(out_dict))
+            out = output_callback(out_dict)
+            if cached_command and output_callback == self._out_as_json and out_dict.get("result") == result_type_map[RESULT_SUCCESS]:
+                api_response_cache.set(cache_key, generation, cached_command.cache_ttl, out)
+            self.finish(out)
         except Exception:
             pass
 
@@ -139,6 +223,24 @@ class ApiHandler(RequestHandler):
             out = f'{{"result": "{result_type_map[RESULT_ERROR]}", "message": "error while composing output: {error}"}}'
         return out
 
+    @staticmethod
+    def runs_inline(args, kwargs):
+        """
+        Check if every command of a call is marked inline, those only read memory and run on the IOLoop
+        everything else runs on the api worker pool so a slow command doesn't stall the other clients
+        """
+        commands = kwargs.get("cmd", args[0] if args else None)
+        if not commands:
+            return CMDSickChill.inline
+        if not isinstance(commands, str):
+            return False
+
+        for cmd in commands.split("|"):
+            cmd = cmd.split("_")[0]
+            if cmd not in function_mapper or not function_mapper[cmd].inline:
+                return False
+        return True
+
     def call_dispatcher(self, args, kwargs):  # pylint:disable=too-many-branches
         """calls the appropriate CMD class
         looks for a cmd in args and kwargs
@@ -245,6 +347,12 @@ class ApiHandler(RequestHandler):
 # noinspection PyAbstractClass
 class ApiCall(ApiHandler):
     _help = {"desc": "This command is not documented. Please report this to the developers."}
+    # commands that only read memory can run on the IOLoop instead of the api worker pool
+    inline = False
+    # seconds to keep the response in the api response cache, it is dropped sooner when one of the cache_tables changes,
+    # image_cache changes when the ImageCache writes an image
+    cache_ttl = 0
+    cache_tables = ()
 
     # noinspection PyMissingConstructor
     def __init__(self, args, kwargs):
@@ -629,6 +737,7 @@ class CMDHelp(ApiCall):
             "subject": {"desc": "The name of the command to get the help of"},
         },
     }
+    inline = True
 
     def __init__(self, args, kwargs):
         super().__init__(args, kwargs)
@@ -653,6 +762,8 @@ class CMDComingEpisodes(ApiCall):
             "paused": {"desc": "0 to exclude paused shows, 1 to include them, or omitted to use SickChill default value"},
         },
     }
+    cache_ttl = 60
+    cache_tables = ("tv_shows", "tv_episodes")
 
     def __init__(self, args, kwargs):
         super().__init__(args, kwargs)
@@ -1107,6 +1218,8 @@ class CMDHistory(HistoryApiCall):
             "type": {"desc": "Only get some entries. No value will returns every type"},
         },
     }
+    cache_ttl = 60
+    cache_tables = ("history",)
 
     def __init__(self, args, kwargs):
         super().__init__(args, kwargs)
@@ -1229,56 +1342,35 @@ class CMDLogs(ApiCall):
             "min_level": {
                 "desc": "The minimum level classification of log entries to return. " "Each level inherits its above levels: debug < info < warning < error"
             },
+            "thread": {"desc": "Only return the log entries of the threads with names starting with this, e.g. SEARCHQUEUE"},
+            "since": {"desc": "Only return the log entries logged since this time, formatted as YYYY-MM-DD HH:MM:SS"},
         },
     }
 
     def __init__(self, args, kwargs):
         super().__init__(args, kwargs)
         self.min_level, args = self.check_params(args, kwargs, "min_level", "error", False, "string", ["error", "warning", "info", "debug"])
+        self.thread, args = self.check_params(args, kwargs, "thread", None, False, "string", [])
+        self.since, args = self.check_params(args, kwargs, "since", None, False, "string", [])
+        if self.since:
+            try:
+                self.since = datetime.datetime.strptime(self.since, dateTimeFormat).strftime(dateTimeFormat)
+            except ValueError:
+                raise ApiError(f"param: 'since' with given value: '{self.since}' is not formatted as YYYY-MM-DD HH:MM:SS")
 
     def run(self):
         """Get the logs"""
         # 10 = Debug / 20 = Info / 30 = Warning / 40 = Error
         min_level = logger.LOGGING_LEVELS[str(self.min_level).upper()]
 
-        data = []
-        if os.path.isfile(logger.log_file):
-            with open(logger.log_file, "r") as f:
-                data = f.readlines()
-
-        regex = r"^(\d\d\d\d)\-(\d\d)\-(\d\d)\s*(\d\d)\:(\d\d):(\d\d)\s*([A-Z]+)\s*(.+?)\s*\:\:\s*(.*)$"
-
         final_data = []
-
-        num_lines = 0
-        last_line = False
-        num_to_show = min(50, len(data))
-
-        for x in reversed(data):
-            match = re.match(regex, x)
-
-            if match:
-                level = match.group(7)
-                if level not in logger.LOGGING_LEVELS:
-                    last_line = False
-                    continue
-
-                if logger.LOGGING_LEVELS[level] >= min_level:
-                    last_line = True
-                    final_data.append(x.rstrip("\n"))
-                else:
-                    last_line = False
-                    continue
-
-            elif last_line:
-                final_data.append("AA" + x)
-
-            num_lines += 1
-
-            if num_lines >= num_to_show:
+        for record in logger.log_records(min_level, thread=self.thread, since=self.since):
+            final_data.extend(f"AA{line}" for line in reversed(record[1:]))
+            final_data.append(record[0])
+            if len(final_data) >= 50:
                 break
 
-        return _responds(RESULT_SUCCESS, final_data)
+        return _responds(RESULT_SUCCESS, final_data[:50])
 
 
 # noinspection PyAbstractClass
@@ -1386,6 +1478,7 @@ class CMDPostProcess(ApiCall):
 # noinspection PyAbstractClass
 class CMDSickChill(ApiCall):
     _help = {"desc": "Get miscellaneous information about SickChill"}
+    inline = True
 
     def run(self):
         """dGet miscellaneous information about SickChill"""
@@ -1552,6 +1645,7 @@ class CMDSickChillDeleteRootDir(ApiCall):
 # noinspection PyAbstractClass
 class CMDSickChillGetDefaults(ApiCall):
     _help = {"desc": "Get SickChill's user default configuration value"}
+    inline = True
 
     def run(self):
         """Get SickChill's user default configuration value"""
@@ -1572,6 +1666,7 @@ class CMDSickChillGetDefaults(ApiCall):
 # noinspection PyAbstractClass
 class CMDSickChillGetMessages(ApiCall):
     _help = {"desc": "Get all messages"}
+    inline = True
 
     def run(self):
         messages = []
@@ -1590,6 +1685,73 @@ class CMDSickChillGetRootDirs(ApiCall):
         return _responds(RESULT_SUCCESS, _get_root_dirs())
 
 
+# noinspection PyAbstractClass
+class CMDSickChillLogStats(ApiCall):
+    _help = {"desc": "Get the size, waiting and dropped records of the log queue, empty when the log is written directly"}
+    inline = True
+
+    def run(self):
+        """Get the size, waiting and dropped records of the log queue, empty when the log is written directly"""
+        return _responds(RESULT_SUCCESS, logger.queue_stats)
+
+
+# noinspection PyAbstractClass
+class CMDSickChillNameParserStats(ApiCall):
+    _help = {"desc": "Get name parser cache and CPU yield statistics"}
+    inline = True
+
+    def run(self):
+        """Get name parser cache and CPU yield statistics"""
+        data = {"cache": name_parser_cache.stats, "cpu_yield": parser_cpu_yield.stats}
+        return _responds(RESULT_SUCCESS, data)
+
+
+# noinspection PyAbstractClass
+class CMDSickChillDatabaseStats(ApiCall):
+    _help = {
+        "desc": "Get the query and database lock statistics, recorded while database statistics are enabled",
+        "optionalParameters": {"reset": {"desc": "True to clear the statistics after returning them"}},
+    }
+    inline = True
+
+    def __init__(self, args, kwargs):
+        super().__init__(args, kwargs)
+        self.reset, args = self.check_params(args, kwargs, "reset", False, False, "bool", [])
+
+    def run(self):
+        """Get the query and database lock statistics, recorded while database statistics are enabled"""
+        data = db.query_stats.stats
+        if self.reset:
+            db.query_stats.reset()
+        return _responds(RESULT_SUCCESS, data)
+
+
+# noinspection PyAbstractClass
+class CMDSickChillWebWorkers(ApiCall):
+    _help = {"desc": "Get the size, queue depth and in-flight requests of the web server worker pools"}
+    inline = True
+
+    def __init__(self, args, kwargs):
+        super().__init__(args, kwargs)
+
+    def run(self):
+        """Get the size, queue depth and in-flight requests of the web server worker pools"""
+        return _responds(RESULT_SUCCESS, web_workers.stats)
+
+
+# noinspection PyAbstractClass
+class CMDSickChillNotifierStats(ApiCall):
+    _help = {"desc": "Get the sent, failed, retried and coalesced notifications and their delivery latency per service"}
+    inline = True
+
+    def __init__(self, args, kwargs):
+        super().__init__(args, kwargs)
+
+    def run(self):
+        """Get the sent, failed, retried and coalesced notifications and their delivery latency per service"""
+        return _responds(RESULT_SUCCESS, notifiers.dispatcher.stats)
+
+
 # noinspection PyAbstractClass
 class CMDSickChillPauseBacklog(ApiCall):
     _help = {
@@ -1614,6 +1776,7 @@ class CMDSickChillPauseBacklog(ApiCall):
 # noinspection PyAbstractClass
 class CMDSickChillPing(ApiCall):
     _help = {"desc": "Ping SickChill to check if it is running"}
+    inline = True
 
     def run(self):
         """Ping SickChill to check if it is running"""
@@ -2147,6 +2310,8 @@ class CMDShowCache(ApiCall):
             "tvdbid": {"desc": "thetvdb.com unique ID of a show"},
         },
     }
+    cache_ttl = 60
+    cache_tables = ("tv_shows", "image_cache")
 
     def __init__(self, args, kwargs):
         super().__init__(args, kwargs)
@@ -2685,6 +2850,8 @@ class CMDShows(ApiCall):
             "paused": {"desc": "True: show paused, False: show un-paused, otherwise show all"},
         },
     }
+    cache_ttl = 60
+    cache_tables = ("tv_shows", "tv_episodes", "image_cache")
 
     def __init__(self, args, kwargs):
         super().__init__(args, kwargs)
@@ -2736,6 +2903,8 @@ class CMDShows(ApiCall):
 # noinspection PyAbstractClass
 class CMDShowsStats(ApiCall):
     _help = {"desc": "Get the global shows and episodes statistics"}
+    cache_ttl = 60
+    cache_tables = ("tv_shows", "tv_episodes")
 
     def run(self):
         """Get the global shows and episodes statistics"""
@@ -2779,10 +2948,14 @@ function_mapper = {
     "sc.checkversion": CMDSickChillCheckVersion,
     "sc.backup": CMDSickChillBackup,
     "sc.checkscheduler": CMDSickChillCheckScheduler,
+    "sc.dbstats": CMDSickChillDatabaseStats,
     "sc.deleterootdir": CMDSickChillDeleteRootDir,
     "sc.getdefaults": CMDSickChillGetDefaults,
     "sc.getmessages": CMDSickChillGetMessages,
     "sc.getrootdirs": CMDSickChillGetRootDirs,
+    "sc.logstats": CMDSickChillLogStats,
+    "sc.nameparserstats": CMDSickChillNameParserStats,
+    "sc.notifierstats": CMDSickChillNotifierStats,
     "sc.pausebacklog": CMDSickChillPauseBacklog,
     "sc.ping": CMDSickChillPing,
     "sc.restart": CMDSickChillRestart,
@@ -2794,6 +2967,7 @@ function_mapper = {
     "sc.searchtvrage": CMDSickChillSearchTVRAGE,
     "sc.setdefaults": CMDSickChillSetDefaults,
     "sc.update": CMDSickChillUpdate,
+    "sc.webworkers": CMDSickChillWebWorkers,
     "sc.shutdown": CMDSickChillShutdown,
     "show": CMDShow,
     "show.addexisting": CMDShowAddExisting,
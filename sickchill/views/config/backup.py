@@ -7,6 +7,7 @@ from sickchill import settings
 from sickchill.oldbeard import helpers
 from sickchill.views.common import PageTemplate
 from sickchill.views.routes import Route
+from sickchill.views.workers import slow_route
 
 from .index import Config
 
@@ -26,6 +27,7 @@ class ConfigBackupRestore(Config):
             action="backupRestore",
         )
 
+    @slow_route
     def backup(self):
         backup_dir = self.get_body_argument("backupDirectory", default="")
         final_result = ""
@@ -44,6 +46,7 @@ class ConfigBackupRestore(Config):
 
         return final_result
 
+    @slow_route
     def restore(self):
         backup_file = self.get_body_argument("backupFile", default="")
 
@@ -56,6 +56,8 @@ class ConfigGeneral(Config):
         self,
         log_nr=5,
         log_size=1,
+        log_queue=None,
+        log_queue_size=10000,
         web_port=None,
         notify_on_login=None,
         web_log=None,
@@ -75,6 +77,7 @@ class ConfigGeneral(Config):
         indexer_default=None,
         timezone_display=None,
         cpu_preset="NORMAL",
+        parser_cpu_yield=None,
         web_password=None,
         version_notify=None,
         enable_https=None,
@@ -92,6 +95,8 @@ class ConfigGeneral(Config):
         calendar_icons=None,
         debug=False,
         dbdebug=False,
+        database_wal=None,
+        database_stats=None,
         notify_on_logged_error=None,
         ssl_verify=None,
         no_restart=None,
@@ -137,6 +142,8 @@ class ConfigGeneral(Config):
         settings.NOTIFY_ON_UPDATE = config.checkbox_to_value(notify_on_update)
         settings.LOG_NR = log_nr
         settings.LOG_SIZE = float(log_size)
+        settings.LOG_QUEUE = config.checkbox_to_value(log_queue)
+        settings.LOG_QUEUE_SIZE = max(100, try_int(log_queue_size, 10000))
         if not config.change_log_dir(log_dir):
             results += [_("Unable to create directory {log_dir} or it is not writable, log directory not changed.").format(log_dir=os.path.normpath(log_dir))]
         settings.WEB_LOG = config.checkbox_to_value(web_log)
@@ -149,6 +156,7 @@ class ConfigGeneral(Config):
         settings.SORT_ARTICLE = config.checkbox_to_value(sort_article)
         settings.GRAMMAR_ARTICLES = grammar_articles
         settings.CPU_PRESET = cpu_preset
+        settings.PARSER_CPU_YIELD = config.checkbox_to_value(parser_cpu_yield)
         settings.ANON_REDIRECT = anon_redirect
         settings.PROXY_SETTING = proxy_setting
         if settings.PROXY_SETTING:
@@ -162,6 +170,9 @@ class ConfigGeneral(Config):
         settings.DBDEBUG = config.checkbox_to_value(dbdebug)
         logger.restart()
 
+        settings.DATABASE_WAL = config.checkbox_to_value(database_wal)
+        settings.DATABASE_STATS = config.checkbox_to_value(database_stats)
+
         settings.NOTIFY_ON_LOGGED_ERROR = config.checkbox_to_value(notify_on_logged_error)
 
         settings.SSL_VERIFY = config.checkbox_to_value(ssl_verify)
@@ -62,6 +62,7 @@ class ConfigSearch(Config):
         allow_high_priority=None,
         sab_forced=None,
         randomize_providers=None,
+        parallel_provider_search=None,
         use_failed_downloads=None,
         delete_failed=None,
         backlog_missing_only=None,
@@ -119,6 +120,7 @@ class ConfigSearch(Config):
         settings.IGNORED_SUBS_LIST = ignored_subs_list if ignored_subs_list else ""
 
         settings.RANDOMIZE_PROVIDERS = config.checkbox_to_value(randomize_providers)
+        settings.PARALLEL_PROVIDER_SEARCH = config.checkbox_to_value(parallel_provider_search)
 
         config.change_download_propers(download_propers)
 
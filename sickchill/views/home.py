@@ -40,6 +40,7 @@ from ..providers.metadata.helpers import getShowImage
 from .common import PageTemplate
 from .index import WebRoot
 from .routes import Route
+from .workers import slow_route
 
 
 @Route("/home(/?.*)", name="home")
@@ -1242,6 +1243,9 @@ class Home(WebRoot):
             # noinspection PyProtectedMember
             metadata_generator._write_image(img_data, dest_path, overwrite=True)
 
+        if poster or banner or fanart:
+            settings.IMAGE_CACHE.changed()
+
         # If directCall from mass_edit_update no scene exceptions handling or blackandwhite list handling
         if not directCall:
             with show_obj.lock:
@@ -1486,6 +1490,7 @@ class Home(WebRoot):
         else:
             return self.redirect("/home/")
 
+    @slow_route
     def setStatus(self, direct=False):
         if direct is True:
             # noinspection PyUnresolvedReferences
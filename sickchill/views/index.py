@@ -4,7 +4,6 @@ import json
 import os
 import time
 import traceback
-from concurrent.futures import ThreadPoolExecutor
 from mimetypes import guess_type
 from secrets import compare_digest
 from typing import Any
@@ -23,6 +22,7 @@ from sickchill.views.routes import Route
 from ..oldbeard import config, db, helpers, network_timezones, ui
 from .api.webapi import function_mapper
 from .common import PageTemplate
+from .workers import web_workers
 
 try:
     import jwt
@@ -144,7 +144,7 @@ class BaseHandler(RequestHandler):
 class WebHandler(BaseHandler):
     def initialize(self):
         super().initialize()
-        self.executor = ThreadPoolExecutor(thread_name_prefix="WEBSERVER-" + self.__class__.__name__.upper())
+        self.executor = web_workers.pages
 
     @authenticated
     async def get(self, route, *_args, **_kwargs):
@@ -168,6 +168,9 @@ class WebHandler(BaseHandler):
                 if len(sig.parameters):
                     logger.debug(f"{route} has signature {sig} and needs updated to use get_*_argument to properly decode and sanitize argument values")
 
+            if getattr(method, "slow_route", False):
+                self.executor = web_workers.slow
+
             results = await self.async_call(method, len(sig.parameters))
             try:
                 await self.finish(results)
@@ -4,7 +4,7 @@ import sickchill.oldbeard
 from sickchill.helper import try_int
 
 from .. import logger
-from ..oldbeard import classes, ui
+from ..oldbeard import classes, db, ui
 from .common import PageTemplate
 from .index import WebRoot
 from .routes import Route
@@ -62,6 +62,22 @@ class ErrorLogs(WebRoot):
 
         return self.redirect("/errorlogs/viewlog/")
 
+    def dbstats(self):
+        if self.get_query_argument("reset", None):
+            db.query_stats.reset()
+            return self.redirect("/errorlogs/dbstats/")
+
+        t = PageTemplate(rh=self, filename="dbstats.mako")
+        return t.render(
+            header=_("Database Stats"),
+            title=_("Database Stats"),
+            topmenu="system",
+            submenu=[{"title": _("Reset"), "path": "errorlogs/dbstats/?reset=1", "icon": "ui-icon ui-icon-trash"}],
+            stats=db.query_stats.stats,
+            controller="errorlogs",
+            action="dbstats",
+        )
+
     def viewlog(self):
         min_level = try_int(self.get_body_argument("min_level", str(logger.INFO)), logger.INFO)
         log_filter = self.get_body_argument("log_filter", "<NONE>")
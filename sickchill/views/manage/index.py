@@ -12,6 +12,7 @@ from sickchill.show.Show import Show
 from sickchill.views.common import PageTemplate
 from sickchill.views.home import Home, WebRoot
 from sickchill.views.routes import Route
+from sickchill.views.workers import slow_route
 
 
 @Route("/manage(/?.*)", name="manage:main")
@@ -511,6 +512,7 @@ class Manage(Home, WebRoot):
         )
 
     # noinspection PyProtectedMember, PyUnusedLocal
+    @slow_route
     def massEditSubmit(self):
         paused = self.get_body_argument("paused", None)
         default_ep_status = self.get_body_argument("default_ep_status", None)
@@ -622,6 +624,7 @@ class Manage(Home, WebRoot):
 
         return self.redirect("/manage/")
 
+    @slow_route
     def massUpdate(self):
         update = self.get_body_arguments("update")
         refresh = self.get_body_arguments("refresh")
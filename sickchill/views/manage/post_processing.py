@@ -5,6 +5,7 @@ from sickchill.oldbeard import config
 from sickchill.views.common import PageTemplate
 from sickchill.views.home import Home
 from sickchill.views.routes import Route
+from sickchill.views.workers import slow_route
 
 
 @Route("/home/postprocess(/?.*)", name="home:postprocess")
@@ -20,6 +21,7 @@ class PostProcess(Home):
             action="postProcess",
         )
 
+    @slow_route
     def processEpisode(
         self,
         proc_dir=None,
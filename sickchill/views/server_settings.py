@@ -16,6 +16,7 @@ from sickchill.views import CalendarHandler, LoginHandler, LogoutHandler, Movies
 from sickchill.views.api import ApiHandler, KeyHandler
 
 from .routes import Route
+from .workers import web_workers
 
 
 class SickChillStaticFileHandler(StaticFileHandler):
@@ -213,3 +214,4 @@ class SCWebServer(threading.Thread):
     def shutdown(self):
         self.alive = False
         IOLoop.current().stop()
+        web_workers.shutdown()
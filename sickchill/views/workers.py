@@ -0,0 +1,100 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sickchill import settings
+
+
+class WebWorkerPool(ThreadPoolExecutor):
+    """
+    A bounded thread pool shared by the web handlers that counts its queued, running and completed calls
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        super().__init__(max_workers=max_workers, thread_name_prefix=name)
+        self.name = name
+        self.max_workers = max_workers
+        self.stats_lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self.stats_lock:
+            self.queued += 1
+
+        def run():
+            with self.stats_lock:
+                self.queued -= 1
+                self.running += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self.stats_lock:
+                    self.running -= 1
+                    self.completed += 1
+
+        try:
+            return super().submit(run)
+        except RuntimeError:
+            with self.stats_lock:
+                self.queued -= 1
+            raise
+
+    @property
+    def stats(self) -> dict:
+        with self.stats_lock:
+            return {"max_workers": self.max_workers, "queued": self.queued, "running": self.running, "completed": self.completed}
+
+
+class WebWorkers(object):
+    """
+    The process wide worker pools of the web server: pages, slow operations like mass updates and the api
+
+    The pools are created the first time they are used, after the config is loaded, and sized with WEB_WORKERS, WEB_SLOW_WORKERS and WEB_API_WORKERS.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pools = {}
+
+    def _pool(self, name: str, size: int) -> WebWorkerPool:
+        pool = self.pools.get(name)
+        if pool is None:
+            with self.lock:
+                pool = self.pools.get(name)
+                if pool is None:
+                    pool = self.pools[name] = WebWorkerPool(name, max(1, size))
+        return pool
+
+    @property
+    def pages(self) -> WebWorkerPool:
+        return self._pool("WEBSERVER", settings.WEB_WORKERS)
+
+    @property
+    def slow(self) -> WebWorkerPool:
+        return self._pool("WEBSERVER-SLOW", settings.WEB_SLOW_WORKERS)
+
+    @property
+    def api(self) -> WebWorkerPool:
+        return self._pool("WEBSERVER-API", settings.WEB_API_WORKERS)
+
+    @property
+    def stats(self) -> dict:
+        return {name: pool.stats for name, pool in self.pools.copy().items()}
+
+    def shutdown(self, wait: bool = False):
+        with self.lock:
+            pools = list(self.pools.values())
+            self.pools.clear()
+
+        for pool in pools:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+web_workers = WebWorkers()
+
+
+def slow_route(function):
+    """Mark a web route that runs long, like a mass update, to run on the slow worker pool so it can't hold up the pages"""
+    function.slow_route = True
+    return function
@@ -130,15 +130,19 @@ def _dummy_save_config():
 sickchill.start.save_config = _dummy_save_config
 
 
-def _fake_specify_ep(self, season, episode):
+def _fake_specify_ep(self, season, episode, sql_result=None, scene_numbering=None):
     """
     Override contact to TVDB indexer.
 
-    :param self: ...not used
+    :param self: The episode, only loaded if a database row is passed in
     :param season: Season to search for  ...not used
     :param episode: Episode to search for  ...not used
+    :param sql_result: Database row to load the episode from
+    :param scene_numbering: Scene numbering maps of the show
     """
-    _ = self, season, episode  # throw away unused variables
+    _ = season, episode  # throw away unused variables
+    if sql_result is not None:
+        self.load_from_db_row(sql_result, scene_numbering)
 
 
 # the real one tries to contact TVDB just stop it from getting more info on the ep
@@ -2,14 +2,19 @@
 Test shows
 """
 
+import os
+import time
 import unittest
 
 from sickchill import settings
 from sickchill.helper.exceptions import MultipleShowObjectsException
 from sickchill.oldbeard.common import Quality
 from sickchill.show.Show import Show
+from sickchill.show.ShowList import ShowList
 from sickchill.tv import TVShow
 
+BENCHMARK = os.getenv("BENCHMARK")
+
 
 class ShowTests(unittest.TestCase):
     """
@@ -110,6 +115,99 @@ class ShowTests(unittest.TestCase):
             assert Show.validate_indexer_id(indexer_id) == results_list[index], (indexer_id, results_list[index])
 
 
+class ShowListTests(unittest.TestCase):
+    """
+    Test the indexed show list
+    """
+
+    def setUp(self):
+        settings.show_list = []
+        self.show123 = TestTVShow(0, 123)
+        self.show123.name = "Show 123"
+        self.show456 = TestTVShow(0, 456)
+        self.show456.name = "Show 456"
+        self.shows = ShowList([self.show123, self.show456])
+        settings.show_list = self.shows
+
+    def tearDown(self):
+        settings.show_list = []
+
+    def test_find(self):
+        """
+        Test the indexed lookups match the linear scan
+        """
+        for indexer_id in (123, "123", 456, 789, None, ""):
+            assert Show.find(self.shows, indexer_id) is Show.find(list(self.shows), indexer_id), indexer_id
+
+        assert Show.find(self.shows, 123) is self.show123
+        assert Show.find_name(self.shows, "Show 456") is self.show456
+        assert self.shows.by_scene_name("show 456") == [self.show456]
+        assert Show.find(self.shows, 789) is None
+
+        with self.assertRaises(MultipleShowObjectsException):
+            Show.find(self.shows, [123, 456])
+
+        with self.assertRaises(MultipleShowObjectsException):
+            Show.find(ShowList([self.show123, self.show123]), 123)
+
+    def test_updates(self):
+        """
+        Test the indexes follow shows being added, removed and renamed
+        """
+        show789 = TestTVShow(0, 789)
+        self.shows.append(show789)
+        assert Show.find(self.shows, 789) is show789
+        assert show789 in self.shows
+
+        self.shows.remove(self.show456)
+        assert Show.find(self.shows, 456) is None
+        assert self.show456 not in self.shows
+
+        self.show123.indexerid = 321
+        assert Show.find(self.shows, 123) is None
+        assert Show.find(self.shows, 321) is self.show123
+
+        self.show123.name = "Renamed"
+        assert Show.find_name(self.shows, "Show 123") is None
+        assert Show.find_name(self.shows, "Renamed") is self.show123
+
+        self.shows.sort(key=lambda show: show.indexerid)
+        assert [show.indexerid for show in self.shows] == [321, 789]
+        assert Show.find(self.shows, 789) is show789
+
+        self.shows[0] = self.show456
+        assert Show.find(self.shows, 321) is None
+        assert Show.find(self.shows, 456) is self.show456
+
+
+@unittest.skipUnless(BENCHMARK, "Set BENCHMARK=1 to run the benchmarks")
+class ShowListBenchmarkTests(unittest.TestCase):
+    """
+    Compare lookups in a plain list with the indexed show list
+    """
+
+    SHOWS = 1500
+    LOOKUPS = 3000
+
+    def test_find(self):
+        settings.show_list = []
+        shows = [TestTVShow(0, indexer_id) for indexer_id in range(1, self.SHOWS + 1)]
+        indexed = ShowList(shows)
+        indexer_ids = [(index * 7919) % self.SHOWS + 1 for index in range(self.LOOKUPS)]
+
+        timings = {}
+        for label, show_list in (("list", shows), ("ShowList", indexed)):
+            start = time.perf_counter()
+            for indexer_id in indexer_ids:
+                assert Show.find(show_list, indexer_id).indexerid == indexer_id
+            timings[label] = time.perf_counter() - start
+
+        for label, elapsed in timings.items():
+            print(f"{label}: {self.LOOKUPS / elapsed:.0f} lookups/sec with {self.SHOWS} shows")
+
+        assert timings["ShowList"] < timings["list"]
+
+
 class TestTVShow(TVShow):
     """
     A test `TVShow` object that does not need DB access.
@@ -0,0 +1,247 @@
+"""
+Test sickchill.logger
+"""
+
+import logging
+import os
+import re
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from urllib.parse import quote
+
+from sickchill import logger, settings
+from sickchill.oldbeard import classes
+
+BENCHMARK = os.getenv("BENCHMARK")
+
+
+class CensorTests(unittest.TestCase):
+    """
+    Test the formatter censors the secrets with the combined pattern
+    """
+
+    def setUp(self):
+        self.addCleanup(logger.censored_items.update, dict(logger.censored_items))
+        self.addCleanup(logger.censored_items.clear)
+        logger.censored_items.clear()
+        classes.ErrorViewer.clear()
+        self.formatter = logger.DispatchFormatter("{message}")
+
+    def censor(self, msg):
+        self.formatter.format(logging.LogRecord("sickchill", logging.ERROR, __file__, 0, msg, None, None))
+        return classes.ErrorViewer.errors[-1].message
+
+    def test_censor(self):
+        logger.censored_items["General", "password"] = "password"
+        logger.censored_items["General", "other_password"] = "password_1"
+        logger.censored_items["General", "plus"] = "++secret"
+        logger.censored_items["General", "quoted"] = "a b"
+
+        assert self.censor("password password_1 passwords") == "******** ******** passwords"
+        assert self.censor("login with x++secret") == "login with x********"
+        assert self.censor(f"url with {quote('a b')}") == "url with ********"
+        assert self.censor("https://indexer/api?t=search&apikey=1234&q=show") == "https://indexer/api?t=search&apikey=**********&q=show"
+
+    def test_rebuilt_on_change(self):
+        logger.censored_items["General", "password"] = "first"
+        assert self.censor("first second") == "******** second"
+        pattern = logger.DispatchFormatter.censor_patterns()[0]
+        assert logger.DispatchFormatter.censor_patterns()[0] is pattern
+
+        logger.censored_items["General", "password"] = "second"
+        assert self.censor("first second") == "first ********"
+        assert logger.DispatchFormatter.censor_patterns()[0] is not pattern
+
+        del logger.censored_items["General", "password"]
+        assert self.censor("first second") == "first second"
+
+
+class QueueTests(unittest.TestCase):
+    """
+    Test the records are written from the listener thread and dropped when the queue is full
+    """
+
+    def test_drop_policy(self):
+        handler = logger.BoundedQueueHandler(2)
+
+        def log(level, msg):
+            handler.handle(logging.LogRecord("sickchill", level, __file__, 0, msg, None, None))
+
+        def waiting():
+            return [handler.queue.get_nowait().getMessage() for _ in range(handler.queue.qsize())]
+
+        log(logging.DEBUG, "first")
+        log(logging.DEBUG, "second")
+        log(logging.DEBUG, "third")
+        warning = "The log queue is full, 1 log records were dropped, raise the size of the log queue or turn it off"
+        assert waiting() == ["second", warning]
+        assert handler.stats == {"size": 2, "waiting": 0, "dropped": 2}
+
+        # the warning is rate limited, and errors push out the oldest records
+        for msg in ("fourth", "fifth", "sixth"):
+            log(logging.DEBUG, msg)
+        log(logging.ERROR, "error")
+        assert waiting() == ["fifth", "error"]
+        assert handler.stats == {"size": 2, "waiting": 0, "dropped": 4}
+
+    @patch.object(settings, "LOG_QUEUE", True)
+    @patch.object(settings, "LOG_SIZE", 0.001)
+    def test_queued_file_logging(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        classes.ErrorViewer.clear()
+
+        instance = logger.Logger()
+        instance.logger = logging.getLogger("sickchill.test_queue")
+        instance.loggers = [instance.logger]
+        instance.log_file = os.path.join(directory.name, "sickchill.log")
+        instance.init_logging(file_logging=True)
+        self.addCleanup(instance.close_and_remove_handlers)
+
+        assert instance.listener and instance.logger.handlers == [instance.queue_handler]
+        for number in range(20):
+            instance.logger.info(f"Queued record {number}")
+        instance.logger.error("Queued error")
+        instance.close_and_remove_handlers()
+
+        assert instance.queue_stats == {}
+        assert os.path.isfile(os.path.join(directory.name, "sickchill.log.1"))
+        with open(instance.log_file) as log:
+            assert "Queued error" in log.read()
+        assert classes.ErrorViewer.errors[-1].message == "Queued error"
+
+
+class LogQueryTests(unittest.TestCase):
+    """
+    Test the log is read backwards and the warnings and errors are found with the index
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.log_file = os.path.join(directory.name, "sickchill.log")
+
+        patcher = patch.object(logger.Wrapper.instance, "log_file", self.log_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for name, value in (("DEBUG", True), ("DBDEBUG", False), ("LOG_NR", 3)):
+            patcher = patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.write(
+            f"{self.log_file}.1",
+            "2024-01-01 10:00:00 INFO :: MAIN :: Starting",
+            "2024-01-01 10:00:01 ERROR :: SEARCHQUEUE-BACKLOG :: Old error",
+            "2024-01-01 10:00:02 DEBUG :: MAIN :: Old debug",
+        )
+        self.write(
+            self.log_file,
+            "2024-01-02 10:00:00 DEBUG :: SEARCHQUEUE-DAILY-SEARCH :: Searching",
+            "2024-01-02 10:00:01 WARNING :: SEARCHQUEUE-DAILY-SEARCH :: No results",
+            "2024-01-02 10:00:02 ERROR :: POSTPROCESSOR :: Failed",
+            "Traceback (most recent call last):",
+            '  File "postProcessor.py", line 1',
+            "2024-01-02 10:00:03 DB :: MAIN :: SELECT 1",
+            "2024-01-02 10:00:04 INFO :: MAIN :: Done",
+        )
+
+    @staticmethod
+    def write(path, *lines):
+        with open(path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def messages(self, *args, **kwargs):
+        return [record[0].rpartition(" :: ")[2] for record in logger.log_records(*args, **kwargs)]
+
+    def test_reverse_lines(self):
+        lines = [line for _, line in logger.reverse_lines(self.log_file, block_size=7)]
+        with open(self.log_file) as f:
+            assert lines == [""] + f.read().splitlines()[::-1]
+
+        with open(self.log_file, "rb") as f:
+            for offset, line in logger.reverse_lines(self.log_file, block_size=16):
+                f.seek(offset)
+                assert f.readline().decode().rstrip("\n") == line
+
+    def test_log_records(self):
+        assert self.messages(logger.DEBUG) == ["Done", "Failed", "No results", "Searching", "Old debug", "Old error", "Starting"]
+        assert self.messages(logger.INFO, thread="SEARCHQUEUE") == ["No results", "Old error"]
+        assert self.messages(logger.DEBUG, since="2024-01-02 10:00:01") == ["Done", "Failed", "No results"]
+        assert self.messages(search="searching") == ["Searching"]
+        assert next(logger.log_records(logger.ERROR)) == [
+            "2024-01-02 10:00:02 ERROR :: POSTPROCESSOR :: Failed",
+            "Traceback (most recent call last):",
+            '  File "postProcessor.py", line 1',
+        ]
+
+        data = logger.log_data(logger.INFO, "<NONE>", "", 4)
+        assert data[0] == "2024-01-02 10:00:04 INFO :: MAIN :: Done\n"
+        assert data[1:3] == ['AA   File "postProcessor.py", line 1\n', "AA Traceback (most recent call last):\n"]
+
+    def test_index(self):
+        assert self.messages(logger.WARNING) == ["Failed", "No results", "Old error"]
+        assert self.messages(logger.ERROR, thread="SEARCHQUEUE", since="2024-01-01") == ["Old error"]
+
+        index = logger.LogIndex.load(self.log_file)
+        assert index.size == os.path.getsize(self.log_file)
+        assert set(index.offsets) == {"WARNING", "ERROR"}
+
+        self.write(self.log_file, "2024-01-02 10:00:05 ERROR :: MAIN :: New error")
+        assert self.messages(logger.ERROR) == ["New error", "Failed", "Old error"]
+        assert logger.LogIndex.load(self.log_file).size == os.path.getsize(self.log_file)
+
+        # rotated, the index of the renamed file is found by its first line
+        os.rename(f"{self.log_file}.1", f"{self.log_file}.2")
+        os.rename(self.log_file, f"{self.log_file}.1")
+        self.write(self.log_file, "2024-01-03 10:00:00 ERROR :: MAIN :: Rotated")
+        with patch.object(logger.LogIndex, "extend", side_effect=logger.LogIndex.extend, autospec=True) as extend:
+            assert self.messages(logger.ERROR) == ["Rotated", "New error", "Failed", "Old error"]
+        assert [call.args[1] for call in extend.call_args_list] == [self.log_file]
+        assert logger.LogIndex.load(f"{self.log_file}.1").offsets == index.offsets | {"ERROR": index.offsets["ERROR"] + [index.size]}
+
+        # the index of the file rotated out of the log is forgotten
+        old_head = logger.LogIndex.read_head(f"{self.log_file}.2")
+        assert old_head in logger.LogIndex.indexes
+        with patch.object(settings, "LOG_NR", 2):
+            assert self.messages(logger.ERROR) == ["Rotated", "New error", "Failed"]
+        assert old_head not in logger.LogIndex.indexes
+        assert len(logger.LogIndex.indexes) == 2
+
+
+@unittest.skipUnless(BENCHMARK, "Set BENCHMARK=1 to run the benchmarks")
+class CensorBenchmark(unittest.TestCase):
+    """Format debug records with 50 secrets censored with a re.sub per item and with the combined pattern"""
+
+    def test_throughput(self):
+        records = 5000
+        items = {("General", f"secret_{number}"): f"secret{number}value" for number in range(50)}
+        record = logging.LogRecord("sickchill", logging.DEBUG, __file__, 0, "Searching https://indexer/api?apikey=secret7value&q=show", None, None)
+        formatter = logger.DispatchFormatter("{message}")
+
+        def per_item(msg):
+            censored = {item for item in items.values() if item}
+            censored = sorted(censored | {quote(item) for item in censored}, key=len, reverse=True)
+            for item in censored:
+                msg = re.sub(rf"\b({item})\b", "*" * 8, msg)
+            return logging.Formatter.format(formatter, record)
+
+        self.addCleanup(logger.censored_items.update, dict(logger.censored_items))
+        self.addCleanup(logger.censored_items.clear)
+        logger.censored_items.clear()
+        logger.censored_items.update(items)
+
+        start = time.perf_counter()
+        for _ in range(records):
+            per_item(record.msg)
+        separate = records / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(records):
+            formatter.format(record)
+        combined = records / (time.perf_counter() - start)
+
+        print(f"\n{records} records, 50 secrets: a pattern per item {separate:.0f} records/s, combined pattern {combined:.0f} records/s")
+        assert combined > separate
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import pytest
+from tornado.httpclient import AsyncHTTPClient
+from tornado.httpserver import HTTPServer
+from tornado.testing import bind_unused_port
+from tornado.web import Application, url
+
+from sickchill import settings
+from sickchill.oldbeard import db
+from sickchill.oldbeard.image_cache import ImageCache
+from sickchill.views.api import webapi
+from sickchill.views.workers import web_workers
+
+BENCHMARK = os.getenv("BENCHMARK")
+
+
+class SlowCommand(webapi.ApiCall):
+    _help = {"desc": "Wait until the test releases it"}
+    release = threading.Event()
+
+    def run(self):
+        self.release.wait(10)
+        return webapi._responds(webapi.RESULT_SUCCESS, msg="slow")
+
+
+class CachedCommand(webapi.ApiCall):
+    _help = {"desc": "Count the times it runs"}
+    cache_ttl = 60
+    cache_tables = ("tv_shows",)
+    runs = 0
+
+    def run(self):
+        CachedCommand.runs += 1
+        return webapi._responds(webapi.RESULT_SUCCESS, {"runs": CachedCommand.runs})
+
+
+class SleepCommand(webapi.ApiCall):
+    _help = {"desc": "Sleep like a command waiting on the disk or an indexer"}
+
+    def run(self):
+        time.sleep(0.05)
+        return webapi._responds(webapi.RESULT_SUCCESS, msg="slept")
+
+
+def serve_api(test, max_clients=10):
+    """Run the coroutine function test with a function calling an api command on a local server"""
+
+    async def main():
+        sock, port = bind_unused_port()
+        server = HTTPServer(Application([url(r"/api/key(/?.*)", webapi.ApiHandler)]))
+        server.add_sockets([sock])
+        client = AsyncHTTPClient(force_instance=True, max_clients=max_clients)
+
+        async def call(cmd, headers=None, response=False):
+            result = await client.fetch(f"http://127.0.0.1:{port}/api/key/?cmd={cmd}", headers=headers, raise_error=False)
+            return result if response else json.loads(result.body)
+
+        try:
+            await test(call)
+        finally:
+            client.close()
+            server.stop()
+
+    web_workers.shutdown()
+    webapi.api_response_cache.clear()
+    try:
+        with patch.dict(webapi.function_mapper, {"test.slow": SlowCommand, "test.sleep": SleepCommand, "test.cached": CachedCommand}):
+            asyncio.run(main())
+    finally:
+        web_workers.shutdown()
+
+
+def test_runs_inline():
+    assert webapi.ApiHandler.runs_inline((), {})
+    assert webapi.ApiHandler.runs_inline((), {"cmd": "sc.ping|sc.webworkers"})
+    assert webapi.ApiHandler.runs_inline(("sc.ping",), {})
+    assert not webapi.ApiHandler.runs_inline((), {"cmd": "sc.ping|shows"})
+    assert not webapi.ApiHandler.runs_inline((), {"cmd": "show.refresh"})
+    assert not webapi.ApiHandler.runs_inline((), {"cmd": "123"})
+
+
+def test_logs_since():
+    assert webapi.CMDLogs((), {"since": "2024-1-2 10:00:01"}).since == "2024-01-02 10:00:01"
+    assert webapi.CMDLogs((), {}).since is None
+    for since in ("yesterday", "2024-01-02"):
+        with pytest.raises(webapi.ApiError):
+            webapi.CMDLogs((), {"since": since})
+
+
+def test_slow_command_does_not_block():
+    async def test(call):
+        SlowCommand.release.clear()
+        slow = asyncio.ensure_future(call("test.slow"))
+        try:
+            while not web_workers.stats.get("WEBSERVER-API", {}).get("running"):
+                await asyncio.sleep(0.01)
+
+            assert (await call("sc.ping"))["message"] == "Pong"
+            assert (await call("sc.webworkers"))["data"]["WEBSERVER-API"]["running"] == 1
+        finally:
+            SlowCommand.release.set()
+
+        assert (await slow)["message"] == "slow"
+
+    serve_api(test)
+
+
+def test_response_cache():
+    async def test(call):
+        CachedCommand.runs = 0
+
+        first = await call("test.cached", response=True)
+        assert json.loads(first.body)["data"] == {"runs": 1}
+        assert (await call("test.cached"))["data"] == {"runs": 1}
+        assert (await call("test.cached&callback=jsonp", response=True)).body.startswith(b'jsonp({"data": {"runs": 2}')
+        assert CachedCommand.runs == 2
+
+        etag = first.headers["Etag"]
+        not_modified = await call("test.cached", headers={"If-None-Match": etag}, response=True)
+        assert not_modified.code == 304
+
+        db.table_generations.bump("tv_shows")
+        changed = await call("test.cached", response=True)
+        assert json.loads(changed.body)["data"] == {"runs": 3}
+        assert changed.headers["Etag"] != etag
+
+        with patch.object(CachedCommand, "cache_tables", ("image_cache",)):
+            webapi.api_response_cache.clear()
+            assert (await call("test.cached"))["data"] == {"runs": 4}
+            assert (await call("test.cached"))["data"] == {"runs": 4}
+            ImageCache.changed()
+            assert (await call("test.cached"))["data"] == {"runs": 5}
+
+        with patch.object(CachedCommand, "cache_ttl", -1):
+            webapi.api_response_cache.clear()
+            await call("test.cached")
+            assert (await call("test.cached"))["data"] == {"runs": 7}
+
+        assert webapi.ApiResponseCache.command((), {"cmd": "test.cached|sc.ping"}) is None
+        assert webapi.ApiResponseCache.command((), {"cmd": "test.cached", "profile": "1"}) is None
+        assert webapi.ApiResponseCache.command((), {"cmd": "sc.ping"}) is None
+
+    serve_api(test)
+
+
+@unittest.skipUnless(BENCHMARK, "Set BENCHMARK=1 to run the benchmarks")
+def test_api_throughput_benchmark():
+    """Load the api with concurrent clients calling a command that sleeps, on the IOLoop and on the worker pool"""
+    requests = 200
+    clients = 20
+    results = {}
+
+    async def load(call):
+        start = time.perf_counter()
+        await asyncio.gather(*[call("test.sleep") for _ in range(requests)])
+        return requests / (time.perf_counter() - start)
+
+    async def test(call):
+        with patch.object(SleepCommand, "inline", True):
+            results["blocking"] = await load(call)
+        results["pooled"] = await load(call)
+
+    with patch.object(settings, "WEB_API_WORKERS", clients):
+        serve_api(test, max_clients=clients)
+
+    print(f"\n{requests} requests from {clients} clients: on the IOLoop {results['blocking']:.0f} req/s, on the worker pool {results['pooled']:.0f} req/s")
+    assert results["pooled"] > results["blocking"]
@@ -0,0 +1,61 @@
+import threading
+from unittest.mock import MagicMock
+
+from tornado.httputil import HTTPServerRequest
+from tornado.web import Application
+
+from sickchill import settings
+from sickchill.views.index import WebRoot
+from sickchill.views.manage.index import Manage
+from sickchill.views.workers import slow_route, web_workers, WebWorkerPool
+
+
+def make_handler(handler_class=WebRoot):
+    return handler_class(Application(), HTTPServerRequest(method="GET", uri="/", connection=MagicMock()))
+
+
+def test_worker_pool_stats():
+    pool = WebWorkerPool("TEST", 1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    first = pool.submit(blocking)
+    second = pool.submit(lambda: "queued")
+    assert started.wait(5)
+    assert pool.stats == {"max_workers": 1, "queued": 1, "running": 1, "completed": 0}
+
+    release.set()
+    assert first.result(5) == "done"
+    assert second.result(5) == "queued"
+    assert pool.stats == {"max_workers": 1, "queued": 0, "running": 0, "completed": 2}
+    pool.shutdown()
+
+
+def test_handlers_share_the_pools(monkeypatch):
+    web_workers.shutdown()
+    monkeypatch.setattr(settings, "WEB_WORKERS", 3)
+    monkeypatch.setattr(settings, "WEB_SLOW_WORKERS", 1)
+
+    handlers = [make_handler() for _ in range(5)]
+    assert all(handler.executor is web_workers.pages for handler in handlers)
+    assert web_workers.pages.max_workers == 3
+    assert web_workers.slow.max_workers == 1
+    assert set(web_workers.stats) == {"WEBSERVER", "WEBSERVER-SLOW"}
+
+    web_workers.shutdown()
+    assert web_workers.stats == {}
+
+
+def test_slow_route():
+    @slow_route
+    def mass_update():
+        pass
+
+    assert mass_update.slow_route
+    assert getattr(make_handler(Manage).massUpdate, "slow_route", False)
+    assert not getattr(make_handler(Manage).index, "slow_route", False)
@@ -6,14 +6,40 @@ Tests:
     DBMultiTests
 """
 
+import os
+import sqlite3
+import statistics
 import threading
 import time
 import unittest
 from datetime import datetime
+from unittest.mock import MagicMock, patch
 
 import sickchill.oldbeard
+from sickchill import settings
+from sickchill.oldbeard import tvcache
+from sickchill.oldbeard.common import Quality, WANTED
+from sickchill.oldbeard.name_parser.parser import ParseResult
+from sickchill.tv import TVEpisode, TVShow
 from tests import conftest
 
+BENCHMARK = os.getenv("BENCHMARK")
+
+
+def drop_connection(connection):
+    """
+    Close the shared and read only connections of a test database and remove its files
+    """
+    db = sickchill.oldbeard.db
+    with db.db_readers_lock:
+        for key in [key for key in db.db_readers if key[1] == connection.full_path]:
+            db.db_readers.pop(key).close()
+
+    db.db_cons.pop(connection.filename).close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.isfile(connection.full_path + suffix):
+            os.remove(connection.full_path + suffix)
+
 
 class DBBasicTests(conftest.SickChillTestDBCase):
     """
@@ -147,6 +173,397 @@ class CacheDBTests(conftest.SickChillTestDBCase):
 
         assert num_rows() == 3
 
+    def test_upsert_many(self):
+        """
+        Test rows are updated, inserted and deleted in one call
+        """
+        updated = (dict(self.record[0], seeders=10), dict(self.record[1]))
+        inserted = (dict(self.record[0], url="new_url", seeders=20), {"url": "new_url"})
+
+        self.cache_db_con.upsert_many("results", [updated, inserted])
+        results = {row["url"]: row["seeders"] for row in self.cache_db_con.select("SELECT url, seeders FROM results")}
+        assert results == {"url": 10, "new_url": 20}
+
+        self.cache_db_con.upsert_many("results", [], delete_list=[{"url": "url"}])
+        assert [row["url"] for row in self.cache_db_con.select("SELECT url FROM results")] == ["new_url"]
+
+    def test_table_generations(self):
+        """
+        Test the generation of a table is bumped by the committed writes to it and not by reads
+        """
+        generations = sickchill.oldbeard.db.table_generations
+
+        before = generations.get("results")
+        self.cache_db_con.select("SELECT * FROM results")
+        self.cache_db_con.action("SELECT * FROM results")
+        assert generations.get("results") == before
+
+        self.cache_db_con.action("UPDATE results SET seeders = 2")
+        assert generations.get("results") == (before[0] + 1,)
+
+        self.cache_db_con.mass_action([["DELETE FROM [results] WHERE url = ?", ["url"]], ["SELECT * FROM results"]])
+        assert generations.get("results") == (before[0] + 2,)
+
+        self.cache_db_con.upsert_many("results", [self.record])
+        assert generations.get("results", "provider_properties") == (before[0] + 3, generations.get("provider_properties")[0])
+
+
+class ResultEpisodesTests(conftest.SickChillTestDBCase):
+    """
+    Test the episode index and proper flag of the provider results cache
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.cache_db_con = sickchill.oldbeard.db.DBConnection("cache.db")
+        self.cache_db_con.action("DELETE FROM results")
+
+        self.provider = MagicMock(anime_only=False, proper_strings=["PROPER|REPACK|REAL"])
+        self.provider.get_id.return_value = "provider"
+        self.cache = tvcache.TVCache(self.provider)
+
+        self.show = TVShow(1, 5, "en")
+        self.show.name = "Show Name"
+        self.show.quality = Quality.HDTV
+        self.show.save_to_db()
+        settings.show_list = [self.show]
+
+        self.episode = TVEpisode(self.show, 1, 2)
+        self.episode.status = WANTED
+        self.episode.save_to_db()
+        self.show.episodes = {1: {2: self.episode}}
+
+    def add_result(self, name, episodes):
+        parse_result = ParseResult(name, series_name="Show Name", season_number=1, episode_numbers=episodes, quality=Quality.HDTV)
+        parse_result.show = self.show
+        return self.cache.add_cache_entry(name, f"https://provider/{name}", 1, 1, 1, parse_result=parse_result)
+
+    def test_find_needed_episodes(self):
+        """
+        Test results are found by episode and removed from the index with the result
+        """
+        self.cache.add_results(
+            [
+                self.add_result("Show.Name.S01E02.720p.HDTV.x264-GRP", [2]),
+                self.add_result("Show.Name.S01E01E02.720p.HDTV.x264-GRP", [1, 2]),
+                self.add_result("Show.Name.S01E12.720p.HDTV.x264-GRP", [12]),
+            ]
+        )
+
+        found = self.cache.find_needed_episodes(self.episode, manual_search=True)
+        assert [result.name for result in found[self.episode]] == ["Show.Name.S01E02.720p.HDTV.x264-GRP"]
+        assert len(self.cache_db_con.select("SELECT * FROM result_episodes WHERE provider = 'provider' AND episode = 2")) == 2
+
+        self.cache_db_con.action("DELETE FROM results WHERE name = ?", ["Show.Name.S01E02.720p.HDTV.x264-GRP"])
+        assert len(self.cache_db_con.select("SELECT * FROM result_episodes WHERE provider = 'provider' AND episode = 2")) == 1
+
+    def test_duplicate_results(self):
+        """
+        Test a result found twice in one batch is indexed and found once
+        """
+        entry = self.add_result("Show.Name.S01E02.720p.HDTV.x264-GRP", [2])
+        self.cache.add_results([entry, entry])
+        self.cache.add_results([entry])
+
+        assert len(self.cache_db_con.select("SELECT * FROM results WHERE provider = 'provider'")) == 1
+        assert len(self.cache_db_con.select("SELECT * FROM result_episodes WHERE provider = 'provider'")) == 1
+        found = self.cache.find_needed_episodes(self.episode, manual_search=True)
+        assert [result.name for result in found[self.episode]] == ["Show.Name.S01E02.720p.HDTV.x264-GRP"]
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.cache_db_con.connection.execute(
+                "INSERT INTO result_episodes (url, provider, indexerid, season, episode) VALUES (?, 'provider', 5, 1, 2)", [entry[0]["url"]]
+            )
+
+    def test_find_needed_episodes_list(self):
+        """
+        Test the results of many episodes are found with one query for the results and one for the episode statuses
+        """
+        other_episode = TVEpisode(self.show, 1, 3)
+        other_episode.status = WANTED
+        other_episode.save_to_db()
+        self.show.episodes[1][3] = other_episode
+
+        self.episode.wantedQuality = [Quality.HDTV]
+        other_episode.wantedQuality = [Quality.HDWEBDL]
+
+        self.cache.add_results(
+            [
+                self.add_result("Show.Name.S01E02.720p.HDTV.x264-GRP", [2]),
+                self.add_result("Show.Name.S01E03.720p.HDTV.x264-GRP", [3]),
+                self.add_result("Show.Name.S01E04.720p.HDTV.x264-GRP", [4]),
+            ]
+        )
+
+        with patch.object(sickchill.oldbeard.db.DBConnection, "select", autospec=True, side_effect=sickchill.oldbeard.db.DBConnection.select) as select:
+            found = self.cache.find_needed_episodes([self.episode, other_episode])
+
+        assert {episode: [result.name for result in results] for episode, results in found.items()} == {self.episode: ["Show.Name.S01E02.720p.HDTV.x264-GRP"]}
+        assert select.call_count == 2
+
+    def test_list_propers(self):
+        """
+        Test propers are flagged with the proper strings of the provider when they are cached
+        """
+        self.cache.add_results(
+            [
+                self.add_result("Show.Name.S01E02.PROPER.720p.HDTV.x264-GRP", [2]),
+                self.add_result("Show.Name.S01E02.real.720p.HDTV.x264-GRP", [2]),
+                self.add_result("Show.Name.S01E02.720p.HDTV.x264-PROPERGRP", [2]),
+            ]
+        )
+
+        assert sorted(result["name"] for result in self.cache.list_propers()) == [
+            "Show.Name.S01E02.PROPER.720p.HDTV.x264-GRP",
+            "Show.Name.S01E02.real.720p.HDTV.x264-GRP",
+        ]
+
+    def test_migration(self):
+        """
+        Test existing results are indexed when the cache database is upgraded
+        """
+        old_db_con = sickchill.oldbeard.db.DBConnection("old_cache.db")
+        try:
+            old_db_con.action("CREATE TABLE db_version (db_version INTEGER);")
+            old_db_con.action(
+                "CREATE TABLE results (provider TEXT, name TEXT, season NUMERIC, episodes TEXT, indexerid NUMERIC, url TEXT, time NUMERIC, quality TEXT, "
+                "release_group TEXT, version NUMERIC, seeders INTEGER DEFAULT 0, leechers INTEGER DEFAULT 0, size INTEGER DEFAULT -1, "
+                "status INTEGER DEFAULT 0, failed INTEGER DEFAULT 0, added TEXT DEFAULT CURRENT_TIMESTAMP);"
+            )
+            for table in ("lastUpdate", "lastSearch"):
+                old_db_con.action(f"CREATE TABLE {table} (provider TEXT, time NUMERIC);")
+            old_db_con.action(
+                "INSERT INTO results (provider, name, season, episodes, indexerid, url) VALUES ('provider', 'Show.S01E01E02.REPACK', 1, '|1|2|', 5, 'url')"
+            )
+
+            sickchill.oldbeard.db.upgrade_database(old_db_con, sickchill.oldbeard.databases.cache.InitialSchema)
+
+            assert [tuple(row) for row in old_db_con.select("SELECT url, episode FROM result_episodes ORDER BY episode")] == [("url", 1), ("url", 2)]
+        finally:
+            drop_connection(old_db_con)
+
+
+@unittest.skipUnless(BENCHMARK, "Set BENCHMARK=1 to run the benchmarks")
+class ResultEpisodesBenchmarkTests(conftest.SickChillTestDBCase):
+    """
+    Compare finding the cached results of wanted episodes with LIKE on the results and with the episode index
+    """
+
+    PROVIDERS = 10
+    SHOWS = 500
+    EPISODES = 100
+    LOOKUPS = 500
+
+    def test_lookups(self):
+        db_con = sickchill.oldbeard.db.DBConnection("benchmark_cache.db")
+        sickchill.oldbeard.db.upgrade_database(db_con, sickchill.oldbeard.databases.cache.InitialSchema)
+        try:
+            rows = [
+                (f"provider{provider}", f"Show.{show}.S01E{episode:02}", 1, f"|{episode}|", show, f"{provider}/{show}/{episode}", Quality.HDTV)
+                for provider in range(self.PROVIDERS)
+                for show in range(self.SHOWS)
+                for episode in range(1, self.EPISODES + 1)
+            ]
+            with db_con.connection:
+                db_con.connection.executemany(
+                    "INSERT INTO results (provider, name, season, episodes, indexerid, url, quality) VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+                )
+                db_con.connection.executemany(
+                    "INSERT INTO result_episodes (url, provider, indexerid, season, episode) VALUES (?, ?, ?, ?, ?)",
+                    [(row[5], row[0], row[4], row[2], int(row[3].strip("|"))) for row in rows],
+                )
+
+            wanted = [(f"provider{lookup % self.PROVIDERS}", lookup % self.SHOWS, lookup % self.EPISODES + 1) for lookup in range(self.LOOKUPS)]
+
+            start = time.perf_counter()
+            for provider, show, episode in wanted:
+                db_con.select(
+                    "SELECT * FROM results WHERE provider = ? AND indexerid = ? AND season = 1 AND episodes LIKE ?", [provider, show, f"%|{episode}|%"]
+                )
+            like_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for provider, show, episode in wanted:
+                db_con.select(
+                    "SELECT results.* FROM result_episodes JOIN results ON results.url = result_episodes.url "
+                    "WHERE result_episodes.provider = ? AND result_episodes.indexerid = ? AND result_episodes.season = 1 AND result_episodes.episode = ?",
+                    [provider, show, episode],
+                )
+            index_time = time.perf_counter() - start
+
+            print(f"\n{len(rows)} cached results, {self.LOOKUPS} lookups: LIKE {like_time:.3f}s, episode index {index_time:.3f}s")
+        finally:
+            drop_connection(db_con)
+
+
+@patch.object(settings, "DATABASE_WAL", True)
+class WALTests(conftest.SickChillTestDBCase):
+    """
+    Test the write ahead log mode and the read only connections
+    """
+
+    def setUp(self):
+        super().setUp()
+        with patch.object(settings, "DATABASE_WAL", True):
+            self.db_con = sickchill.oldbeard.db.DBConnection("wal.db")
+        self.db_con.action("CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, name TEXT)")
+
+    def tearDown(self):
+        drop_connection(self.db_con)
+        super().tearDown()
+
+    def test_wal(self):
+        """
+        Test selects use a read only connection of their thread and see the committed writes
+        """
+        assert self.db_con.select_one("PRAGMA journal_mode")[0] == "wal"
+
+        results = {}
+        # keep every thread alive until all of them have read, finished threads have their connections closed
+        barrier = threading.Barrier(4)
+
+        def read(name):
+            self.db_con.action("INSERT INTO items (name) VALUES (?)", [name])
+            results[name] = [row["name"] for row in self.db_con.select("SELECT name FROM items WHERE name = ?", [name])]
+            barrier.wait()
+
+        threads = [threading.Thread(target=read, args=(f"item {number}",)) for number in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == {f"item {number}": [f"item {number}"] for number in range(4)}
+
+        readers = [key for key in sickchill.oldbeard.db.db_readers if key[1] == self.db_con.full_path]
+        assert {key[0] for key in readers} == {thread.ident for thread in threads}
+
+    def test_checkpoint(self):
+        """
+        Test a checkpoint empties the write ahead log
+        """
+        self.db_con.action("INSERT INTO items (name) VALUES ('item')")
+        self.db_con.checkpoint()
+        assert os.path.getsize(self.db_con.full_path + "-wal") == 0
+
+
+@patch.object(settings, "DATABASE_STATS", True)
+class QueryStatsTests(conftest.SickChillTestDBCase):
+    """
+    Test the query statistics
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.db_con = sickchill.oldbeard.db.DBConnection()
+        sickchill.oldbeard.db.query_stats.reset()
+
+    def tearDown(self):
+        sickchill.oldbeard.db.query_stats.reset()
+        super().tearDown()
+
+    def test_normalize(self):
+        """
+        Test literals and lists of placeholders are collapsed
+        """
+        normalize = sickchill.oldbeard.db.QueryStats.normalize
+        assert normalize("SELECT *  FROM tv_episodes\n WHERE showid = 12 AND name = 'it''s'") == "SELECT * FROM tv_episodes WHERE showid = ? AND name = ?"
+        assert normalize("SELECT * FROM tv_episodes WHERE status IN (?, ?,?)") == "SELECT * FROM tv_episodes WHERE status IN (?, ...)"
+
+    def test_stats(self):
+        """
+        Test queries are counted per normalized query, with rows, lock waits and full table scans
+        """
+        for showid in range(3):
+            self.db_con.select("SELECT * FROM tv_episodes WHERE description = ?", [str(showid)])
+        self.db_con.select("SELECT * FROM tv_episodes WHERE showid = 1")
+
+        stats = sickchill.oldbeard.db.query_stats.stats
+        queries = {query["query"]: query for query in stats["queries"]}
+
+        scan = queries["SELECT * FROM tv_episodes WHERE description = ?"]
+        assert scan["count"] == 3
+        assert scan["rows"] == 0
+        assert scan["full_scan"]
+
+        indexed = queries["SELECT * FROM tv_episodes WHERE showid = ?"]
+        assert indexed["count"] == 1
+        assert not indexed["full_scan"]
+
+        assert stats["lock_waits"][self.db_con.filename]["count"] == 4
+
+    def test_dict_rows(self):
+        """
+        Test the query plan is checked on a connection returning dict rows
+        """
+        db_con = sickchill.oldbeard.db.DBConnection(row_type="dict")
+        assert db_con.select("SELECT * FROM tv_episodes WHERE description = ?", ["none"]) == []
+
+        queries = {query["query"]: query for query in sickchill.oldbeard.db.query_stats.stats["queries"]}
+        assert queries["SELECT * FROM tv_episodes WHERE description = ?"]["full_scan"]
+
+    def test_disabled(self):
+        """
+        Test nothing is recorded while the statistics are disabled
+        """
+        with patch.object(settings, "DATABASE_STATS", False):
+            self.db_con.select("SELECT * FROM tv_episodes")
+        assert sickchill.oldbeard.db.query_stats.stats["queries"] == []
+
+
+@unittest.skipUnless(BENCHMARK, "Set BENCHMARK=1 to run the benchmarks")
+class DBConcurrencyBenchmarkTests(conftest.SickChillTestDBCase):
+    """
+    Measure page and API style reads while a backlog search writes episode statuses, with and without WAL
+    """
+
+    ROWS = 20000
+    READERS = 8
+    SECONDS = 5
+
+    def run_load(self, wal):
+        with patch.object(settings, "DATABASE_WAL", wal):
+            db_con = sickchill.oldbeard.db.DBConnection(f"benchmark_{int(wal)}.db")
+            db_con.action("CREATE TABLE episodes (id INTEGER PRIMARY KEY, showid NUMERIC, season NUMERIC, episode NUMERIC, status NUMERIC)")
+            db_con.action("CREATE INDEX idx_showid ON episodes (showid)")
+            db_con.mass_action([["INSERT INTO episodes (showid, season, episode, status) VALUES (?, 1, ?, 3)", [row % 200, row]] for row in range(self.ROWS)])
+
+            stop = threading.Event()
+            latencies = []
+            writes = [0]
+
+            def backlog_search():
+                while not stop.is_set():
+                    db_con.mass_action(
+                        [["UPDATE episodes SET status = ? WHERE id = ?", [status, row]] for row, status in enumerate(range(500), start=writes[0] % self.ROWS)]
+                    )
+                    writes[0] += 500
+
+            def web_requests(showid):
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    db_con.select("SELECT * FROM episodes WHERE showid = ? ORDER BY season, episode", [showid])
+                    db_con.select_one("SELECT COUNT(*) FROM episodes WHERE status = 3")
+                    latencies.append(time.perf_counter() - start)
+
+            threads = [threading.Thread(target=backlog_search)] + [threading.Thread(target=web_requests, args=(showid,)) for showid in range(self.READERS)]
+            for thread in threads:
+                thread.start()
+            time.sleep(self.SECONDS)
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+            drop_connection(db_con)
+
+        latencies.sort()
+        return len(latencies) / self.SECONDS, latencies[int(len(latencies) * 0.95)] * 1000, statistics.mean(latencies) * 1000, writes[0] / self.SECONDS
+
+    def test_concurrent_reads(self):
+        for wal in (False, True):
+            requests, p95, mean, writes = self.run_load(wal)
+            print(f"\nWAL {wal}: {requests:.0f} requests/s, mean {mean:.2f} ms, p95 {p95:.2f} ms, {writes:.0f} episode writes/s")
+
 
 if __name__ == "__main__":
     print("==================")
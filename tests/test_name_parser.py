@@ -1,7 +1,9 @@
 import datetime
 import os
 import sys
+import time
 import unittest
+from unittest.mock import patch
 
 from sickchill import settings, tv
 from sickchill.oldbeard import common, scheduler, show_queue
@@ -10,6 +12,7 @@ from tests import conftest
 
 DEBUG = os.getenv("DEBUG")
 VERBOSE = os.getenv("VERBOSE")
+BENCHMARK = os.getenv("BENCHMARK")
 
 SIMPLE_TEST_CASES = {
     "standard": {
@@ -631,6 +634,177 @@ class BasicFailedTests(conftest.SickChillTestDBCase):
         self._test_names(name_parser, "scene_date_format", lambda x: x + ".avi")
 
 
+class ParseManyTests(conftest.SickChillTestDBCase):
+    """
+    Test parsing a batch of names
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.show = tv.TVShow(1, 1, "en")
+        self.show.name = "Show Name"
+        self.show.anime = 1
+        settings.show_list = [self.show]
+
+    def tearDown(self):
+        parser.name_parser_cache.data.clear()
+        super().tearDown()
+
+    def test_parse_many(self):
+        """
+        Test that duplicates are parsed once, failures are returned and numbering is loaded once per show
+        """
+        names = ["Show.Name.S01E02.HDTV-Group", "Show.Name.S01E03.HDTV-Group", "Show.Name.S01E02.HDTV-Group", "Unknown.Show.S01E02.HDTV-Group"]
+        with patch.object(parser, "ShowNumberingTable", wraps=parser.ShowNumberingTable) as table:
+            results = parser.NameParser(False, parse_method="normal").parse_many(names, cache_result=False)
+
+        assert list(results) == ["Show.Name.S01E02.HDTV-Group", "Show.Name.S01E03.HDTV-Group", "Unknown.Show.S01E02.HDTV-Group"]
+        assert results["Show.Name.S01E02.HDTV-Group"].show is self.show
+        assert results["Show.Name.S01E03.HDTV-Group"].episode_numbers == [3]
+        assert isinstance(results["Unknown.Show.S01E02.HDTV-Group"], parser.InvalidShowException)
+        assert table.call_count == 1
+
+
+class NameParserCacheTests(unittest.TestCase):
+    """
+    Test the LRU name parser cache
+    """
+
+    def setUp(self):
+        self.cache = parser.NameParserCache(max_size=2)
+
+    def test_lru_eviction(self):
+        """
+        Test that hits refresh recency and the least recently used name is evicted
+        """
+        self.cache["first"] = parser.ParseResult("first")
+        self.cache["second"] = parser.ParseResult("second")
+        assert self.cache["first"]
+        self.cache["third"] = parser.ParseResult("third")
+
+        assert list(self.cache.data) == ["first", "third"]
+        assert self.cache["second"] is None
+        assert self.cache.stats["hits"] == 1
+        assert self.cache.stats["misses"] == 1
+        assert self.cache.stats["evictions"] == 1
+
+    def test_invalid_entries(self):
+        """
+        Test that invalid names are cached, expire and can be cleared
+        """
+        self.cache.add_invalid("bad", parser.InvalidShowException("bad"))
+        assert isinstance(self.cache["bad"], parser.InvalidCacheEntry)
+        assert self.cache.stats["invalid"] == 1
+
+        self.cache.clear_invalid()
+        assert self.cache["bad"] is None
+
+        self.cache.add_invalid("bad", parser.InvalidShowException("bad"))
+        self.cache.data["bad"].expires = 0
+        assert self.cache["bad"] is None
+        assert not self.cache.data
+
+    def test_ignored_invalid_entries(self):
+        """
+        Test that an invalid entry ignored by the caller is counted as a miss, not a hit
+        """
+        self.cache.add_invalid("bad", parser.InvalidShowException("bad"))
+        assert self.cache.get("bad", invalid=False) is None
+        assert (self.cache.stats["hits"], self.cache.stats["misses"]) == (0, 1)
+        assert isinstance(self.cache.get("bad"), parser.InvalidCacheEntry)
+        assert (self.cache.stats["hits"], self.cache.stats["misses"]) == (1, 1)
+
+
+class CPUYieldTests(unittest.TestCase):
+    """
+    Test the name parser CPU yield policy
+    """
+
+    def setUp(self):
+        self.cpu_yield = parser.NameParserCPUYield()
+        self.cpu_yield.SLICE = 0.001
+
+    def test_idle_does_not_yield(self):
+        """
+        Test that an idle process parses without sleeping
+        """
+        with patch.object(self.cpu_yield, "_is_busy", return_value=False):
+            self.cpu_yield()
+        assert self.cpu_yield.yields == 0
+        assert self.cpu_yield.yield_time == 0
+
+    def test_busy_yields_and_counts(self):
+        """
+        Test that a busy process yields and the time spent is counted
+        """
+        with patch.object(self.cpu_yield, "_is_busy", return_value=True):
+            self.cpu_yield()
+            self.cpu_yield()
+        assert self.cpu_yield.yields == 2
+        assert self.cpu_yield.yield_time > 0
+        assert self.cpu_yield.stats["yields"] == 2
+
+    def test_disabled(self):
+        """
+        Test that post processing and the setting turn yielding off
+        """
+        with patch.object(self.cpu_yield, "_is_busy", return_value=True):
+            with self.cpu_yield.disabled():
+                self.cpu_yield()
+            with patch.object(settings, "PARSER_CPU_YIELD", False):
+                self.cpu_yield()
+        assert self.cpu_yield.yields == 0
+
+
+@unittest.skipUnless(BENCHMARK, "Set BENCHMARK=1 to run the name parser benchmark")
+class ParserBenchmarkTests(conftest.SickChillTestDBCase):
+    """
+    Report parses/sec over the test corpus with and without the shared regex registry
+    """
+
+    ROUNDS = 5
+
+    def setUp(self):
+        super().setUp()
+        self.show = tv.TVShow(1, 1, "en")
+        self.names = [name for section in SIMPLE_TEST_CASES.values() for name in section]
+        self.names += [name for name, result, which_regexes in COMBINATION_TEST_CASES]
+
+    def tearDown(self):
+        parser.name_parser_cache.data.clear()
+        super().tearDown()
+
+    def _parses_per_second(self, recompile):
+        """
+        Parse the corpus ROUNDS times, creating a new parser per name like the provider cache does
+
+        :param recompile: clear the regex registry before every parser, like the old per instance compile
+        :return: parses per second
+        """
+        parser.name_parser_cache.data.clear()
+        start = time.perf_counter()
+        for _ in range(self.ROUNDS):
+            for name in self.names:
+                if recompile:
+                    parser.name_parser_regexes.clear()
+                try:
+                    # naming_pattern skips the db and indexer lookups so only the parsing itself is measured
+                    parser.NameParser(True, show_object=self.show, naming_pattern=True).parse(name, cache_result=False)
+                except (parser.InvalidNameException, parser.InvalidShowException):
+                    pass
+        return self.ROUNDS * len(self.names) / (time.perf_counter() - start)
+
+    def test_parse_benchmark(self):
+        """
+        Compare compiling the regexes per parser with the shared registry
+        """
+        with parser.parser_cpu_yield.disabled():
+            before = self._parses_per_second(recompile=True)
+            after = self._parses_per_second(recompile=False)
+        print(f"\nName parser: {before:.1f} parses/sec compiling per parser, {after:.1f} parses/sec with the shared registry")
+        assert after > 0 and before > 0
+
+
 if __name__ == "__main__":
     if len(sys.argv) > 1:
         SUITE = unittest.TestLoader().loadTestsFromName("name_parser_tests.BasicTests.test_" + sys.argv[1])
@@ -2,9 +2,13 @@
 Test notifiers
 """
 
+import threading
 import unittest
+from unittest.mock import patch
 
-from sickchill.oldbeard import db
+from sickchill import settings
+from sickchill.oldbeard import classes, db
+from sickchill.oldbeard.notifiers.dispatcher import LoggedErrorQueue, NotificationDispatcher
 from sickchill.oldbeard.notifiers.emailnotify import Notifier as EmailNotifier
 from sickchill.oldbeard.notifiers.prowl import Notifier as ProwlNotifier
 from sickchill.tv import TVEpisode, TVShow
@@ -286,6 +290,134 @@ class NotifierTests(conftest.SickChillTestDBCase):
         return -1
 
 
+class FakeNotifier(object):
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = []
+        self.release = threading.Event()
+
+    def notify_download(self, ep_name):
+        self.calls.append(ep_name)
+        if len(self.calls) <= self.failures:
+            raise IOError("connection refused")
+        return ep_name
+
+    def update_library(self, show_name):
+        self.calls.append(show_name)
+
+    def slow(self):
+        self.release.wait(5)
+
+    def refused(self):
+        self.calls.append("refused")
+        return False
+
+
+class NotificationDispatcherTests(unittest.TestCase):
+    """
+    Test the notifications are sent on the service pools with retries, coalescing and metrics
+    """
+
+    def setUp(self):
+        self.dispatcher = NotificationDispatcher()
+        self.addCleanup(self.dispatcher.shutdown)
+
+    def test_does_not_block(self):
+        notifier = FakeNotifier()
+        future = self.dispatcher.submit(notifier, "slow")
+        assert not future.done()
+        notifier.release.set()
+        future.result(5)
+        stats = self.dispatcher.stats["test_notifier"]
+        assert stats["sent"] == 1
+        assert stats["max_latency"] > 0
+
+    @patch.object(NotificationDispatcher, "BACKOFF", 0)
+    def test_retries(self):
+        notifier = FakeNotifier(failures=2)
+        assert self.dispatcher.submit(notifier, "notify_download", "episode").result(5) == "episode"
+        assert notifier.calls == ["episode"] * 3
+
+        notifier = FakeNotifier(failures=3)
+        assert self.dispatcher.submit(notifier, "notify_download", "episode").result(5) is None
+
+        stats = self.dispatcher.stats["test_notifier"]
+        assert (stats["sent"], stats["failed"], stats["retries"]) == (1, 1, 4)
+
+    @patch.object(NotificationDispatcher, "COALESCE_DELAY", 0.2)
+    def test_coalesce(self):
+        notifier = FakeNotifier()
+        futures = [self.dispatcher.submit(notifier, "update_library", "show", coalesce_key=1) for _ in range(10)]
+        futures.append(self.dispatcher.submit(notifier, "update_library", "other show", coalesce_key=2))
+        for future in futures:
+            future.result(5)
+
+        assert sorted(notifier.calls) == ["other show", "show"]
+        assert self.dispatcher.stats["test_notifier"]["coalesced"] == 9
+
+        self.dispatcher.submit(notifier, "update_library", "show", coalesce_key=1).result(5)
+        assert notifier.calls.count("show") == 2
+
+    def test_disabled(self):
+        notifier = FakeNotifier()
+        with patch.object(settings, "USE_TEST_NOTIFIER", False, create=True):
+            assert self.dispatcher.submit(notifier, "notify_download", "episode").result(5) is None
+        assert notifier.calls == []
+        assert self.dispatcher.pools == {}
+        assert self.dispatcher.stats == {}
+
+        with patch.multiple(settings, USE_PLEX_SERVER=False, USE_PLEX_CLIENT=True, USE_KODI=False):
+            assert self.dispatcher.enabled("plex")
+            assert not self.dispatcher.enabled("kodi")
+
+    def test_returns_false(self):
+        notifier = FakeNotifier()
+        assert self.dispatcher.submit(notifier, "refused").result(5) is False
+        assert notifier.calls == ["refused"]
+        stats = self.dispatcher.stats["test_notifier"]
+        assert (stats["sent"], stats["failed"], stats["retries"]) == (0, 1, 0)
+
+
+class LoggedErrorQueueTests(unittest.TestCase):
+    """
+    Test the logged errors are sent from the background thread, de-duplicated and rate limited
+    """
+
+    def setUp(self):
+        self.sent = []
+        self.done = threading.Event()
+        self.queue = LoggedErrorQueue(self.send)
+        self.addCleanup(self.queue.shutdown)
+
+    def send(self, ui_error):
+        self.sent.append(ui_error.message)
+        self.done.set()
+
+    def test_duplicates(self):
+        assert self.queue.put(classes.UIError("Database is locked"))
+        assert not self.queue.put(classes.UIError("Database is locked"))
+        assert self.done.wait(5)
+        assert self.sent == ["Database is locked"]
+        assert self.queue.stats["duplicates"] == 1
+
+        with patch.object(LoggedErrorQueue, "DUPLICATE_WINDOW", 0):
+            assert self.queue.put(classes.UIError("Database is locked"))
+
+    @patch.object(LoggedErrorQueue, "RATE_LIMIT", 3)
+    def test_rate_limit(self):
+        results = [self.queue.put(classes.UIError(f"Error {number}")) for number in range(5)]
+        assert results == [True, True, True, False, False]
+        assert self.queue.stats["rate_limited"] == 2
+
+    def test_does_not_block(self):
+        release = threading.Event()
+        self.queue.send = lambda ui_error: release.wait(5)
+        for number in range(3):
+            assert self.queue.put(classes.UIError(f"Error {number}"))
+        assert self.queue.stats["queued"] == 3
+        release.set()
+
+
 if __name__ == "__main__":
     print("==================")
     print("STARTING - NOTIFIER TESTS")
@@ -1,5 +1,6 @@
 import sys
 import unittest
+from unittest.mock import patch
 
 from sickchill import settings
 from sickchill.oldbeard import common, db, name_cache, scene_exceptions, show_name_helpers
@@ -56,6 +57,25 @@ class SceneTests(conftest.SickChillTestDBCase):
         # assert show_name_helpers.filter_bad_releases('German.Show.S02.Some.Stuff-Grp')
         assert not show_name_helpers.filter_bad_releases("Show.S02.This.Is.German")
 
+    def test_scene_exception_names(self):
+        """
+        Test scene exceptions are looked up by name from the index, and the index follows changes to the exceptions
+        """
+        scene_exceptions.update_custom_scene_exceptions(
+            1234, {-1: [{"show_name": "Show: The Name", "custom": True}], 2: [{"show_name": "Show: The Name", "custom": True}]}
+        )
+        scene_exceptions.get_scene_exception_by_name("warm up the index")
+
+        with patch.object(db.DBConnection, "select") as select:
+            assert scene_exceptions.get_scene_exception_by_name_multiple("show: the name") == [(1234, -1), (1234, 2)]
+            assert scene_exceptions.get_scene_exception_by_name("Show The Name") == (1234, -1)
+            assert scene_exceptions.get_scene_exception_by_name("Other Name") == (None, None)
+            select.assert_not_called()
+
+        scene_exceptions.update_custom_scene_exceptions(1234, {-1: [{"show_name": "Other Name", "custom": True}]})
+        assert scene_exceptions.get_scene_exception_by_name("Other Name") == (1234, -1)
+        assert scene_exceptions.get_scene_exception_by_name("Show The Name") == (None, None)
+
 
 class SceneExceptionTestCase(conftest.SickChillTestDBCase):
     """
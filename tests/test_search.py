@@ -1,8 +1,12 @@
+import threading
+import time
 import unittest
+from unittest.mock import MagicMock, patch
 
 import sickchill.oldbeard.providers
 from sickchill import settings
 from sickchill.oldbeard import common as common
+from sickchill.oldbeard.search import search_providers, update_provider_caches
 from sickchill.providers.GenericProvider import GenericProvider
 from sickchill.tv import TVEpisode, TVShow
 from tests import conftest
@@ -115,6 +119,99 @@ def generator(cur_data, cur_name, cur_provider):
     return do_test
 
 
+class UpdateProviderCachesTest(unittest.TestCase):
+    """
+    Test provider caches are refreshed concurrently
+    """
+
+    def test_update_provider_caches(self):
+        thread_names = {}
+        delay = 0.2
+
+        def make_provider(name, fail=False):
+            provider = MagicMock()
+            provider.name = name
+
+            def update_cache():
+                thread_names[name] = threading.current_thread().name
+                time.sleep(delay)
+                if fail:
+                    raise ValueError(name)
+
+            provider.cache.update_cache.side_effect = update_cache
+            return provider
+
+        providers = [make_provider(f"Provider {index}", fail=index == 2) for index in range(4)]
+
+        start = time.perf_counter()
+        update_provider_caches(providers)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < delay * len(providers) / 2, elapsed
+        for provider in providers:
+            provider.cache.update_cache.assert_called_once_with()
+            assert thread_names[provider.name] == f"{threading.current_thread().name} :: [{provider.name}]"
+
+        update_provider_caches([])
+
+
+class SearchProvidersTest(unittest.TestCase):
+    """
+    Test searching the providers one at a time and all at once
+    """
+
+    def setUp(self):
+        self.show = MagicMock(is_anime=False)
+        self.episodes = [MagicMock(episode=1), MagicMock(episode=2)]
+
+    def tearDown(self):
+        settings.PARALLEL_PROVIDER_SEARCH = False
+
+    def make_provider(self, name, delay, found=True):
+        provider = MagicMock(anime_only=False, search_mode="episode", search_fallback=False)
+        provider.name = name
+
+        def find_search_results(*args):
+            time.sleep(delay)
+            if not found:
+                return {}
+            return {episode.episode: [MagicMock(episodes=[episode], provider=provider, quality=common.Quality.HDTV)] for episode in self.episodes}
+
+        provider.find_search_results.side_effect = find_search_results
+        return provider
+
+    def search(self, providers):
+        with (
+            patch("sickchill.oldbeard.providers.sorted_provider_list", return_value=providers),
+            patch("sickchill.oldbeard.name_cache.build_name_cache"),
+            patch("sickchill.oldbeard.search.pick_best_result", side_effect=lambda results, show: results[0]),
+            patch("sickchill.oldbeard.search.is_final_result", return_value=True),
+        ):
+            start = time.perf_counter()
+            results = search_providers(self.show, self.episodes)
+            return results, time.perf_counter() - start
+
+    def test_sequential(self):
+        providers = [self.make_provider("empty", 0.2, found=False), self.make_provider("slow", 0.2), self.make_provider("unused", 0.2)]
+
+        results, elapsed = self.search(providers)
+
+        assert elapsed >= 0.4, elapsed
+        assert {result.provider.name for result in results} == {"slow"}
+        providers[2].find_search_results.assert_not_called()
+
+    def test_parallel(self):
+        settings.PARALLEL_PROVIDER_SEARCH = True
+        providers = [self.make_provider("empty", 0.2, found=False), self.make_provider("slow", 0.2), self.make_provider("slower", 1)]
+
+        results, elapsed = self.search(providers)
+
+        # the results of the second provider are final, the third one is not waited for
+        assert elapsed < 0.6, elapsed
+        assert {result.provider.name for result in results} == {"slow"}
+        assert len(results) == len(self.episodes)
+
+
 if __name__ == "__main__":
     print("==================")
     print("STARTING - Search TESTS")
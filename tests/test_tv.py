@@ -2,12 +2,21 @@
 Test tv
 """
 
+import datetime
+import os
+import time
 import unittest
+from unittest.mock import MagicMock, patch, PropertyMock
 
 from sickchill import settings
+from sickchill.helper.exceptions import EpisodeDeletedException
+from sickchill.oldbeard import db, scene_numbering
+from sickchill.oldbeard.common import DOWNLOADED, Quality, SKIPPED, WANTED
 from sickchill.tv import TVEpisode, TVShow
 from tests import conftest
 
+BENCHMARK = os.getenv("BENCHMARK")
+
 
 class TVShowTests(conftest.SickChillTestPostProcessorCase):
     """
@@ -127,6 +136,245 @@ class TVTests(conftest.SickChillTestDBCase):
         settings.show_list = [show]
         # TODO: implement
 
+    @patch("sickchill.oldbeard.scene_numbering.xem_refresh")
+    def test_load_episodes_from_db(self, xem_refresh):
+        """
+        Test all episodes of a show are loaded from a single query
+        """
+        show = TVShow(1, 1, "en")
+        show.name = "show name"
+        show.save_to_db()
+        settings.show_list = [show]
+
+        for episode_number in range(1, 6):
+            episode = TVEpisode(show, 1, episode_number)
+            episode.name = f"Episode {episode_number}"
+            episode.absolute_number = episode_number
+            episode.save_to_db()
+
+        loaded = show.get_episode(1, 2)
+        show.flush_episodes()
+        show.episodes[1] = {2: loaded}
+
+        scene_numbering.scene_numbering_tables.clear()
+        with patch.object(TVEpisode, "load_from_db") as load_from_db:
+            scanned_episodes = show.load_episodes_from_db()
+
+        load_from_db.assert_not_called()
+        assert xem_refresh.call_count == 1
+        assert scanned_episodes == {1: {episode_number: True for episode_number in range(1, 6)}}
+        assert show.get_episode(1, 2) is loaded
+        for episode_number in range(1, 6):
+            episode = show.get_episode(1, episode_number)
+            assert episode.name == f"Episode {episode_number}"
+            assert episode.absolute_number == episode_number
+            assert (episode.scene_season, episode.scene_episode, episode.scene_absolute_number) == (1, episode_number, episode_number)
+
+    @patch("sickchill.oldbeard.scene_numbering.xem_refresh")
+    def test_load_episodes_from_indexer(self, xem_refresh):
+        """
+        Test episodes are loaded from the series episodes payload, only incomplete episodes are fetched on their own
+        """
+        show = TVShow(1, 3, "en")
+        show.name = "show name"
+        show.save_to_db()
+        settings.show_list = [show]
+
+        def indexer_episode(episode_number, **fields):
+            return {
+                "id": 300 + episode_number,
+                "airedSeason": 1,
+                "airedEpisodeNumber": episode_number,
+                "episodeName": f"Episode {episode_number}",
+                "absoluteNumber": episode_number,
+                "overview": "",
+                "firstAired": f"2020-01-0{episode_number}",
+                **fields,
+            }
+
+        incomplete = indexer_episode(3)
+        del incomplete["overview"]
+
+        idxr = MagicMock()
+        idxr.name = "theTVDB"
+        idxr.episodes.return_value = [indexer_episode(1), indexer_episode(2), incomplete]
+        idxr.episode.return_value = indexer_episode(3, overview="Fetched on its own")
+
+        with patch.object(TVShow, "idxr", new_callable=PropertyMock, return_value=idxr):
+            scanned_episodes = show.load_episodes_from_indexer()
+
+        assert scanned_episodes == {1: {1: True, 2: True, 3: True}}
+        idxr.episode.assert_called_once_with(show, 1, 3)
+        assert show.get_episode(1, 2).name == "Episode 2"
+        assert show.get_episode(1, 2).airdate == datetime.date(2020, 1, 2)
+        assert show.get_episode(1, 3).description == "Fetched on its own"
+
+    def test_batch_episode_writes(self):
+        """
+        Test episodes saved and deleted in a batch are written together when it closes
+        """
+        show = TVShow(1, 4, "en")
+        show.name = "show name"
+        show.save_to_db()
+        settings.show_list = [show]
+
+        deleted = TVEpisode(show, 1, 1)
+        deleted.save_to_db()
+
+        def episode_rows():
+            return [(row["season"], row["episode"], row["name"]) for row in db.DBConnection().select("SELECT * FROM tv_episodes WHERE showid = 4")]
+
+        with patch.object(db.DBConnection, "upsert") as upsert:
+            with show.batch_episode_writes():
+                for episode_number in range(2, 5):
+                    episode = TVEpisode(show, 1, episode_number)
+                    episode.name = "before"
+                    episode.save_to_db()
+                    episode.name = f"Episode {episode_number}"
+
+                assert episode.get_sql() is None
+                with show.batch_episode_writes():
+                    try:
+                        deleted.delete_episode()
+                    except EpisodeDeletedException:
+                        pass
+
+                assert episode_rows() == [(1, 1, "")]
+
+        upsert.assert_not_called()
+        assert show.episode_batch is None
+        assert sorted(episode_rows()) == [(1, episode_number, f"Episode {episode_number}") for episode_number in range(2, 5)]
+
+    def test_episode_status_table(self):
+        """
+        Test the status table of a show is read once and kept current as episodes are saved and deleted
+        """
+        show = TVShow(1, 6, "en")
+        show.name = "show name"
+        show.save_to_db()
+        settings.show_list = [show]
+
+        episodes = []
+        for episode_number in range(1, 5):
+            episode = TVEpisode(show, 1, episode_number)
+            episode.status = SKIPPED
+            episode.save_to_db()
+            episodes.append(episode)
+
+        with patch.object(db.DBConnection, "select", autospec=True, side_effect=db.DBConnection.select) as select:
+            assert show.get_episode_status(1, 1) == SKIPPED
+            assert show.get_episode_status(1, 9) is None
+            assert select.call_count == 1
+
+        episodes[0].status = WANTED
+        episodes[0].save_to_db()
+
+        episodes[1].status = WANTED
+        db.DBConnection().mass_action([episodes[1].get_sql()])
+
+        with show.batch_episode_writes():
+            episodes[2].status = Quality.compositeStatus(DOWNLOADED, Quality.HDTV)
+            episodes[2].save_to_db()
+            assert show.get_episode_status(1, 3) == SKIPPED
+
+        try:
+            episodes[3].delete_episode()
+        except EpisodeDeletedException:
+            pass
+
+        rows = db.DBConnection().select("SELECT season, episode, status FROM tv_episodes WHERE showid = 6")
+        assert show.episode_statuses == {(row["season"], row["episode"]): row["status"] for row in rows}
+        assert show.episode_statuses == {(1, 1): WANTED, (1, 2): WANTED, (1, 3): Quality.compositeStatus(DOWNLOADED, Quality.HDTV)}
+
+    def test_want_episode_decisions(self):
+        """
+        Test want_episode follows the status changes of the episodes and caches its decisions
+        """
+        show = TVShow(1, 7, "en")
+        show.name = "show name"
+        show.quality = Quality.combineQualities([Quality.HDTV], [Quality.FULLHDTV])
+        show.save_to_db()
+        settings.show_list = [show]
+
+        episode = TVEpisode(show, 1, 1)
+        episode.status = SKIPPED
+        episode.save_to_db()
+
+        assert not show.want_episode(1, 1, Quality.HDTV)
+        assert not show.want_episode(1, 2, Quality.HDTV)
+
+        episode.status = WANTED
+        episode.save_to_db()
+        assert show.want_episode(1, 1, Quality.HDTV)
+        assert not show.want_episode(1, 1, Quality.SDTV)
+
+        episode.status = Quality.compositeStatus(DOWNLOADED, Quality.HDTV)
+        episode.save_to_db()
+        assert not show.want_episode(1, 1, Quality.HDTV)
+        assert show.want_episode(1, 1, Quality.FULLHDTV)
+
+        with patch.object(TVShow, "want_decision", wraps=TVShow.want_decision) as want_decision:
+            for _ in range(3):
+                assert show.want_episode(1, 1, Quality.FULLHDTV)
+            want_decision.assert_not_called()
+
+        show.quality = Quality.combineQualities([Quality.HDTV, Quality.FULLHDTV], [])
+        assert not show.want_episode(1, 1, Quality.FULLHDTV)
+
+        for key, decision in show.want_decisions.items():
+            assert decision == TVShow.want_decision(*key)
+
+
+@unittest.skipUnless(BENCHMARK, "Set BENCHMARK=1 to run the benchmarks")
+class LoadEpisodesBenchmarkTests(conftest.SickChillTestDBCase):
+    """
+    Compare loading every episode of a synthetic database one query at a time with the bulk load
+    """
+
+    FIRST_SHOW = 10000
+    SHOWS = 1000
+    EPISODES = 10
+
+    @patch("sickchill.oldbeard.scene_numbering.xem_refresh")
+    @patch.object(TVShow, "load_from_db")
+    def test_load_episodes_from_db(self, load_from_db, xem_refresh):
+        main_db_con = db.DBConnection()
+        main_db_con.mass_action(
+            [
+                ["INSERT INTO tv_shows (indexer_id, indexer, show_name, genre, quality) VALUES (?, 1, ?, '', ?)", [show_id, f"Show {show_id}", Quality.HDTV]]
+                for show_id in range(self.FIRST_SHOW, self.FIRST_SHOW + self.SHOWS)
+            ]
+            + [
+                [
+                    "INSERT INTO tv_episodes (showid, indexerid, indexer, name, season, episode, description, airdate, status, location, subtitles_searchcount, subtitles_lastsearch) VALUES (?, ?, 1, ?, 1, ?, '', 1, 3, '', 0, '')",
+                    [show_id, show_id * 100 + episode, f"Episode {episode}", episode],
+                ]
+                for show_id in range(self.FIRST_SHOW, self.FIRST_SHOW + self.SHOWS)
+                for episode in range(1, self.EPISODES + 1)
+            ]
+        )
+
+        shows = [TVShow(1, show_id) for show_id in range(self.FIRST_SHOW, self.FIRST_SHOW + self.SHOWS)]
+        settings.show_list = shows
+
+        start = time.perf_counter()
+        for show in shows:
+            for episode in range(1, self.EPISODES + 1):
+                show.get_episode(1, episode).load_from_db(1, episode)
+        per_episode = time.perf_counter() - start
+
+        for show in shows:
+            show.flush_episodes()
+
+        start = time.perf_counter()
+        for show in shows:
+            show.load_episodes_from_db()
+        bulk = time.perf_counter() - start
+
+        print(f"per episode: {per_episode:.2f}s, bulk: {bulk:.2f}s for {self.SHOWS * self.EPISODES} episodes of {self.SHOWS} shows")
+        assert all(len(show.episodes[1]) == self.EPISODES for show in shows)
+        assert bulk < per_episode
+
 
 if __name__ == "__main__":
     print("==================")
@@ -3,9 +3,11 @@ Test XEM
 """
 
 import unittest
+from unittest.mock import patch
 
 import sickchill.oldbeard.db
 from sickchill import settings
+from sickchill.oldbeard import scene_numbering
 from sickchill.tv import TVShow
 from tests import conftest
 
@@ -48,6 +50,64 @@ class XEMBasicTests(conftest.SickChillTestDBCase):
                 print(f"There was an error creating the show {error}")
 
 
+@patch("sickchill.oldbeard.scene_numbering.xem_refresh")
+class SceneNumberingTableTests(conftest.SickChillTestDBCase):
+    """
+    Test the in memory scene numbering tables
+    """
+
+    def setUp(self):
+        super().setUp()
+        scene_numbering.scene_numbering_tables.clear()
+        self.show = TVShow(1, 2, "en")
+        self.show.name = "show name"
+        self.show.scene = 1
+        self.show.save_to_db()
+        settings.show_list = [self.show]
+
+    def tearDown(self):
+        scene_numbering.scene_numbering_tables.clear()
+        super().tearDown()
+
+    def test_lookups_use_one_load(self, xem_refresh):
+        """
+        Test scene numbering lookups are answered from the table after the first lookup
+        """
+        scene_numbering.set_scene_numbering(2, 1, season=1, episode=2, sceneSeason=2, sceneEpisode=5)
+        assert scene_numbering.find_scene_numbering(2, 1, 1, 2) == (2, 5)
+
+        with patch.object(sickchill.oldbeard.db.DBConnection, "select") as select:
+            assert scene_numbering.find_scene_numbering(2, 1, 1, 2) == (2, 5)
+            assert scene_numbering.find_scene_numbering(2, 1, 1, 3) is None
+            assert scene_numbering.get_indexer_numbering(2, 1, 2, 5) == (1, 2)
+            assert scene_numbering.get_indexer_numbering(2, 1, 2, 6) == (2, 6)
+
+        select.assert_not_called()
+        assert xem_refresh.call_count == 1
+
+    def test_set_scene_numbering_invalidates(self, xem_refresh):
+        """
+        Test changing the scene numbering of a show is visible to the next lookup
+        """
+        scene_numbering.set_scene_numbering(2, 1, season=1, episode=2, sceneSeason=2, sceneEpisode=5)
+        version = scene_numbering.scene_numbering_tables.get(2, 1).version
+
+        scene_numbering.set_scene_numbering(2, 1, season=1, episode=2, sceneSeason=3, sceneEpisode=1)
+        assert scene_numbering.scene_numbering_tables.get(2, 1).version > version
+        assert scene_numbering.find_scene_numbering(2, 1, 1, 2) == (3, 1)
+        assert scene_numbering.get_indexer_numbering(2, 1, 2, 5) == (2, 5)
+
+    def test_numbering_for_episodes(self, xem_refresh):
+        """
+        Test the bulk lookups translate every episode from one table
+        """
+        scene_numbering.set_scene_numbering(2, 1, season=1, episode=2, sceneSeason=2, sceneEpisode=5)
+
+        assert scene_numbering.get_scene_numbering_for_episodes(2, 1, [(1, 2), (1, 3)]) == [(2, 5), (1, 3)]
+        assert scene_numbering.get_indexer_numbering_for_episodes(2, 1, [(2, 5), (2, 6), (None, 1)]) == [(1, 2), (2, 6), (None, 1)]
+        assert scene_numbering.get_indexer_numbering_for_episodes(None, 1, [(2, 5)]) == [(2, 5)]
+
+
 if __name__ == "__main__":
     print("==================")
     print("STARTING - XEM Scene Numbering TESTS")